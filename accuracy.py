@@ -0,0 +1,476 @@
+"""
+High-precision accuracy harness
+Measures every pricing backend against an mpmath reference evaluated at 50
+significant digits, over generated inputs covering normal and extreme
+regimes (deep in/out of the money, expiries near zero, tiny and huge
+volatilities). Reports the maximum absolute and relative error per
+backend, regime and output, and round-trips implied volatilities. The
+model pricers built on approximations, interpolation or truncated series
+(Heston COS and FFT, Barone-Adesi-Whaley, Bjerksund-Stensland and the
+Merton series) are checked on fixed chains as well. The TOLERANCES below
+are the accuracy each fast path is held to by test_accuracy.py. Requires
+mpmath.
+"""
+
+from functools import lru_cache
+
+import mpmath
+import numpy as np
+
+import engines
+from american import american_price, american_tree
+from formulas import (ALL_OUTPUTS, DEFAULT_OUTPUTS, approximate_implied_volatility, blackScholes,
+                      blackScholes_batch, calculate_implied_volatility,
+                      calculate_implied_volatility_batch)
+from heston import heston_price
+from merton import merton_price
+
+# Significant digits of the reference
+REFERENCE_DPS = 50
+
+# Regime name -> (log-moneyness in standard deviations, T, sigma) ranges
+REGIMES = {
+    'normal': ((-2.0, 2.0), (0.05, 2.0), (0.1, 0.6)),
+    'deep_itm': ((4.0, 8.0), (0.05, 2.0), (0.1, 0.6)),
+    'deep_otm': ((-8.0, -4.0), (0.05, 2.0), (0.1, 0.6)),
+    'short_expiry': ((-3.0, 3.0), (1e-6, 1e-3), (0.1, 0.6)),
+    'long_expiry': ((-2.0, 2.0), (10.0, 30.0), (0.1, 0.6)),
+    'tiny_vol': ((-3.0, 3.0), (0.05, 2.0), (1e-4, 1e-2)),
+    'huge_vol': ((-2.0, 2.0), (0.05, 2.0), (2.0, 5.0))
+}
+
+# Output -> (absolute tolerance per unit of strike, relative tolerance).
+# An error passes when |error| <= atol * K + rtol * |reference|. Set about
+# 50x above the worst error measured over all regimes and backends.
+TOLERANCES = {
+    'call_price': (1e-14, 1e-11),
+    'put_price': (1e-14, 1e-11),
+    'delta_call': (1e-14, 1e-10),
+    'delta_put': (1e-14, 1e-10),
+    'gamma': (1e-14, 1e-10),
+    'theta_call': (1e-14, 1e-10),
+    'theta_put': (1e-14, 1e-10),
+    'vega': (1e-14, 1e-10),
+    'rho_call': (1e-14, 3e-8),
+    'rho_put': (1e-14, 1e-10),
+    'vanna': (1e-14, 2e-10),
+    'volga': (1e-14, 5e-10),
+    'charm_call': (1e-14, 2e-9),
+    'charm_put': (1e-14, 2e-9),
+    'speed': (1e-14, 2e-10),
+    'color': (1e-14, 3e-10),
+    'zomma': (1e-14, 5e-10),
+    'ultima': (1e-14, 2e-9)
+}
+
+# Model pricer -> absolute price tolerance per unit of strike on the
+# model_chain() contracts, about 5x above the measured error. The Heston
+# FFT interpolates a strike grid and the American pricers are closed-form
+# approximations, so theirs are loose by design.
+MODEL_TOLERANCES = {
+    'heston_cos': 5e-9,
+    'heston_fft': 1e-4,
+    'baw': 1e-2,
+    'bjerksund_stensland': 1e-2,
+    'merton': 3e-12
+}
+
+# Fixed chains for the model pricers: a strike ladder at several expiries
+# on a spot of 100, with the rate and yield below (American calls swap
+# them so that early exercise matters for both types)
+MODEL_STRIKES = np.linspace(70.0, 130.0, 13)
+MODEL_EXPIRIES = (0.1, 0.5, 2.0)
+MODEL_RATES = (0.06, 0.02)
+MODEL_SIGMA = 0.3
+HESTON_PARAMETERS = dict(v0=0.04, kappa=1.5, theta=0.05, xi=0.6, rho=-0.7)
+MERTON_PARAMETERS = dict(lam=1.0, mu_j=-0.1, delta_j=0.15)
+
+# Digits for the model references, and CRR steps for the American one
+# (no closed form exists; the tree is accurate to about 1e-3 here, well
+# inside the approximations' own errors)
+MODEL_REFERENCE_DPS = 20
+AMERICAN_REFERENCE_STEPS = 2000
+
+# Largest implied-vol error accepted from the Newton solvers
+IV_TOLERANCE = 1e-7
+
+# The closed-form approximation only seeds Newton: it is held to a looser
+# bound, within half a standard deviation of the money and in the regimes
+# it is meant for (it degrades at long expiries and extreme volatilities)
+APPROXIMATION_IV_TOLERANCE = 0.03
+APPROXIMATION_REGIMES = ('normal', 'short_expiry')
+
+def generate_inputs(regime, n=200, seed=0):
+    """
+    Random contracts in one regime
+
+    Strikes are fixed at 100 and spots placed at a given number of standard
+    deviations sigma sqrt(T) from the strike, so 'deep' means deep for that
+    contract's own volatility and expiry.
+
+    Returns:
+    dict: Arrays S, K, T, r, sigma, q
+    """
+    if regime not in REGIMES:
+        raise ValueError(f"Unknown regime: {regime}. Choose from {tuple(REGIMES)}")
+    (m_low, m_high), (T_low, T_high), (s_low, s_high) = REGIMES[regime]
+    rng = np.random.default_rng(seed)
+    # Log-uniform T and sigma so ranges spanning decades are covered evenly
+    T = np.exp(rng.uniform(np.log(T_low), np.log(T_high), n))
+    sigma = np.exp(rng.uniform(np.log(s_low), np.log(s_high), n))
+    moneyness = rng.uniform(m_low, m_high, n)
+    K = np.full(n, 100.0)
+    return {
+        'S': K * np.exp(moneyness * sigma * np.sqrt(T)),
+        'K': K,
+        'T': T,
+        'r': rng.uniform(0.0, 0.08, n),
+        'sigma': sigma,
+        'q': rng.uniform(0.0, 0.04, n)
+    }
+
+def _reference_values(s, k, t, rate, vol, y):
+    """Every output in ALL_OUTPUTS for one contract, as mpmath numbers at the working precision"""
+    sqrt_T = mpmath.sqrt(t)
+    d1 = (mpmath.log(s / k) + (rate - y + vol ** 2 / 2) * t) / (vol * sqrt_T)
+    d2 = d1 - vol * sqrt_T
+    cdf = mpmath.ncdf
+    dividend_discount = mpmath.exp(-y * t)
+    forward = s * dividend_discount
+    strike_pv = k * mpmath.exp(-rate * t)
+    pdf = mpmath.npdf(d1)
+    decay = -forward * pdf * vol / (2 * sqrt_T)
+    gamma = dividend_discount * pdf / (s * vol * sqrt_T)
+    vega = forward * pdf * sqrt_T
+    # d(d1)/dT, shared by the time derivatives of delta and gamma
+    d1_drift = (rate - y) / (vol * sqrt_T) - d2 / (2 * t)
+    return {
+        'call_price': forward * cdf(d1) - strike_pv * cdf(d2),
+        'put_price': strike_pv * cdf(-d2) - forward * cdf(-d1),
+        'delta_call': dividend_discount * cdf(d1),
+        'delta_put': -dividend_discount * cdf(-d1),
+        'gamma': gamma,
+        'theta_call': decay + y * forward * cdf(d1) - rate * strike_pv * cdf(d2),
+        'theta_put': decay - y * forward * cdf(-d1) + rate * strike_pv * cdf(-d2),
+        'vega': vega,
+        'rho_call': t * strike_pv * cdf(d2),
+        'rho_put': -t * strike_pv * cdf(-d2),
+        'vanna': -dividend_discount * pdf * d2 / vol,
+        'volga': vega * d1 * d2 / vol,
+        'charm_call': dividend_discount * (y * cdf(d1) - pdf * d1_drift),
+        'charm_put': dividend_discount * (-y * cdf(-d1) - pdf * d1_drift),
+        'speed': -gamma / s * (d1 / (vol * sqrt_T) + 1),
+        'color': gamma * (y + d1 * d1_drift + 1 / (2 * t)),
+        'zomma': gamma * (d1 * d2 - 1) / vol,
+        'ultima': -vega / vol ** 2 * (d1 * d2 * (1 - d1 * d2) + d1 ** 2 + d2 ** 2)
+    }
+
+def reference_prices(S, K, T, r, sigma, q=0.0):
+    """
+    Black-Scholes prices and Greeks at REFERENCE_DPS digits
+
+    Returns:
+    dict: One float array per name in ALL_OUTPUTS
+    """
+    S, K, T, r, sigma, q = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q)))
+    results = {name: np.empty(S.shape) for name in ALL_OUTPUTS}
+    with mpmath.workdps(REFERENCE_DPS):
+        for i in np.ndindex(S.shape):
+            values = _reference_values(*(mpmath.mpf(float(x[i])) for x in (S, K, T, r, sigma, q)))
+            for name, value in values.items():
+                results[name][i] = float(value)
+    return results
+
+@lru_cache(maxsize=None)
+def _reference_case(regime, n, seed):
+    inputs = generate_inputs(regime, n, seed)
+    return inputs, reference_prices(**inputs)
+
+def _scalar_backend(S, K, T, r, sigma, q):
+    rows = [blackScholes(*row, outputs='all', q=y) for *row, y in zip(S, K, T, r, sigma, q)]
+    return {name: np.array([row[name] for row in rows]) for name in ALL_OUTPUTS}
+
+def _engine_backend(name):
+    # Every output the engine can produce
+    outputs = ALL_OUTPUTS if engines.ENGINES[name][2](ALL_OUTPUTS) else DEFAULT_OUTPUTS
+    return lambda S, K, T, r, sigma, q: engines.price(S, K, T, r, sigma, outputs, q, engine=name)
+
+def _kernel_backend(S, K, T, r, sigma, q):
+    # The Numba kernel's source, run as plain Python
+    return engines._run_kernel(engines._default_outputs_kernel, S, K, T, r, sigma,
+                               DEFAULT_OUTPUTS, q, 'black_scholes')
+
+def backends():
+    """
+    Pricing backends available here, by name
+
+    Returns:
+    dict: name -> callable(S, K, T, r, sigma, q) returning ALL_OUTPUTS, or
+    DEFAULT_OUTPUTS for the backends limited to them
+    """
+    found = {
+        'scalar': _scalar_backend,
+        'vectorized': lambda S, K, T, r, sigma, q: blackScholes_batch(S, K, T, r, sigma, 'all', q),
+        'kernel': _kernel_backend
+    }
+    for name in engines.available_engines():
+        found[f'engine_{name}'] = _engine_backend(name)
+    return found
+
+def error_report(backend, regime, n=200, seed=0):
+    """
+    Errors of one backend against the reference in one regime
+
+    Parameters:
+    backend: Backend name (see backends())
+    regime: Regime name (see REGIMES)
+    n: Number of generated contracts
+    seed: Seed for the generated contracts
+
+    Returns:
+    dict: output -> {'max_abs', 'max_rel', 'worst_ratio'}, where
+    worst_ratio is the largest error as a fraction of its tolerance (the
+    output passes when it is at most 1)
+    """
+    inputs, reference = _reference_case(regime, n, seed)
+    values = backends()[backend](**inputs)
+    report = {}
+    for name in (name for name in ALL_OUTPUTS if name in values):
+        error = np.abs(np.asarray(values[name], dtype=float) - reference[name])
+        scale = np.abs(reference[name])
+        atol, rtol = TOLERANCES[name]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative = np.where(scale > 0, error / scale, np.where(error > 0, np.inf, 0.0))
+        report[name] = {
+            'max_abs': float(error.max()),
+            'max_rel': float(relative.max()),
+            'worst_ratio': float(np.max(error / (atol * inputs['K'] + rtol * scale)))
+        }
+    return report
+
+def iv_round_trip(regime, n=200, seed=0, min_vega=1e-6):
+    """
+    Price with the reference, invert with each IV solver, compare to the true vol
+
+    Only quotes whose reference vega is at least min_vega per unit of
+    strike take part: elsewhere the price carries too little volatility
+    information at double precision for any solver to recover it.
+
+    Returns:
+    dict: solver -> maximum absolute volatility error, plus 'quotes'
+    """
+    inputs, reference = _reference_case(regime, n, seed)
+    usable = reference['vega'] >= min_vega * inputs['K']
+    if not usable.any():
+        return {'quotes': 0}
+    S, K, T, r, sigma, q = (inputs[name][usable] for name in ('S', 'K', 'T', 'r', 'sigma', 'q'))
+    # Invert the out-of-the-money side, where the price is all time value
+    is_call = S <= K
+    price = np.where(is_call, reference['call_price'][usable], reference['put_price'][usable])
+    option_type = np.where(is_call, 'call', 'put')
+
+    batch = calculate_implied_volatility_batch(S, K, T, r, price, option_type, tolerance=1e-12,
+                                               q=q, initial_guess=approximate_implied_volatility(
+                                                   S, K, T, r, price, option_type, q))
+    report = {'quotes': int(usable.sum()),
+              'newton_batch': float(np.max(np.abs(batch - sigma)))}
+    # The scalar solver has no dividend yield; the dividend-adjusted spot gives the same prices
+    scalar = np.array([calculate_implied_volatility(*row, option_type=kind, tolerance=1e-12)
+                       for *row, kind in zip(S * np.exp(-q * T), K, T, r, price, option_type)])
+    report['newton_scalar'] = float(np.max(np.abs(scalar - sigma)))
+    near_money = np.abs(np.log(S / K)) <= 0.5 * sigma * np.sqrt(T)
+    if near_money.any():
+        approximation = approximate_implied_volatility(S, K, T, r, price, option_type, q)
+        report['approximation'] = float(np.max(np.abs(approximation - sigma)[near_money]))
+    return report
+
+def model_chain():
+    """
+    Strike and expiry of every contract in the model pricers' chain
+
+    Returns:
+    tuple: (K, T) flat arrays
+    """
+    K, T = np.meshgrid(MODEL_STRIKES, MODEL_EXPIRIES)
+    return K.ravel(), T.ravel()
+
+def _heston_characteristic_function(u, t, rate, y, v0, kappa, theta, xi, rho):
+    """Characteristic function of ln(S_T / S) under Heston, at the working precision"""
+    iu = 1j * u
+    beta = kappa - rho * xi * iu
+    d = mpmath.sqrt(beta ** 2 + xi ** 2 * (iu + u ** 2))
+    g = (beta - d) / (beta + d)
+    decay = mpmath.exp(-d * t)
+    C = ((rate - y) * iu * t
+         + kappa * theta / xi ** 2 * ((beta - d) * t - 2 * mpmath.log((1 - g * decay) / (1 - g))))
+    D = (beta - d) / xi ** 2 * (1 - decay) / (1 - g * decay)
+    return mpmath.exp(C + D * v0)
+
+def _heston_reference(strikes, t, rate, y):
+    """
+    Heston calls at one expiry by Lewis's single-integral formula, with mpmath quadrature
+
+    The quadrature nodes are the same for every strike, so characteristic
+    function values are memoized across the strikes of the expiry.
+    """
+    memo = {}
+
+    def phi(u):
+        if u not in memo:
+            memo[u] = _heston_characteristic_function(u - 0.5j, t, rate, y, **HESTON_PARAMETERS)
+        return memo[u]
+
+    calls = []
+    for k in strikes:
+        log_strike = mpmath.log(k / 100)
+        integrand = lambda u: (mpmath.re(mpmath.exp(-1j * u * log_strike) * phi(u))
+                               / (u ** 2 + 0.25))
+        integral = mpmath.quad(integrand, [0, 10, 50, 200, mpmath.inf])
+        calls.append(100 * mpmath.exp(-y * t)
+                     - mpmath.sqrt(100 * k) * mpmath.exp(-rate * t) * integral / mpmath.pi)
+    return calls
+
+def _merton_reference(k, t, rate, y, vol):
+    """Merton put as its Poisson series of Black-Scholes puts, summed far past double precision"""
+    lam, mu_j, delta_j = (mpmath.mpf(MERTON_PARAMETERS[name])
+                          for name in ('lam', 'mu_j', 'delta_j'))
+    jump_mean = mpmath.exp(mu_j + delta_j ** 2 / 2) - 1
+    put, n = mpmath.mpf(0), 0
+    while True:
+        weight = mpmath.exp(-lam * t) * (lam * t) ** n / mpmath.factorial(n)
+        spot = 100 * mpmath.exp(n * (mu_j + delta_j ** 2 / 2) - lam * jump_mean * t)
+        vol_n = mpmath.sqrt(vol ** 2 + n * delta_j ** 2 / t)
+        put += weight * _reference_values(spot, k, t, rate, vol_n, y)['put_price']
+        if n > lam * t and weight * k < mpmath.mpf(10) ** -MODEL_REFERENCE_DPS:
+            return put
+        n += 1
+
+@lru_cache(maxsize=None)
+def _model_reference(family):
+    """Reference call and put prices over model_chain() for 'heston', 'merton' or 'american'"""
+    K, T = model_chain()
+    r, q = MODEL_RATES
+    if family == 'american':
+        return {
+            'call_price': american_tree(100, K, T, q, MODEL_SIGMA, 'call', r,
+                                        n_steps=AMERICAN_REFERENCE_STEPS),
+            'put_price': american_tree(100, K, T, r, MODEL_SIGMA, 'put', q,
+                                       n_steps=AMERICAN_REFERENCE_STEPS)
+        }
+    puts = np.empty(K.shape)
+    with mpmath.workdps(MODEL_REFERENCE_DPS):
+        rate, y, vol = mpmath.mpf(r), mpmath.mpf(q), mpmath.mpf(MODEL_SIGMA)
+        strikes = [mpmath.mpf(float(k)) for k in MODEL_STRIKES]
+        for expiry in MODEL_EXPIRIES:
+            t = mpmath.mpf(expiry)
+            if family == 'heston':
+                calls = _heston_reference(strikes, t, rate, y)
+                values = [call - 100 * mpmath.exp(-y * t) + k * mpmath.exp(-rate * t)
+                          for call, k in zip(calls, strikes)]
+            else:
+                values = [_merton_reference(k, t, rate, y, vol) for k in strikes]
+            puts[T == expiry] = [float(value) for value in values]
+    return {'call_price': puts + 100 * np.exp(-q * T) - K * np.exp(-r * T), 'put_price': puts}
+
+def _heston_chain(method):
+    K, T = model_chain()
+    r, q = MODEL_RATES
+    prices = {'call_price': np.empty(K.shape), 'put_price': np.empty(K.shape)}
+    for expiry in MODEL_EXPIRIES:
+        mask = T == expiry
+        result = heston_price(100, K[mask], expiry, r, **HESTON_PARAMETERS, q=q, method=method)
+        for name in prices:
+            prices[name][mask] = result[name]
+    return prices
+
+def _american_chain(method):
+    K, T = model_chain()
+    r, q = MODEL_RATES
+    return {'call_price': american_price(100, K, T, q, MODEL_SIGMA, 'call', r, method),
+            'put_price': american_price(100, K, T, r, MODEL_SIGMA, 'put', q, method)}
+
+def _merton_chain():
+    K, T = model_chain()
+    r, q = MODEL_RATES
+    return merton_price(100, K, T, r, MODEL_SIGMA, **MERTON_PARAMETERS, q=q,
+                        outputs=('call_price', 'put_price'))
+
+# Model pricer -> (reference family, callable returning prices over model_chain())
+MODEL_PRICERS = {
+    'heston_cos': ('heston', lambda: _heston_chain('cos')),
+    'heston_fft': ('heston', lambda: _heston_chain('fft')),
+    'baw': ('american', lambda: _american_chain('baw')),
+    'bjerksund_stensland': ('american', lambda: _american_chain('bjerksund_stensland')),
+    'merton': ('merton', _merton_chain)
+}
+
+def model_report(pricer):
+    """
+    Errors of one model pricer against its reference over model_chain()
+
+    Parameters:
+    pricer: Name from MODEL_PRICERS
+
+    Returns:
+    dict: 'call_price' and 'put_price' -> {'max_abs', 'max_rel',
+    'worst_ratio'}, as in error_report but against MODEL_TOLERANCES
+    """
+    if pricer not in MODEL_PRICERS:
+        raise ValueError(f"Unknown pricer: {pricer}. Choose from {tuple(MODEL_PRICERS)}")
+    family, price = MODEL_PRICERS[pricer]
+    reference = _model_reference(family)
+    values = price()
+    K, _ = model_chain()
+    report = {}
+    for name in ('call_price', 'put_price'):
+        error = np.abs(np.asarray(values[name], dtype=float) - reference[name])
+        report[name] = {
+            'max_abs': float(error.max()),
+            'max_rel': float(np.max(error / np.abs(reference[name]))),
+            'worst_ratio': float(np.max(error / (MODEL_TOLERANCES[pricer] * K)))
+        }
+    return report
+
+def accuracy_report(regimes=None, names=None, n=200, seed=0):
+    """
+    Error table over backends and regimes
+
+    Returns:
+    list: Rows (backend, regime, output, max_abs, max_rel, worst_ratio)
+    """
+    rows = []
+    for regime in regimes or REGIMES:
+        for backend in names or backends():
+            for output, errors in error_report(backend, regime, n, seed).items():
+                rows.append((backend, regime, output, errors['max_abs'], errors['max_rel'],
+                             errors['worst_ratio']))
+    return rows
+
+def print_report(rows):
+    """Print accuracy_report rows, flagging those over tolerance"""
+    print(f"{'Backend':<18} {'Regime':<13} {'Output':<11} {'Max abs':>10} {'Max rel':>10} "
+          f"{'/ tol':>8}")
+    for backend, regime, output, max_abs, max_rel, ratio in rows:
+        flag = '  FAIL' if ratio > 1 else ''
+        print(f"{backend:<18} {regime:<13} {output:<11} {max_abs:10.2e} {max_rel:10.2e} "
+              f"{ratio:8.2e}{flag}")
+
+if __name__ == "__main__":
+    print("Accuracy Against 50-Digit Reference")
+    print("=" * 76)
+    print_report(accuracy_report())
+    print()
+    print("Implied Volatility Round Trips (max abs vol error)")
+    print("=" * 76)
+    for regime in REGIMES:
+        report = iv_round_trip(regime)
+        print(f"{regime:<13} " + ', '.join(f"{key} {value:.2e}" if isinstance(value, float)
+                                           else f"{key} {value}" for key, value in report.items()))
+    print()
+    print("Model Pricers Against Their References")
+    print("=" * 76)
+    print_report([(pricer, 'model_chain', output, errors['max_abs'], errors['max_rel'],
+                   errors['worst_ratio'])
+                  for pricer in MODEL_PRICERS
+                  for output, errors in model_report(pricer).items()])
@@ -1,7 +1,7 @@
 import streamlit as st
 import numpy as np
-import math
-from scipy.stats import norm
+from formulas import blackScholes
+from engines import price
 
 # Page configuration
 st.set_page_config(
@@ -10,39 +10,6 @@ st.set_page_config(
     layout="wide"
 )
 
-# Black-Scholes function (included directly to avoid import issues)
-def blackScholes(S, K, T, r, sigma):
-    """Calculate Black-Scholes option prices and Greeks"""
-    if T <= 0 or sigma <= 0:
-        return {
-            'call_price': 0, 'put_price': 0,
-            'delta_call': 0, 'delta_put': 0,
-            'gamma': 0, 'theta_call': 0, 'theta_put': 0, 'vega': 0
-        }
-    
-    d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
-    d2 = d1 - sigma * math.sqrt(T)
-    
-    # Option prices
-    call_price = S * norm.cdf(d1) - K * math.exp(-r * T) * norm.cdf(d2)
-    put_price = K * math.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
-    
-    # Greeks
-    delta_call = norm.cdf(d1)
-    delta_put = delta_call - 1
-    gamma = norm.pdf(d1) / (S * sigma * math.sqrt(T))
-    theta_call = (-S * norm.pdf(d1) * sigma / (2 * math.sqrt(T)) - 
-                  r * K * math.exp(-r * T) * norm.cdf(d2))
-    theta_put = (-S * norm.pdf(d1) * sigma / (2 * math.sqrt(T)) + 
-                 r * K * math.exp(-r * T) * norm.cdf(-d2))
-    vega = S * math.sqrt(T) * norm.pdf(d1)
-    
-    return {
-        'call_price': call_price, 'put_price': put_price,
-        'delta_call': delta_call, 'delta_put': delta_put,
-        'gamma': gamma, 'theta_call': theta_call, 'theta_put': theta_put, 'vega': vega
-    }
-
 def main():
     st.title("📈 Options Pricer - Black-Scholes Model")
     
@@ -94,17 +61,9 @@ def main():
     
     # Create data for chart
     stock_prices = np.linspace(50, 150, 50)
-    call_prices = []
-    put_prices = []
-    
-    for s in stock_prices:
-        try:
-            res = blackScholes(s, K, T, r, sigma)
-            call_prices.append(res['call_price'])
-            put_prices.append(res['put_price'])
-        except:
-            call_prices.append(0)
-            put_prices.append(0)
+    prices = price(stock_prices, K, T, r, sigma, outputs=('call_price', 'put_price'))
+    call_prices = prices['call_price']
+    put_prices = prices['put_price']
     
     # Create chart data
     chart_data = {
@@ -0,0 +1,156 @@
+"""
+Arrow / Parquet columnar I/O for chain pricing
+Prices and inverts whole Arrow tables or record batches through the batch
+engines in formulas.py, appending results as new columns, and streams
+Parquet files one row group at a time. Requires pyarrow.
+"""
+
+import numpy as np
+import pyarrow as pa
+
+from formulas import blackScholes_batch, calculate_implied_volatility_batch
+
+# Default input column names; override any of them with the columns argument
+DEFAULT_COLUMNS = {
+    'S': 'S',
+    'K': 'K',
+    'T': 'T',
+    'r': 'r',
+    'sigma': 'sigma',
+    'q': 'q',
+    'model': 'model',
+    'type': 'type',
+    'price': 'price'
+}
+
+def column_to_numpy(data, name):
+    """
+    A numeric column of a table or record batch as a float64 NumPy array
+
+    Single-chunk float64 columns without nulls are returned as zero-copy
+    views of the Arrow buffer; anything else is converted (nulls become NaN).
+    """
+    column = data.column(name)
+    if isinstance(column, pa.ChunkedArray) and column.num_chunks == 1:
+        column = column.chunk(0)
+    if isinstance(column, pa.Array) and column.type == pa.float64() and column.null_count == 0:
+        return column.to_numpy(zero_copy_only=True)
+    return np.asarray(column.cast(pa.float64()).to_numpy(zero_copy_only=False), dtype=float)
+
+def _input(data, columns, key, default):
+    """Numeric input from the data if the column exists, otherwise the default"""
+    name = columns[key]
+    return column_to_numpy(data, name) if name in data.schema.names else default
+
+def _labels(data, columns, key, default):
+    """String input (option type or model) from the data if present"""
+    name = columns[key]
+    if name not in data.schema.names:
+        return default
+    return np.asarray(data.column(name).to_numpy(zero_copy_only=False)).astype(str)
+
+def _append_columns(data, new_columns):
+    """Append arrays as new columns to a table or record batch"""
+    names = list(data.schema.names) + list(new_columns)
+    arrays = list(data.columns) + [pa.array(values) for values in new_columns.values()]
+    if isinstance(data, pa.RecordBatch):
+        return pa.RecordBatch.from_arrays(arrays, names=names)
+    return pa.Table.from_arrays(arrays, names=names)
+
+def price_table(data, sigma=None, outputs=None, columns=None, prefix=''):
+    """
+    Price every row of an Arrow table or record batch
+
+    Parameters:
+    data: pyarrow Table or RecordBatch with S, K, T and r columns, and
+          optionally sigma, q and model columns
+    sigma: Volatility to use when the data has no sigma column
+    outputs: Names of the values to append, as in blackScholes
+    columns: Mapping overriding DEFAULT_COLUMNS names
+    prefix: Prefix for the appended column names
+
+    Returns:
+    Same type as data, with one column appended per output
+    """
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    if sigma is None and columns['sigma'] not in data.schema.names:
+        raise ValueError(f"No '{columns['sigma']}' column and no sigma given")
+
+    result = blackScholes_batch(
+        column_to_numpy(data, columns['S']), column_to_numpy(data, columns['K']),
+        column_to_numpy(data, columns['T']), column_to_numpy(data, columns['r']),
+        _input(data, columns, 'sigma', sigma), outputs=outputs,
+        q=_input(data, columns, 'q', 0.0), model=_labels(data, columns, 'model', 'black_scholes'))
+    return _append_columns(data, {prefix + name: values for name, values in result.items()})
+
+def implied_volatility_table(data, columns=None, output='implied_vol', **kwargs):
+    """
+    Implied volatility of every row of an Arrow table or record batch
+
+    Parameters:
+    data: pyarrow Table or RecordBatch with S, K, T, r, price and type
+          columns, and optionally q and model columns
+    columns: Mapping overriding DEFAULT_COLUMNS names
+    output: Name of the appended column
+    kwargs: Passed to calculate_implied_volatility_batch (tolerance, ...)
+
+    Returns:
+    Same type as data, with the implied volatility column appended
+    """
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    implied = calculate_implied_volatility_batch(
+        column_to_numpy(data, columns['S']), column_to_numpy(data, columns['K']),
+        column_to_numpy(data, columns['T']), column_to_numpy(data, columns['r']),
+        column_to_numpy(data, columns['price']), _labels(data, columns, 'type', 'call'),
+        q=_input(data, columns, 'q', 0.0), model=_labels(data, columns, 'model', 'black_scholes'),
+        **kwargs)
+    return _append_columns(data, {output: implied})
+
+def iter_parquet(path, columns=None):
+    """
+    Stream a Parquet file one row group at a time
+
+    Parameters:
+    path: Parquet file path
+    columns: Optional subset of columns to read
+
+    Yields:
+    pyarrow.Table: One table per row group
+    """
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(path)
+    for i in range(parquet_file.num_row_groups):
+        yield parquet_file.read_row_group(i, columns=columns)
+
+def process_parquet(source, destination, function, **kwargs):
+    """
+    Apply price_table or implied_volatility_table to a Parquet file
+
+    Row groups are read, processed and written one at a time, so memory
+    use is bounded by the largest row group rather than the file.
+
+    Parameters:
+    source: Input Parquet file
+    destination: Output Parquet file (one row group per input row group)
+    function: price_table, implied_volatility_table or a compatible callable
+    kwargs: Passed to function
+
+    Returns:
+    int: Number of rows written
+    """
+    import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    try:
+        for table in iter_parquet(source):
+            result = function(table, **kwargs)
+            if writer is None:
+                writer = pq.ParquetWriter(destination, result.schema)
+            writer.write_table(result)
+            rows += result.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
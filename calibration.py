@@ -0,0 +1,332 @@
+"""
+Smile model calibration
+Fits raw SVI per expiry and Heston per underlying to option chains. The
+objectives are evaluated over all quotes at once, SVI uses its analytic
+Jacobian, every fit runs from several starting points (or warm-starts from
+the previous calibration), and the underlyings or, for fewer underlyings
+than workers, the starting points of each fit run in parallel over a
+process pool. Each fit reports its time, residuals and iteration
+counts so calibration latency can be tracked.
+"""
+
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from formulas import blackScholes_batch, calculate_implied_volatility_batch
+from heston import heston_price
+
+SVI_PARAMETERS = ('a', 'b', 'rho', 'm', 'sigma')
+HESTON_PARAMETERS = ('v0', 'kappa', 'theta', 'xi', 'rho')
+
+# Parameter bounds in the order above
+SVI_BOUNDS = ([-1.0, 1e-6, -0.999, -2.0, 1e-4], [2.0, 5.0, 0.999, 2.0, 5.0])
+HESTON_BOUNDS = ([1e-4, 1e-2, 1e-4, 1e-2, -0.999], [2.0, 15.0, 2.0, 3.0, 0.999])
+
+# Warm starts whose IV RMSE exceeds this fall back to a multi-start search
+RESTART_TOLERANCE = 0.01
+
+# Cap on residual evaluations per start; SVI valleys are flat and a start
+# that has not converged by then rarely wins
+MAX_EVALUATIONS = 100
+
+def svi_total_variance(k, a, b, rho, m, sigma):
+    """
+    Raw SVI total implied variance
+
+    Parameters:
+    k: Log-moneyness ln(K / F)
+    a, b, rho, m, sigma: Raw SVI parameters
+
+    Returns:
+    ndarray: Total implied variance sigma_imp^2 * T at each k
+    """
+    shifted = np.asarray(k, dtype=float) - m
+    return a + b * (rho * shifted + np.sqrt(shifted ** 2 + sigma ** 2))
+
+def _svi_jacobian(params, k):
+    """Analytic derivatives of svi_total_variance with respect to (a, b, rho, m, sigma)"""
+    a, b, rho, m, sigma = params
+    shifted = k - m
+    root = np.sqrt(shifted ** 2 + sigma ** 2)
+    return np.column_stack((np.ones_like(k), rho * shifted + root, b * shifted,
+                            -b * (rho + shifted / root), b * sigma / root))
+
+def _svi_residuals(params, k, w, weights):
+    return weights * (svi_total_variance(k, *params) - w)
+
+def _svi_weighted_jacobian(params, k, w, weights):
+    return weights[:, None] * _svi_jacobian(params, k)
+
+def _heston_residuals(params, S, K, price, scale, slices, q):
+    model = np.empty_like(price)
+    for mask, expiry, rate in slices:
+        # One-off parameter sets; keep them out of heston's characteristic-function cache
+        model[mask] = heston_price(S, K[mask], expiry, rate, *params, q=q,
+                                   cache=False)['call_price']
+    return (model - price) * scale
+
+def _least_squares_task(args):
+    residuals, jacobian, start, bounds, residual_args = args
+    return least_squares(residuals, np.clip(start, *bounds), jac=jacobian, bounds=bounds,
+                         max_nfev=MAX_EVALUATIONS, args=residual_args)
+
+def _multi_start(residuals, jacobian, starts, bounds, args=(), pool=None):
+    """
+    Run least squares from every start and keep the best fit
+
+    Parameters:
+    residuals, jacobian: Module-level functions of (params, *args), so
+                         they can be sent to worker processes
+    starts: Starting points
+    bounds: (lower, upper) parameter bounds
+    args: Extra arguments of residuals and jacobian
+    pool: Optional executor the starts are spread over
+
+    Returns:
+    tuple: (best result, total iterations over all starts)
+    """
+    tasks = [(residuals, jacobian, start, bounds, args) for start in starts]
+    if pool is not None and len(tasks) > 1:
+        results = pool.map(_least_squares_task, tasks)
+    else:
+        results = map(_least_squares_task, tasks)
+    best, iterations = None, 0
+    for result in results:
+        iterations += result.njev
+        if best is None or result.cost < best.cost:
+            best = result
+    return best, iterations
+
+def _random_starts(low, high, n, seed):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(low, high, size=(n, len(low)))
+
+def calibrate_svi(k, total_variance, weights=None, initial=None, n_starts=4, seed=0, pool=None):
+    """
+    Fit raw SVI to one expiry slice
+
+    Parameters:
+    k: Log-moneyness ln(K / F) per quote
+    total_variance: Market total implied variance per quote
+    weights: Optional residual weights per quote
+    initial: Previous parameters to warm-start from; the multi-start
+             search only runs if the warm start fits poorly
+    n_starts: Number of random starting points
+    seed: Random seed for the starting points
+    pool: Optional executor the starting points are spread over
+
+    Returns:
+    dict: params, rmse (in total variance), iterations, starts and fit_time
+    """
+    start_time = time.perf_counter()
+    k = np.asarray(k, dtype=float)
+    w = np.asarray(total_variance, dtype=float)
+    weights = np.ones_like(w) if weights is None else np.asarray(weights, dtype=float)
+    args = (k, w, weights)
+
+    iterations, starts = 0, 0
+    result = None
+    if initial is not None:
+        result, iterations = _multi_start(_svi_residuals, _svi_weighted_jacobian,
+                                          [np.asarray(initial, dtype=float)], SVI_BOUNDS, args)
+        starts = 1
+    poor_fit = (result is not None and math.sqrt(2 * result.cost / w.size)
+                > RESTART_TOLERANCE * max(w.mean(), 1e-8))
+    if result is None or poor_fit:
+        low = [0.0, 0.01, -0.9, -0.5, 0.01]
+        high = [max(w.min(), 1e-4), 1.0, 0.9, 0.5, 1.0]
+        candidates = _random_starts(low, high, n_starts, seed)
+        fallback, more = _multi_start(_svi_residuals, _svi_weighted_jacobian, candidates,
+                                      SVI_BOUNDS, args, pool)
+        iterations += more
+        starts += n_starts
+        if result is None or fallback.cost < result.cost:
+            result = fallback
+
+    return {
+        'params': tuple(result.x.tolist()),
+        'rmse': math.sqrt(2 * result.cost / w.size),
+        'iterations': iterations,
+        'starts': starts,
+        'fit_time': time.perf_counter() - start_time
+    }
+
+def calibrate_heston(S, K, T, r, option_price, vega, q=0.0, initial=None, n_starts=4, seed=0,
+                     pool=None):
+    """
+    Fit Heston to a chain of call prices on one underlying
+
+    Residuals are price errors divided by Black-Scholes vega, i.e.
+    approximately implied-vol errors. Each evaluation prices every expiry
+    slice with the COS method in one broadcast over its strikes.
+
+    Parameters:
+    S: Spot price
+    K, T, r: Strike, expiry and rate per quote
+    option_price: Market call price per quote
+    vega: Black-Scholes vega per quote, used to scale the residuals
+    q: Continuous dividend yield
+    initial: Previous parameters to warm-start from
+    n_starts: Number of random starting points
+    seed: Random seed for the starting points
+    pool: Optional executor the starting points are spread over
+
+    Returns:
+    dict: params, rmse (in implied vol), iterations, starts and fit_time
+    """
+    start_time = time.perf_counter()
+    K, T, r, price, vega = (np.asarray(x, dtype=float) for x in (K, T, r, option_price, vega))
+    scale = 1 / np.maximum(vega, 1e-3 * S)
+    slices = [(T == expiry, expiry, r[T == expiry][0]) for expiry in np.unique(T)]
+    args = (S, K, price, scale, slices, q)
+
+    # No closed-form Heston gradient here; fall back to finite differences
+    iterations, starts = 0, 0
+    result = None
+    if initial is not None:
+        result, iterations = _multi_start(_heston_residuals, '2-point',
+                                          [np.asarray(initial, dtype=float)], HESTON_BOUNDS, args)
+        starts = 1
+    if result is None or math.sqrt(2 * result.cost / price.size) > RESTART_TOLERANCE:
+        candidates = _random_starts([0.01, 0.5, 0.01, 0.1, -0.9], [0.2, 5.0, 0.2, 1.0, 0.0],
+                                    n_starts, seed)
+        fallback, more = _multi_start(_heston_residuals, '2-point', candidates, HESTON_BOUNDS,
+                                      args, pool)
+        iterations += more
+        starts += n_starts
+        if result is None or fallback.cost < result.cost:
+            result = fallback
+
+    return {
+        'params': tuple(result.x.tolist()),
+        'rmse': math.sqrt(2 * result.cost / price.size),
+        'iterations': iterations,
+        'starts': starts,
+        'fit_time': time.perf_counter() - start_time
+    }
+
+def calibrate_underlying(chain, previous=None, models=('svi', 'heston'), n_starts=4, seed=0,
+                         pool=None):
+    """
+    Calibrate SVI per expiry and Heston to one underlying's chain
+
+    Parameters:
+    chain: Mapping with arrays 'S', 'K', 'T', 'r', 'price' and
+           'option_type' (one spot per chain); an optional scalar 'q'
+    previous: Report of the previous calibration of this underlying, used
+              to warm-start every fit
+    models: Models to fit, from 'svi' and 'heston'
+    n_starts: Random starting points per fit when no warm start is usable
+    seed: Random seed for the starting points
+    pool: Optional executor the starting points of every fit are spread over
+
+    Returns:
+    dict: 'svi' (expiry -> fit), 'heston' (fit), and the chain totals
+          fit_time, iterations and n_quotes
+    """
+    start_time = time.perf_counter()
+    previous = previous or {}
+    q = chain.get('q', 0.0)
+    S, K, T, r, price = np.broadcast_arrays(
+        *(np.asarray(chain[name], dtype=float) for name in ('S', 'K', 'T', 'r', 'price')))
+    option_type = np.broadcast_to(np.asarray(chain['option_type']), S.shape)
+
+    implied = calculate_implied_volatility_batch(S, K, T, r, price, option_type, q=q)
+    valid = np.isfinite(implied) & (implied > 0)
+    S, K, T, r, price, option_type, implied = (x[valid] for x in (S, K, T, r, price, option_type,
+                                                                  implied))
+    report = {'n_quotes': int(valid.sum()), 'iterations': 0}
+
+    if 'svi' in models:
+        report['svi'] = {}
+        log_moneyness = np.log(K / (S * np.exp((r - q) * T)))
+        for expiry in np.unique(T):
+            mask = T == expiry
+            initial = previous.get('svi', {}).get(float(expiry), {}).get('params')
+            fit = calibrate_svi(log_moneyness[mask], implied[mask] ** 2 * expiry, initial=initial,
+                                n_starts=n_starts, seed=seed, pool=pool)
+            report['svi'][float(expiry)] = fit
+            report['iterations'] += fit['iterations']
+
+    if 'heston' in models:
+        # Puts enter as calls through put-call parity
+        calls = np.where(option_type == 'call', price,
+                         price + S * np.exp(-q * T) - K * np.exp(-r * T))
+        vega = blackScholes_batch(S, K, T, r, implied, outputs='vega', q=q)['vega']
+        initial = previous.get('heston', {}).get('params')
+        fit = calibrate_heston(S[0], K, T, r, calls, vega, q=q, initial=initial,
+                               n_starts=n_starts, seed=seed, pool=pool)
+        report['heston'] = fit
+        report['iterations'] += fit['iterations']
+
+    report['fit_time'] = time.perf_counter() - start_time
+    return report
+
+def _calibrate_task(args):
+    underlying, chain, previous, kwargs = args
+    return underlying, calibrate_underlying(chain, previous, **kwargs)
+
+def calibrate_chains(chains, previous=None, workers=1, **kwargs):
+    """
+    Calibrate many underlyings, in parallel when workers > 1
+
+    With at least as many underlyings as workers each worker calibrates
+    whole underlyings; with fewer, the underlyings run in turn and the
+    starting points of their fits are spread over the workers instead.
+
+    Parameters:
+    chains: Mapping of underlying -> chain (see calibrate_underlying)
+    previous: Mapping of underlying -> previous report, for warm starts
+    workers: Number of worker processes
+    kwargs: Passed to calibrate_underlying (models, n_starts, seed)
+
+    Returns:
+    dict: underlying -> calibration report
+    """
+    previous = previous or {}
+    tasks = [(underlying, chain, previous.get(underlying), kwargs)
+             for underlying, chain in chains.items()]
+    if workers > 1 and len(tasks) >= workers:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return dict(pool.map(_calibrate_task, tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return {underlying: calibrate_underlying(chain, previous, pool=pool, **kwargs)
+                    for underlying, chain, previous, kwargs in tasks}
+    return dict(map(_calibrate_task, tasks))
+
+def print_report(reports):
+    """Print fit time, residuals and iteration counts per underlying"""
+    print(f"{'underlying':<12}{'quotes':>8}{'time (ms)':>11}{'iters':>7}"
+          f"{'max SVI rmse':>14}{'Heston rmse':>13}")
+    for underlying, report in reports.items():
+        svi = max((fit['rmse'] for fit in report.get('svi', {}).values()), default=float('nan'))
+        heston = report['heston']['rmse'] if 'heston' in report else float('nan')
+        print(f"{underlying:<12}{report['n_quotes']:>8}{report['fit_time'] * 1000:>11.1f}"
+              f"{report['iterations']:>7}{svi:>14.2e}{heston:>13.2e}")
+
+if __name__ == "__main__":
+    # Synthetic chains generated from known Heston parameters
+    strikes = np.linspace(80, 120, 9)
+    expiries = (0.25, 0.5, 1.0)
+    chains = {}
+    for i, underlying in enumerate(('AAA', 'BBB', 'CCC', 'DDD')):
+        params = (0.03 + 0.01 * i, 2.0, 0.04, 0.4 + 0.1 * i, -0.6)
+        K = np.tile(strikes, len(expiries))
+        T = np.repeat(expiries, len(strikes))
+        price = np.concatenate([heston_price(100, strikes, expiry, 0.03, *params)['call_price']
+                                for expiry in expiries])
+        chains[underlying] = {'S': 100.0, 'K': K, 'T': T, 'r': 0.03, 'price': price,
+                              'option_type': 'call'}
+
+    print("Smile Model Calibration")
+    print("=" * 65)
+    cold = calibrate_chains(chains, workers=4)
+    print("Cold start:")
+    print_report(cold)
+    print("Warm start:")
+    print_report(calibrate_chains(chains, previous=cold, workers=4))
@@ -0,0 +1,234 @@
+"""
+Memory-mapped option-chain store
+Columnar on-disk format for end-of-day chains: one fixed-dtype binary file
+per column, read back through numpy.memmap, plus a JSON sidecar index of
+row ranges per (underlying, expiry). Opening a store only maps the files,
+so it takes the same few milliseconds whatever the chain size, and slices
+are views that feed blackScholes_batch and the batch IV solver directly.
+"""
+
+import csv
+import json
+import os
+
+import numpy as np
+
+from formulas import blackScholes_batch, calculate_implied_volatility_batch
+
+FORMAT_VERSION = 1
+INDEX_FILE = 'index.json'
+
+# Column name -> on-disk dtype (explicit little-endian so stores are portable)
+COLUMNS = {
+    'S': '<f8',
+    'K': '<f8',
+    'T': '<f8',
+    'r': '<f8',
+    'bid': '<f8',
+    'ask': '<f8',
+    'flags': 'u1'
+}
+
+# Bits of the flags column; the remaining bits are free for callers
+FLAG_CALL = 1
+
+def _column_path(path, name):
+    return os.path.join(path, f"{name}.bin")
+
+def write_chain(path, underlying, expiry, S, K, T, r, bid, ask, option_type='call', flags=0):
+    """
+    Write option quotes to a chain store directory
+
+    Rows are sorted by (underlying, expiry) so every group occupies one
+    contiguous row range, which is what the sidecar index records.
+
+    Parameters:
+    path: Directory to create the store in
+    underlying: Underlying symbol per quote
+    expiry: Expiry label per quote (e.g. '2024-03-15')
+    S, K, T, r: Pricing inputs per quote
+    bid, ask: Quoted prices per quote
+    option_type: 'call' or 'put' per quote; sets FLAG_CALL
+    flags: Extra caller-defined flag bits per quote
+
+    Returns:
+    ChainStore: The newly written store, opened for reading
+    """
+    underlying = np.asarray(underlying).astype(str)
+    expiry = np.asarray(expiry).astype(str)
+    n = len(underlying)
+    order = np.lexsort((expiry, underlying))
+    underlying, expiry = underlying[order], expiry[order]
+
+    is_call = np.broadcast_to(np.asarray(option_type) == 'call', (n,))
+    values = {
+        'S': S, 'K': K, 'T': T, 'r': r, 'bid': bid, 'ask': ask,
+        'flags': (np.asarray(flags, dtype=np.uint8)
+                  | np.where(is_call, FLAG_CALL, 0).astype(np.uint8))
+    }
+
+    os.makedirs(path, exist_ok=True)
+    for name, dtype in COLUMNS.items():
+        column = np.broadcast_to(np.asarray(values[name]), (n,))[order]
+        np.ascontiguousarray(column, dtype=dtype).tofile(_column_path(path, name))
+
+    # Row ranges per (underlying, expiry) group
+    changed = (underlying[1:] != underlying[:-1]) | (expiry[1:] != expiry[:-1])
+    boundaries = np.flatnonzero(changed) + 1
+    starts = np.concatenate(([0], boundaries)) if n else np.empty(0, dtype=int)
+    stops = np.concatenate((boundaries, [n])) if n else np.empty(0, dtype=int)
+    index = {
+        'version': FORMAT_VERSION,
+        'rows': n,
+        'columns': COLUMNS,
+        'groups': [[str(underlying[a]), str(expiry[a]), int(a), int(b)]
+                   for a, b in zip(starts, stops)]
+    }
+    with open(os.path.join(path, INDEX_FILE), 'w') as f:
+        json.dump(index, f)
+
+    return ChainStore(path)
+
+def convert_csv(csv_path, store_path):
+    """
+    Convert a CSV chain into a chain store (a one-off cost per file)
+
+    The CSV needs the columns underlying, expiry, S, K, T, r, bid, ask and
+    type ('call' or 'put').
+    """
+    with open(csv_path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    columns = {name: [row[name] for row in rows]
+               for name in ('underlying', 'expiry', 'S', 'K', 'T', 'r', 'bid', 'ask', 'type')}
+    numeric = {name: np.asarray(columns[name], dtype=float)
+               for name in ('S', 'K', 'T', 'r', 'bid', 'ask')}
+    return write_chain(store_path, columns['underlying'], columns['expiry'],
+                       option_type=columns['type'], **numeric)
+
+class ChainSlice:
+    """
+    A contiguous range of rows of a ChainStore
+
+    Column attributes (S, K, T, r, bid, ask, flags) are views into the
+    memory map, so nothing is read from disk until they are used.
+    """
+
+    def __init__(self, columns, start, stop):
+        self.start, self.stop = start, stop
+        for name, column in columns.items():
+            setattr(self, name, column[start:stop])
+
+    def __len__(self):
+        return self.stop - self.start
+
+    @property
+    def is_call(self):
+        return (self.flags & FLAG_CALL).astype(bool)
+
+    @property
+    def option_type(self):
+        return np.where(self.is_call, 'call', 'put')
+
+    @property
+    def mid(self):
+        return 0.5 * (self.bid + self.ask)
+
+    def price(self, sigma, outputs=None):
+        """Price the slice with blackScholes_batch at the given volatility(ies)"""
+        return blackScholes_batch(self.S, self.K, self.T, self.r, sigma, outputs=outputs)
+
+    def implied_volatility(self, price=None, **kwargs):
+        """Implied volatilities of the slice from mid prices (or the given prices)"""
+        if price is None:
+            price = self.mid
+        return calculate_implied_volatility_batch(self.S, self.K, self.T, self.r, price,
+                                                  self.option_type, **kwargs)
+
+class ChainStore:
+    """
+    Read-only view of a chain store directory written by write_chain
+
+    Parameters:
+    path: Store directory
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE)) as f:
+            index = json.load(f)
+        if index['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported chain store version: {index['version']}")
+
+        self.rows = index['rows']
+        self.columns = {}
+        for name, dtype in index['columns'].items():
+            if self.rows:
+                self.columns[name] = np.memmap(_column_path(path, name), dtype=dtype, mode='r',
+                                               shape=(self.rows,))
+            else:
+                self.columns[name] = np.empty(0, dtype=dtype)
+        self.groups = {(u, e): (start, stop) for u, e, start, stop in index['groups']}
+
+    def __len__(self):
+        return self.rows
+
+    def keys(self):
+        """All (underlying, expiry) pairs in the store, in row order"""
+        return list(self.groups)
+
+    def underlyings(self):
+        return sorted({underlying for underlying, _ in self.groups})
+
+    def expiries(self, underlying):
+        return [expiry for u, expiry in self.groups if u == underlying]
+
+    def slice(self, underlying, expiry=None):
+        """
+        Rows of one underlying, optionally restricted to one expiry
+
+        Rows are sorted by underlying first, so all expiries of an
+        underlying also form a single contiguous range.
+        """
+        if expiry is not None:
+            if (underlying, expiry) not in self.groups:
+                raise KeyError(f"No quotes for {underlying} {expiry}")
+            start, stop = self.groups[(underlying, expiry)]
+        else:
+            ranges = [rows for (u, _), rows in self.groups.items() if u == underlying]
+            if not ranges:
+                raise KeyError(f"No quotes for {underlying}")
+            start, stop = ranges[0][0], ranges[-1][1]
+        return ChainSlice(self.columns, start, stop)
+
+    def all(self):
+        return ChainSlice(self.columns, 0, self.rows)
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    # Synthetic chain: 200 underlyings x 12 expiries x 50 strikes x call/put
+    rng = np.random.default_rng(0)
+    n_under, n_exp, n_strike = 200, 12, 50
+    n = n_under * n_exp * n_strike * 2
+    underlying = np.repeat([f"U{i:03d}" for i in range(n_under)], n_exp * n_strike * 2)
+    months = [f"2025-{m:02d}-15" for m in range(1, n_exp + 1)]
+    expiry = np.tile(np.repeat(months, n_strike * 2), n_under)
+    S = np.repeat(rng.uniform(20, 500, n_under), n_exp * n_strike * 2)
+    T = np.tile(np.repeat(np.arange(1, n_exp + 1) / 12, n_strike * 2), n_under)
+    K = S * np.tile(np.repeat(np.linspace(0.7, 1.3, n_strike), 2), n_under * n_exp)
+    option_type = np.tile(['call', 'put'], n // 2)
+    prices = blackScholes_batch(S, K, T, 0.04, 0.25)
+    mid = np.where(option_type == 'call', prices['call_price'], prices['put_price'])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_chain(tmp, underlying, expiry, S, K, T, 0.04, mid * 0.99, mid * 1.01, option_type)
+        start = time.perf_counter()
+        store = ChainStore(tmp)
+        print(f"Opened {len(store):,} quotes in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+        chain = store.slice('U042', '2025-06-15')
+        start = time.perf_counter()
+        iv = chain.implied_volatility()
+        print(f"IV for {len(chain)} quotes in {(time.perf_counter() - start) * 1000:.2f} ms, "
+              f"median {np.nanmedian(iv):.4f}")
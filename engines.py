@@ -0,0 +1,243 @@
+"""
+Pricing engine registry
+A single entry point for "price these contracts" that routes each request
+to the fastest available backend for its size: the scalar blackScholes for
+a handful of contracts, blackScholes_batch for arrays, a process pool for
+very large books, and a Numba-compiled loop when Numba is installed.
+Thresholds live in THRESHOLDS and can be tuned at runtime; any backend can
+also be requested by name.
+"""
+
+import importlib.util
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from formulas import (DEFAULT_OUTPUTS, blackScholes, blackScholes_batch, cost_of_carry,
+                      evaluate_curves, resolve_outputs)
+
+# Batch sizes at which each backend takes over (tunable)
+THRESHOLDS = {
+    'vectorized': 8,
+    'numba': 50_000,
+    'parallel': 2_000_000
+}
+
+# Worker processes for the parallel backend (None: one per CPU)
+WORKERS = None
+
+# Shared worker pool of the parallel backend, started on first use
+_POOL = None
+_POOL_WORKERS = None
+
+def _broadcast(S, K, T, r, sigma, q, model):
+    arrays = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q)))
+    model = np.broadcast_to(np.asarray(model), arrays[0].shape)
+    return arrays, model
+
+def _scalar_engine(S, K, T, r, sigma, outputs, q, model):
+    """Loop the scalar blackScholes over the contracts"""
+    (S, K, T, r, sigma, q), model = _broadcast(S, K, T, r, sigma, q, model)
+    columns = [x.ravel().tolist() for x in (S, K, T, r, sigma)]
+    rows = [blackScholes(*row, outputs=outputs, q=q_, model=model_)
+            for *row, q_, model_ in zip(*columns, q.ravel().tolist(), model.ravel().tolist())]
+    return {name: np.array([row[name] for row in rows], dtype=float).reshape(S.shape)
+            for name in outputs}
+
+def _vectorized_engine(S, K, T, r, sigma, outputs, q, model):
+    return blackScholes_batch(S, K, T, r, sigma, outputs, q, model)
+
+def _price_block(S, K, T, r, sigma, outputs, q, model):
+    return blackScholes_batch(S, K, T, r, sigma, outputs, q, model)
+
+def _pool(workers):
+    """The shared process pool, (re)started when the worker count changes"""
+    global _POOL, _POOL_WORKERS
+    if _POOL is None or _POOL_WORKERS != workers:
+        if _POOL is not None:
+            _POOL.shutdown()
+        _POOL = ProcessPoolExecutor(max_workers=workers)
+        _POOL_WORKERS = workers
+    return _POOL
+
+def shutdown_pool():
+    """Stop the parallel backend's worker processes (restarted on the next call)"""
+    global _POOL, _POOL_WORKERS
+    if _POOL is not None:
+        _POOL.shutdown()
+    _POOL, _POOL_WORKERS = None, None
+
+def _parallel_engine(S, K, T, r, sigma, outputs, q, model):
+    """Split the contracts into blocks priced by blackScholes_batch in worker processes"""
+    (S, K, T, r, sigma, q), model = _broadcast(S, K, T, r, sigma, q, model)
+    columns = [x.ravel() for x in (S, K, T, r, sigma, q, model)]
+    workers = WORKERS or os.cpu_count() or 1
+    n_blocks = 4 * workers
+    S_, K_, T_, r_, sigma_, q_, model_ = (np.array_split(column, n_blocks) for column in columns)
+    results = list(_pool(workers).map(_price_block, S_, K_, T_, r_, sigma_, [outputs] * n_blocks,
+                                      q_, model_))
+    return {name: np.concatenate([result[name] for result in results]).reshape(S.shape)
+            for name in outputs}
+
+def _default_outputs_kernel(S, K, T, r, sigma, b, out):
+    """
+    Prices and first-order Greeks (DEFAULT_OUTPUTS order) row by row
+
+    Written in the numba-compatible subset of Python; compiled with
+    numba.njit(parallel=True) when Numba is installed.
+    """
+    for i in _prange(S.shape[0]):
+        if T[i] <= 0 or sigma[i] <= 0:
+            for j in range(8):
+                out[j, i] = 0.0
+            continue
+        sqrt_T = math.sqrt(T[i])
+        sig_sqrt_T = sigma[i] * sqrt_T
+        d1 = (math.log(S[i] / K[i]) + (b[i] + 0.5 * sigma[i] ** 2) * T[i]) / sig_sqrt_T
+        d2 = d1 - sig_sqrt_T
+        discount = math.exp(-r[i] * T[i])
+        carry_discount = math.exp((b[i] - r[i]) * T[i])
+        nd1 = 0.5 * math.erfc(-d1 / math.sqrt(2.0))
+        nd2 = 0.5 * math.erfc(-d2 / math.sqrt(2.0))
+        n_minus_d1 = 0.5 * math.erfc(d1 / math.sqrt(2.0))
+        n_minus_d2 = 0.5 * math.erfc(d2 / math.sqrt(2.0))
+        forward_pdf = carry_discount * math.exp(-0.5 * d1 * d1) / math.sqrt(2.0 * math.pi)
+        decay = -S[i] * forward_pdf * sigma[i] / (2.0 * sqrt_T)
+        delta_call = carry_discount * nd1
+        delta_put = -carry_discount * n_minus_d1
+        out[0, i] = S[i] * carry_discount * nd1 - K[i] * discount * nd2
+        out[1, i] = K[i] * discount * n_minus_d2 - S[i] * carry_discount * n_minus_d1
+        out[2, i] = delta_call
+        out[3, i] = delta_put
+        out[4, i] = forward_pdf / (S[i] * sig_sqrt_T)
+        out[5, i] = decay - (b[i] - r[i]) * S[i] * delta_call - r[i] * K[i] * discount * nd2
+        out[6, i] = decay - (b[i] - r[i]) * S[i] * delta_put + r[i] * K[i] * discount * n_minus_d2
+        out[7, i] = S[i] * sqrt_T * forward_pdf
+
+_prange = range
+_compiled_kernel = None
+
+def _numba_kernel():
+    """Compile the default-outputs kernel on first use"""
+    global _compiled_kernel, _prange
+    if _compiled_kernel is None:
+        import numba
+        _prange = numba.prange
+        _compiled_kernel = numba.njit(parallel=True, cache=True)(_default_outputs_kernel)
+    return _compiled_kernel
+
+def _run_kernel(kernel, S, K, T, r, sigma, outputs, q, model):
+    (S, K, T, r, sigma, q), model = _broadcast(S, K, T, r, sigma, q, model)
+    b, _ = cost_of_carry(r, q, model, np)
+    b = np.broadcast_to(b, S.shape)
+    out = np.empty((len(DEFAULT_OUTPUTS), S.size))
+    kernel(*(np.ascontiguousarray(x).ravel() for x in (S, K, T, r, sigma, b)), out)
+    return {name: out[DEFAULT_OUTPUTS.index(name)].reshape(S.shape) for name in outputs}
+
+def _numba_engine(S, K, T, r, sigma, outputs, q, model):
+    return _run_kernel(_numba_kernel(), S, K, T, r, sigma, outputs, q, model)
+
+# name -> (function, is_available, supports(outputs))
+ENGINES = {}
+
+def register_engine(name, function, available=True, supports=None):
+    """
+    Add (or replace) a backend in the registry
+
+    Parameters:
+    name: Engine name
+    function: Callable(S, K, T, r, sigma, outputs, q, model) returning a
+              dict of arrays broadcast over the inputs
+    available: Bool, or a callable evaluated when the engine is selected
+    supports: Optional callable(outputs) returning whether the engine can
+              produce those outputs
+    """
+    ENGINES[name] = (function, available, supports or (lambda outputs: True))
+
+def is_available(name):
+    available = ENGINES[name][1]
+    return bool(available() if callable(available) else available)
+
+def available_engines():
+    """Names of the registered engines that can run here"""
+    return [name for name in ENGINES if is_available(name)]
+
+register_engine('scalar', _scalar_engine)
+register_engine('vectorized', _vectorized_engine)
+register_engine('parallel', _parallel_engine,
+                available=lambda: (WORKERS or os.cpu_count() or 1) > 1)
+register_engine('numba', _numba_engine,
+                available=lambda: importlib.util.find_spec('numba') is not None,
+                supports=lambda outputs: set(outputs) <= set(DEFAULT_OUTPUTS))
+
+def select_engine(size, outputs=None):
+    """
+    Name of the backend the registry would use for a batch
+
+    Parameters:
+    size: Number of contracts
+    outputs: Requested outputs (some backends only produce a subset)
+
+    Returns:
+    str: Engine name
+    """
+    outputs = resolve_outputs(outputs)
+
+    def usable(name):
+        return name in ENGINES and is_available(name) and ENGINES[name][2](outputs)
+
+    if size < THRESHOLDS['vectorized']:
+        return 'scalar'
+    if size >= THRESHOLDS['parallel'] and usable('parallel'):
+        return 'parallel'
+    if size >= THRESHOLDS['numba'] and usable('numba'):
+        return 'numba'
+    return 'vectorized'
+
+def price(S, K, T, r, sigma, outputs=None, q=0.0, model='black_scholes', engine=None):
+    """
+    Price contracts on the best backend for the batch size
+
+    Takes the arguments of blackScholes_batch. A call where every input is
+    a scalar returns plain floats like blackScholes; otherwise each output
+    is an array broadcast over the inputs.
+
+    Parameters:
+    S, K, T, r, sigma, q, model: As in blackScholes_batch (r, sigma and q may
+                                 be term structures)
+    outputs: Names of the values to return, as in blackScholes
+    engine: Force a backend by name instead of choosing by size
+
+    Returns:
+    dict: The requested prices and Greeks
+    """
+    outputs = resolve_outputs(outputs)
+    r, sigma, q = evaluate_curves(T, r, sigma, q)
+    if all(np.ndim(x) == 0 for x in (S, K, T, r, sigma, q, model)) and engine is None:
+        return blackScholes(S, K, T, r, sigma, outputs, q, model)
+
+    if engine is None:
+        engine = select_engine(np.broadcast(*(np.asarray(x) for x in (S, K, T, r, sigma, q))).size,
+                               outputs)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}. Choose from {tuple(ENGINES)}")
+    if not is_available(engine):
+        raise ValueError(f"Engine {engine!r} is not available here")
+    if not ENGINES[engine][2](outputs):
+        raise ValueError(f"Engine {engine!r} cannot produce {outputs}")
+    return ENGINES[engine][0](S, K, T, r, sigma, outputs, q, model)
+
+if __name__ == "__main__":
+    import time
+
+    print("Pricing Engines")
+    print("=" * 50)
+    print(f"Available: {', '.join(available_engines())}")
+    for n in (1, 100, 10_000, 1_000_000):
+        S = np.random.default_rng(0).uniform(80, 120, n)
+        start = time.perf_counter()
+        price(S, 100, 0.5, 0.05, 0.2)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{n:>9} contracts -> {select_engine(n):<10} {elapsed:9.2f} ms")
@@ -0,0 +1,201 @@
+"""
+Batched finite-difference Greeks for arbitrary pricers
+Computes Greeks of any pricing callable with the blackScholes_batch
+signature by stacking every bumped scenario into a single batched call.
+Monte Carlo pricers that draw one set of random numbers per call (rather
+than per row) therefore reuse the same paths across all bumps, which is
+what keeps their Greeks stable.
+"""
+
+import numpy as np
+
+from formulas import blackScholes_batch, expire
+
+# Greeks this engine can produce
+FD_GREEKS = ('delta_call', 'delta_put', 'gamma', 'vega', 'theta_call', 'theta_put',
+             'rho_call', 'rho_put', 'vanna', 'volga')
+
+# Default bump sizes: relative for S, absolute for the others
+DEFAULT_BUMPS = {
+    'S': 1e-3,
+    'sigma': 1e-3,
+    'T': 1 / 365,
+    'r': 1e-4
+}
+
+AXES = ('S', 'sigma', 'T', 'r')
+
+def _steps_for(greeks, scheme):
+    """Unit bump vectors (along S, sigma, T, r) needed for the requested Greeks"""
+    first = [(-1, 1)] if scheme == 'central' else [(0, 1)]
+    steps = {(0, 0, 0, 0)}
+
+    def along(axis, offsets):
+        for offset in offsets:
+            step = [0, 0, 0, 0]
+            step[AXES.index(axis)] = offset
+            steps.add(tuple(step))
+
+    for greek in greeks:
+        if greek.startswith('delta'):
+            along('S', *first)
+        elif greek == 'gamma':
+            along('S', (-1, 1))
+        elif greek == 'vega':
+            along('sigma', *first)
+        elif greek == 'volga':
+            along('sigma', (-1, 1))
+        elif greek.startswith('theta'):
+            along('T', *first)
+        elif greek.startswith('rho'):
+            along('r', *first)
+        elif greek == 'vanna':
+            steps.update({(i, j, 0, 0) for i in (-1, 1) for j in (-1, 1)})
+    return sorted(steps)
+
+def fd_greeks(pricer, S, K, T, r, sigma, greeks=FD_GREEKS, scheme='central', bumps=None,
+              **pricer_kwargs):
+    """
+    Finite-difference Greeks of a pricer, with all bumps in one batched call
+
+    Parameters:
+    pricer: Callable(S, K, T, r, sigma, **kwargs) returning a dict with
+            'call_price' and 'put_price' arrays broadcast over its inputs
+    S, K, T, r, sigma: Contract inputs (scalars or arrays)
+    greeks: Names of the Greeks to compute, from FD_GREEKS
+    scheme: 'central' (second-order accurate) or 'forward' differences for
+            first derivatives; second derivatives are always central
+    bumps: Overrides for DEFAULT_BUMPS (S is relative, the rest absolute)
+    pricer_kwargs: Passed to every pricer call (e.g. seed, n_paths)
+
+    Returns:
+    dict: Requested Greeks, each an array over the contracts. Greeks that
+          are shared by calls and puts in Black-Scholes (gamma, vega,
+          vanna, volga) are taken from the call price. Expired contracts
+          (T <= 0) get formulas.expiry_values: the intrinsic slope as delta
+          and zero for the other Greeks.
+    """
+    unknown = [greek for greek in greeks if greek not in FD_GREEKS]
+    if unknown:
+        raise ValueError(f"Unknown greeks: {unknown}. Choose from {FD_GREEKS}")
+    if scheme not in ('central', 'forward'):
+        raise ValueError(f"Unknown scheme: {scheme}")
+
+    S, K, T, r, sigma = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma)))
+    bumps = {**DEFAULT_BUMPS, **(bumps or {})}
+    # Expired rows have no time to bump; price them at a placeholder expiry and replace them below
+    expired = T <= 0
+    T = np.where(expired, bumps['T'], T)
+    h = {
+        'S': bumps['S'] * S,
+        'sigma': np.full(S.shape, bumps['sigma']),
+        # Keep T - h positive for short-dated contracts
+        'T': np.minimum(bumps['T'], 0.5 * T),
+        'r': np.full(S.shape, bumps['r'])
+    }
+
+    # Stack every scenario along a new leading axis and price them together
+    steps = _steps_for(greeks, scheme)
+    offsets = np.array(steps, dtype=float).reshape(len(steps), 4, *([1] * S.ndim))
+    S_, sigma_, T_, r_ = (base + offsets[:, i] * h[axis]
+                          for i, (axis, base) in enumerate(zip(AXES, (S, sigma, T, r))))
+    result = pricer(S_, K, T_, r_, sigma_, **pricer_kwargs)
+    index = {step: i for i, step in enumerate(steps)}
+
+    def price(kind, **step):
+        vector = tuple(step.get(axis, 0) for axis in AXES)
+        return np.asarray(result[f"{kind}_price"])[index[vector]]
+
+    def first(kind, axis):
+        if scheme == 'central':
+            return (price(kind, **{axis: 1}) - price(kind, **{axis: -1})) / (2 * h[axis])
+        return (price(kind, **{axis: 1}) - price(kind)) / h[axis]
+
+    def second(kind, axis):
+        return ((price(kind, **{axis: 1}) - 2 * price(kind) + price(kind, **{axis: -1}))
+                / h[axis] ** 2)
+
+    output = {}
+    for greek in greeks:
+        kind = 'put' if greek.endswith('_put') else 'call'
+        if greek.startswith('delta'):
+            output[greek] = first(kind, 'S')
+        elif greek == 'gamma':
+            output[greek] = second(kind, 'S')
+        elif greek == 'vega':
+            output[greek] = first(kind, 'sigma')
+        elif greek == 'volga':
+            output[greek] = second(kind, 'sigma')
+        elif greek.startswith('theta'):
+            output[greek] = -first(kind, 'T')
+        elif greek.startswith('rho'):
+            output[greek] = first(kind, 'r')
+        elif greek == 'vanna':
+            output[greek] = (price(kind, S=1, sigma=1) - price(kind, S=1, sigma=-1)
+                             - price(kind, S=-1, sigma=1) + price(kind, S=-1, sigma=-1)
+                             ) / (4 * h['S'] * h['sigma'])
+    return expire(output, S, K, np.where(expired, 0.0, T))
+
+def monte_carlo_european(S, K, T, r, sigma, n_paths=100_000, seed=0, path_batch=20_000):
+    """
+    Monte Carlo European call and put prices with the blackScholes_batch signature
+
+    One stream of antithetic normals is drawn per call and shared by every
+    contract row, so fd_greeks gets common random numbers across bumps.
+    Paths are processed in batches to bound memory.
+
+    Parameters:
+    S, K, T, r, sigma: Contract inputs (scalars or arrays)
+    n_paths: Number of paths (rounded up to an even number)
+    seed: Random seed
+    path_batch: Paths per batch
+
+    Returns:
+    dict: 'call_price' and 'put_price' arrays broadcast over the inputs
+    """
+    S, K, T, r, sigma = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma)))
+    rng = np.random.default_rng(seed)
+    drift = ((r - 0.5 * sigma ** 2) * T)[..., None]
+    diffusion = (sigma * np.sqrt(T))[..., None]
+    call_sum = np.zeros(S.shape)
+    put_sum = np.zeros(S.shape)
+    half = (n_paths + 1) // 2
+
+    for start in range(0, half, path_batch // 2):
+        z = rng.standard_normal(min(path_batch // 2, half - start))
+        z = np.concatenate((z, -z))
+        ST = S[..., None] * np.exp(drift + diffusion * z)
+        call_sum += np.maximum(ST - K[..., None], 0).sum(axis=-1)
+        put_sum += np.maximum(K[..., None] - ST, 0).sum(axis=-1)
+
+    discount = np.exp(-r * T) / (2 * half)
+    return {'call_price': call_sum * discount, 'put_price': put_sum * discount}
+
+def validate_against_analytic(pricer=blackScholes_batch, S=100.0, K=None, T=0.5, r=0.05,
+                              sigma=0.2, greeks=FD_GREEKS, scheme='central', bumps=None,
+                              **pricer_kwargs):
+    """
+    Compare finite-difference Greeks of a pricer with the analytic ones in formulas.py
+
+    Returns:
+    dict: Maximum absolute error per Greek over the contracts
+    """
+    if K is None:
+        K = np.linspace(80, 120, 9)
+    numeric = fd_greeks(pricer, S, K, T, r, sigma, greeks, scheme, bumps, **pricer_kwargs)
+    analytic = blackScholes_batch(S, K, T, r, sigma, outputs=list(greeks))
+    return {greek: float(np.max(np.abs(numeric[greek] - analytic[greek]))) for greek in greeks}
+
+if __name__ == "__main__":
+    print("Finite-Difference Greeks Validation")
+    print("=" * 50)
+    closed_form = validate_against_analytic()
+    mc = validate_against_analytic(monte_carlo_european, bumps={'S': 0.01, 'sigma': 0.01},
+                                   greeks=('delta_call', 'delta_put', 'gamma', 'vega'),
+                                   n_paths=200_000)
+    print(f"{'greek':<12}{'closed form':>14}{'monte carlo':>14}")
+    for greek, error in closed_form.items():
+        mc_error = f"{mc[greek]:14.2e}" if greek in mc else f"{'-':>14}"
+        print(f"{greek:<12}{error:14.2e}{mc_error}")
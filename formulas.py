@@ -1,64 +1,338 @@
 import math
-from scipy.stats import norm
+from functools import cached_property
 
-def blackScholes(S, K, T, r, sigma):
+# numpy and scipy are imported inside the batch functions that need them, so
+# scalar pricing (the CLI, GUI and worker start-up path) only pays for math
+
+# Outputs returned when no explicit selection is made
+DEFAULT_OUTPUTS = ('call_price', 'put_price', 'delta_call', 'delta_put', 'gamma',
+                   'theta_call', 'theta_put', 'vega')
+
+# Rho and second/third-order sensitivities, available on request
+HIGHER_ORDER_OUTPUTS = ('rho_call', 'rho_put', 'vanna', 'volga', 'charm_call', 'charm_put',
+                        'speed', 'color', 'zomma', 'ultima')
+
+ALL_OUTPUTS = DEFAULT_OUTPUTS + HIGHER_ORDER_OUTPUTS
+
+SQRT_2PI = math.sqrt(2 * math.pi)
+SQRT_2 = math.sqrt(2)
+
+# Pricing models covered by the generalized kernel
+MODELS = ('black_scholes', 'black76', 'garman_kohlhagen')
+
+def resolve_outputs(outputs):
+    """Normalize an outputs selection to a tuple of known output names"""
+    if outputs is None:
+        return DEFAULT_OUTPUTS
+    if outputs == 'all':
+        return ALL_OUTPUTS
+    if isinstance(outputs, str):
+        outputs = (outputs,)
+    unknown = [name for name in outputs if name not in ALL_OUTPUTS]
+    if unknown:
+        raise ValueError(f"Unknown outputs: {unknown}. Choose from {ALL_OUTPUTS}")
+    return tuple(outputs)
+
+def norm_cdf(x):
+    """Standard normal cumulative distribution function for a float"""
+    return 0.5 * math.erfc(-x / SQRT_2)
+
+def cost_of_carry(r, q, model, xp):
+    """
+    Cost of carry b for each contract and whether it moves with r
+    
+    Parameters:
+    r, q: Risk-free rate and continuous dividend (or foreign) yield
+    model: Name from MODELS, or an array of names with xp=numpy
+    xp: math for scalars or numpy for arrays
+    
+    Returns:
+    tuple: (b, db_dr) where db_dr is 1 when b = r - q and 0 for Black-76
+    """
+    if xp is not math:
+        np = xp
+        model = np.asarray(model)
+        unknown = np.setdiff1d(model, MODELS)
+        if unknown.size:
+            raise ValueError(f"Unknown models: {list(unknown)}. Choose from {MODELS}")
+        futures = model == 'black76'
+        return np.where(futures, 0.0, r - q), np.where(futures, 0.0, 1.0)
+    if model not in MODELS:
+        raise ValueError(f"Unknown model: {model}. Choose from {MODELS}")
+    return (0.0, 0.0) if model == 'black76' else (r - q, 1.0)
+
+def evaluate_curves(T, *inputs):
+    """
+    Replace term-structure inputs by their values at each contract's expiry
+    
+    Any input with an at_expiry(T) method (see term_structure) is evaluated
+    at T; plain numbers and arrays pass through unchanged.
+    """
+    return tuple(x.at_expiry(T) if hasattr(x, 'at_expiry') else x for x in inputs)
+
+class _BlackScholesTerms:
+    """
+    Intermediates of one generalized Black-Scholes-Merton evaluation
+    
+    d1 and d2 are computed up front; everything else (the normal pdf and
+    cdfs, the discount factors and each output) is computed on first access
+    and then shared, so unrequested outputs cost nothing. Works on floats
+    with xp=math or on arrays with xp=numpy. With carry b = r (the default)
+    this is plain Black-Scholes.
+    """
+    
+    def __init__(self, S, K, T, r, sigma, xp, cdf, b=None, db_dr=1.0):
+        if b is None:
+            b = r
+        self.S, self.K, self.T, self.r, self.sigma = S, K, T, r, sigma
+        self.b, self.db_dr = b, db_dr
+        self.xp, self.cdf = xp, cdf
+        self.sqrt_T = xp.sqrt(T)
+        self.sig_sqrt_T = sigma * self.sqrt_T
+        self.d1 = (xp.log(S / K) + (b + 0.5 * sigma ** 2) * T) / self.sig_sqrt_T
+        self.d2 = self.d1 - self.sig_sqrt_T
+    
+    @cached_property
+    def pdf_d1(self):
+        return self.xp.exp(-0.5 * self.d1 ** 2) / SQRT_2PI
+    
+    @cached_property
+    def discount(self):
+        return self.xp.exp(-self.r * self.T)
+    
+    # e^((b - r)T): the dividend / foreign-rate discount applied to S
+    @cached_property
+    def carry_discount(self):
+        return self.xp.exp((self.b - self.r) * self.T)
+    
+    @cached_property
+    def nd1(self):
+        return self.cdf(self.d1)
+    
+    @cached_property
+    def nd2(self):
+        return self.cdf(self.d2)
+    
+    # N(-d) is evaluated directly rather than as 1 - N(d) to keep deep OTM values accurate
+    @cached_property
+    def n_minus_d1(self):
+        return self.cdf(-self.d1)
+    
+    @cached_property
+    def n_minus_d2(self):
+        return self.cdf(-self.d2)
+    
+    @cached_property
+    def forward_pdf(self):
+        return self.carry_discount * self.pdf_d1
+    
+    @cached_property
+    def decay(self):
+        return -self.S * self.forward_pdf * self.sigma / (2 * self.sqrt_T)
+    
+    # Prices and first-order Greeks
+    @cached_property
+    def call_price(self):
+        return self.S * self.carry_discount * self.nd1 - self.K * self.discount * self.nd2
+    
+    @cached_property
+    def put_price(self):
+        return (self.K * self.discount * self.n_minus_d2
+                - self.S * self.carry_discount * self.n_minus_d1)
+    
+    @cached_property
+    def delta_call(self):
+        return self.carry_discount * self.nd1
+    
+    @cached_property
+    def delta_put(self):
+        return -self.carry_discount * self.n_minus_d1
+    
+    @cached_property
+    def gamma(self):
+        return self.forward_pdf / (self.S * self.sig_sqrt_T)
+    
+    @cached_property
+    def theta_call(self):
+        return (self.decay - (self.b - self.r) * self.S * self.delta_call
+                - self.r * self.K * self.discount * self.nd2)
+    
+    @cached_property
+    def theta_put(self):
+        return (self.decay - (self.b - self.r) * self.S * self.delta_put
+                + self.r * self.K * self.discount * self.n_minus_d2)
+    
+    @cached_property
+    def vega(self):
+        return self.S * self.sqrt_T * self.forward_pdf
+    
+    # Rho holds q fixed, so b moves with r except for Black-76 where b = 0
+    @cached_property
+    def rho_call(self):
+        return self.T * (self.db_dr * self.S * self.delta_call - self.call_price)
+    
+    @cached_property
+    def rho_put(self):
+        return self.T * (self.db_dr * self.S * self.delta_put - self.put_price)
+    
+    # Second and third-order Greeks (charm and color are per year of elapsed time, like theta)
+    @cached_property
+    def vanna(self):
+        return -self.forward_pdf * self.d2 / self.sigma
+    
+    @cached_property
+    def volga(self):
+        return self.vega * self.d1 * self.d2 / self.sigma
+    
+    @cached_property
+    def charm_call(self):
+        return (self.forward_pdf * (self.d2 / (2 * self.T) - self.b / self.sig_sqrt_T)
+                + (self.r - self.b) * self.delta_call)
+    
+    @cached_property
+    def charm_put(self):
+        return (self.forward_pdf * (self.d2 / (2 * self.T) - self.b / self.sig_sqrt_T)
+                + (self.r - self.b) * self.delta_put)
+    
+    @cached_property
+    def speed(self):
+        return -self.gamma / self.S * (self.d1 / self.sig_sqrt_T + 1)
+    
+    @cached_property
+    def color(self):
+        return self.gamma * (self.r - self.b + self.b * self.d1 / self.sig_sqrt_T
+                             + (1 - self.d1 * self.d2) / (2 * self.T))
+    
+    @cached_property
+    def zomma(self):
+        return self.gamma * (self.d1 * self.d2 - 1) / self.sigma
+    
+    @cached_property
+    def ultima(self):
+        d1d2 = self.d1 * self.d2
+        return -self.vega / self.sigma ** 2 * (d1d2 * (1 - d1d2) + self.d1 ** 2 + self.d2 ** 2)
+
+def blackScholes(S, K, T, r, sigma, outputs=None, q=0.0, model='black_scholes'):
     """
     Calculate Black-Scholes option prices and Greeks
     
     Parameters:
-    S: Current stock price
+    S: Current stock price (futures price for Black-76, spot rate for FX)
     K: Strike price
     T: Time to expiration (in years)
     r: Risk-free interest rate
     sigma: Volatility
+    outputs: Names of the values to return (see ALL_OUTPUTS), 'all', or
+             None for prices, delta, gamma, theta and vega
+    q: Continuous dividend yield (foreign risk-free rate for FX)
+    model: 'black_scholes', 'black76' or 'garman_kohlhagen'
     
     Returns:
-    dict: Dictionary containing call price, put price, and Greeks
+    dict: Dictionary containing the requested prices and Greeks
     """
+    outputs = resolve_outputs(outputs)
+    b, db_dr = cost_of_carry(r, q, model, math)
     if T <= 0 or sigma <= 0:
-        return {
-            'call_price': 0,
-            'put_price': 0,
-            'delta_call': 0,
-            'delta_put': 0,
-            'gamma': 0,
-            'theta_call': 0,
-            'theta_put': 0,
-            'vega': 0
-        }
-    
-    d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
-    d2 = d1 - sigma * math.sqrt(T)
-    
-    # Option prices
-    call_price = S * norm.cdf(d1) - K * math.exp(-r * T) * norm.cdf(d2)
-    put_price = K * math.exp(-r * T) * norm.cdf(-d2) - S * norm.cdf(-d1)
-    
-    # Greeks
-    delta_call = norm.cdf(d1)
-    delta_put = delta_call - 1
-    gamma = norm.pdf(d1) / (S * sigma * math.sqrt(T))
-    theta_call = (-S * norm.pdf(d1) * sigma / (2 * math.sqrt(T)) - 
-                  r * K * math.exp(-r * T) * norm.cdf(d2))
-    theta_put = (-S * norm.pdf(d1) * sigma / (2 * math.sqrt(T)) + 
-                 r * K * math.exp(-r * T) * norm.cdf(-d2))
-    vega = S * math.sqrt(T) * norm.pdf(d1)
-    
-    return {
-        'call_price': call_price,
-        'put_price': put_price,
-        'delta_call': delta_call,
-        'delta_put': delta_put,
-        'gamma': gamma,
-        'theta_call': theta_call,
-        'theta_put': theta_put,
-        'vega': vega
+        return {name: 0 for name in outputs}
+    
+    terms = _BlackScholesTerms(S, K, T, r, sigma, math, norm_cdf, b, db_dr)
+    return {name: getattr(terms, name) for name in outputs}
+
+def blackScholes_batch(S, K, T, r, sigma, outputs=None, q=0.0, model='black_scholes'):
+    """
+    Vectorized generalized Black-Scholes-Merton over arrays of contracts
+    
+    Inputs are broadcast against each other, so any mix of scalars and
+    arrays is accepted. The model can be chosen per row, so a book mixing
+    equities, futures and FX options prices in one call. Contracts with
+    T <= 0 or sigma <= 0 get zeros, matching blackScholes.
+    
+    Parameters:
+    S: Current stock price(s) (futures price for Black-76, spot rate for FX)
+    K: Strike price(s)
+    T: Time(s) to expiration (in years)
+    r: Risk-free interest rate(s), or a RateCurve
+    sigma: Volatility(ies), or a VolTermStructure
+    outputs: Names of the values to return, as in blackScholes
+    q: Continuous dividend yield(s) (foreign risk-free rate for FX), or a
+       RateCurve of yields
+    model: Model name, or an array of names with one per contract
+    
+    Returns:
+    dict: The requested prices and Greeks, each mapped to an array
+    """
+    import numpy as np
+    from scipy.special import ndtr
+    
+    outputs = resolve_outputs(outputs)
+    r, sigma, q = evaluate_curves(T, r, sigma, q)
+    S, K, T, r, sigma, q = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, K, T, r, sigma, q)))
+    b, db_dr = cost_of_carry(r, q, model, np)
+    valid = (T > 0) & (sigma > 0)
+    T_safe = np.where(valid, T, 1.0)
+    sigma_safe = np.where(valid, sigma, 1.0)
+    
+    terms = _BlackScholesTerms(S, K, T_safe, r, sigma_safe, np, ndtr, b, db_dr)
+    return {name: np.where(valid, getattr(terms, name), 0.0) for name in outputs}
+
+def expiry_values(S, K, outputs=None):
+    """
+    Prices and Greeks of options at expiry
+    
+    The convention for every expired contract: the intrinsic value, its
+    slope (1 or -1 in the money, 0 out of it) as delta and zero for every
+    other Greek.
+    
+    Parameters:
+    S: Current stock price(s)
+    K: Strike price(s)
+    outputs: Names of the values to return, as in blackScholes
+    
+    Returns:
+    dict: The requested values, each an array broadcast over S and K
+    """
+    import numpy as np
+    
+    outputs = resolve_outputs(outputs)
+    S, K = np.broadcast_arrays(np.asarray(S, dtype=float), np.asarray(K, dtype=float))
+    values = {
+        'call_price': np.maximum(S - K, 0.0),
+        'put_price': np.maximum(K - S, 0.0),
+        'delta_call': (S > K).astype(float),
+        'delta_put': -(S < K).astype(float)
     }
+    return {name: values.get(name, np.zeros(S.shape)) for name in outputs}
+
+def expire(result, S, K, T):
+    """
+    Replace the expired rows of a pricing result by their expiry_values
+    
+    Parameters:
+    result: Dictionary of output name -> array, e.g. from blackScholes_batch
+    S, K, T: The inputs the result was priced at; rows with T <= 0 are replaced
+    
+    Returns:
+    dict: The same outputs, with expired rows at expiry values
+    """
+    import numpy as np
+    
+    expired = np.asarray(T) <= 0
+    if not np.any(expired):
+        return result
+    at_expiry = expiry_values(S, K, [name for name in result if name in ALL_OUTPUTS])
+    return {name: np.where(expired, at_expiry[name], values) if name in at_expiry else values
+            for name, values in result.items()}
 
-def calculate_implied_volatility(S, K, T, r, option_price, option_type='call', tolerance=1e-5, max_iterations=100):
+def calculate_implied_volatility(S, K, T, r, option_price, option_type='call', tolerance=1e-5,
+                                 max_iterations=100, initial_guess=None):
     """
     Calculate implied volatility using Newton-Raphson method
     
+    Steps are safeguarded by a bracket around the solution, as in
+    calculate_implied_volatility_batch, which also sets the conventions for
+    prices that have no implied volatility.
+    
     Parameters:
     S: Current stock price
     K: Strike price
@@ -68,18 +342,32 @@ def calculate_implied_volatility(S, K, T, r, option_price, option_type='call', t
     option_type: 'call' or 'put'
     tolerance: Convergence tolerance
     max_iterations: Maximum number of iterations
+    initial_guess: Starting volatility (default 0.5), e.g. the previous
+                   tick's IV or approximate_implied_volatility
     
     Returns:
-    float: Implied volatility
+    float: Implied volatility (0 where the price is not positive, NaN where
+           T or the initial guess is not positive, the price is outside the
+           no-arbitrage bounds or the solver did not converge)
     """
+    # Initial guess
+    sigma = 0.5 if initial_guess is None else initial_guess
+    if T <= 0 or sigma <= 0:
+        return math.nan
     if option_price <= 0:
         return 0
     
-    # Initial guess
-    sigma = 0.5
+    # A call is worth between its discounted intrinsic value and S, a put between
+    # its discounted intrinsic value and K e^(-rT); no volatility reaches the bounds
+    strike = K * math.exp(-r * T)
+    upper = S if option_type == 'call' else strike
+    lower = max(S - strike if option_type == 'call' else strike - S, 0)
+    if not lower < option_price < upper:
+        return math.nan
+    low, high = 0.0, math.inf
     
     for i in range(max_iterations):
-        result = blackScholes(S, K, T, r, sigma)
+        result = blackScholes(S, K, T, r, sigma, outputs=('call_price', 'put_price', 'vega'))
         price = result['call_price'] if option_type == 'call' else result['put_price']
         vega = result['vega']
         
@@ -88,15 +376,126 @@ def calculate_implied_volatility(S, K, T, r, option_price, option_type='call', t
         if abs(diff) < tolerance:
             return sigma
         
-        if abs(vega) < 1e-10:
+        # Price increases with volatility, so each evaluation narrows the bracket;
+        # Newton steps leaving it (or without usable vega) bisect or double instead
+        if diff > 0:
+            low = sigma
+        else:
+            high = sigma
+        newton = sigma + diff / vega if abs(vega) >= 1e-10 else math.nan
+        if low < newton < high:
+            sigma = newton
+        else:
+            sigma = 0.5 * (low + high) if high < math.inf else 2 * sigma
+    
+    return math.nan
+
+def calculate_implied_volatility_batch(S, K, T, r, option_price, option_type='call', tolerance=1e-5,
+                                       max_iterations=100, q=0.0, model='black_scholes',
+                                       initial_guess=None, return_iterations=False):
+    """
+    Vectorized implied volatility using Newton-Raphson over arrays of quotes
+    
+    Each iteration prices only the quotes that have not converged yet, in
+    one blackScholes_batch call. Inputs are broadcast against each other.
+    Every evaluation narrows a per-quote bracket around the solution (the
+    price increases with volatility), and Newton steps that leave the
+    bracket, or that have no usable vega, are replaced by bisection or by
+    doubling while no upper bound is known.
+    
+    Parameters:
+    S: Current stock price(s)
+    K: Strike price(s)
+    T: Time(s) to expiration
+    r: Risk-free interest rate(s), or a RateCurve
+    option_price: Market price(s) of the options
+    option_type: 'call' or 'put', or an array of them with one per quote
+    tolerance: Convergence tolerance
+    max_iterations: Maximum number of iterations
+    q: Dividend yield(s) or a RateCurve of yields, as in blackScholes_batch
+    model: Model name(s), as in blackScholes_batch
+    initial_guess: Starting volatility, scalar or one per quote (default 0.5)
+    return_iterations: Also return the number of Newton steps each quote took
+    
+    Returns:
+    ndarray: Implied volatilities (0 where the price is not positive,
+             NaN where the solver did not converge), plus the iteration
+             counts when return_iterations is set
+    """
+    import numpy as np
+    
+    r, q = evaluate_curves(T, r, q)
+    S, K, T, r, price, q = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, K, T, r, option_price, q)))
+    is_call = np.broadcast_to(np.asarray(option_type) == 'call', S.shape)
+    model = np.broadcast_to(np.asarray(model), S.shape)
+    
+    sigma = np.array(np.broadcast_to(0.5 if initial_guess is None else initial_guess, S.shape),
+                     dtype=float)
+    implied = np.where(price > 0, np.nan, 0.0)
+    iterations = np.zeros(S.shape, dtype=int)
+    low = np.zeros(S.shape)
+    high = np.full(S.shape, np.inf)
+    active = np.flatnonzero(price > 0)
+    
+    for i in range(max_iterations):
+        if active.size == 0:
             break
-            
-        sigma = sigma + diff / vega
+        result = blackScholes_batch(S.flat[active], K.flat[active], T.flat[active], r.flat[active],
+                                    sigma.flat[active], outputs=('call_price', 'put_price', 'vega'),
+                                    q=q.flat[active], model=model.flat[active])
+        model_price = np.where(is_call.flat[active], result['call_price'], result['put_price'])
+        diff = price.flat[active] - model_price
         
-        # Ensure sigma stays positive
-        sigma = max(0.001, sigma)
+        converged = np.abs(diff) < tolerance
+        implied.flat[active[converged]] = sigma.flat[active[converged]]
+        
+        active, diff, vega = active[~converged], diff[~converged], result['vega'][~converged]
+        current = sigma.flat[active]
+        low.flat[active] = np.where(diff > 0, current, low.flat[active])
+        high.flat[active] = np.where(diff < 0, current, high.flat[active])
+        lower, upper = low.flat[active], high.flat[active]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = current + diff / vega
+        fallback = np.where(np.isfinite(upper), 0.5 * (lower + upper), 2 * current)
+        sigma.flat[active] = np.where((newton > lower) & (newton < upper), newton, fallback)
+        iterations.flat[active] += 1
+    
+    if return_iterations:
+        return implied, iterations
+    return implied
+
+def approximate_implied_volatility(S, K, T, r, option_price, option_type='call', q=0.0):
+    """
+    Closed-form implied volatility approximation (Corrado-Miller)
+    
+    Reduces to Brenner-Subrahmanyam at the money. Accurate to a few vol
+    points near the money, which makes it a good Newton starting point.
+    Puts are converted to calls through put-call parity.
+    
+    Parameters:
+    S, K, T, r: Pricing inputs (scalars or arrays)
+    option_price: Market price(s) of the options
+    option_type: 'call' or 'put', or an array of them
+    q: Dividend yield(s)
+    
+    Returns:
+    ndarray: Approximate implied volatilities, clipped to [0.001, 5]
+    """
+    import numpy as np
+    
+    S, K, T, r, price, q = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (S, K, T, r, option_price, q)))
+    forward_S = S * np.exp(-q * T)
+    strike_pv = K * np.exp(-r * T)
+    is_call = np.asarray(option_type) == 'call'
+    call = np.where(is_call, price, price + forward_S - strike_pv)
     
-    return sigma
+    half_gap = call - 0.5 * (forward_S - strike_pv)
+    radicand = np.maximum(half_gap ** 2 - (forward_S - strike_pv) ** 2 / math.pi, 0.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma = SQRT_2PI / (forward_S + strike_pv) * (half_gap + np.sqrt(radicand)) / np.sqrt(T)
+    return np.clip(np.nan_to_num(sigma, nan=0.5), 0.001, 5.0)
 
 if __name__ == "__main__":
     # Test the function
@@ -1,9 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
-from formulas import blackScholes, calculate_implied_volatility
+from formulas import ALL_OUTPUTS, blackScholes, calculate_implied_volatility
+from adaptive_sampling import adaptive_curve
+from engines import price
+from sensitivity import PARAMETERS, sensitivity_grid
+from strategy import PRESETS, single
+from value_surface import cached_surface, spot_range
 
 class OptionsPricerGUI:
     def __init__(self, root):
@@ -23,6 +28,13 @@ class OptionsPricerGUI:
         self.market_price = tk.DoubleVar(value=10.0)
         self.option_type = tk.StringVar(value="call")
         
+        # Output shown by the two-parameter sensitivity heatmaps
+        self.heatmap_output = tk.StringVar(value="call_price")
+        self.heatmap_colorbar = None
+        
+        # Strategy shown in the payoff diagram
+        self.strategy_var = tk.StringVar(value="Single Call & Put")
+        
         self.setup_ui()
         self.update_calculations()
         
@@ -181,6 +193,14 @@ class OptionsPricerGUI:
                        value="time", command=self.update_sensitivity_chart).grid(row=2, column=0, sticky=tk.W)
         ttk.Radiobutton(sensitivity_frame, text="Volatility", variable=self.sensitivity_var, 
                        value="volatility", command=self.update_sensitivity_chart).grid(row=3, column=0, sticky=tk.W)
+        ttk.Radiobutton(sensitivity_frame, text="Spot × Volatility (2D)", variable=self.sensitivity_var, 
+                       value="spot_volatility", command=self.update_sensitivity_chart).grid(row=4, column=0, sticky=tk.W)
+        ttk.Radiobutton(sensitivity_frame, text="Strike × Expiry (2D)", variable=self.sensitivity_var, 
+                       value="strike_expiry", command=self.update_sensitivity_chart).grid(row=5, column=0, sticky=tk.W)
+        heatmap_combo = ttk.Combobox(sensitivity_frame, textvariable=self.heatmap_output,
+                                     values=list(ALL_OUTPUTS), state="readonly", width=12)
+        heatmap_combo.grid(row=6, column=0, sticky=tk.W, pady=(5, 0))
+        heatmap_combo.bind("<<ComboboxSelected>>", lambda event: self.update_sensitivity_chart())
         
         # Risk Metrics
         risk_frame = ttk.LabelFrame(features_frame, text="Risk Metrics", padding="5")
@@ -206,12 +226,23 @@ class OptionsPricerGUI:
         self.time_value_put_label = ttk.Label(risk_frame, text="$0.00")
         self.time_value_put_label.grid(row=4, column=1, padx=(10, 0))
         
+        # Strategy for the payoff diagram
+        strategy_frame = ttk.LabelFrame(features_frame, text="Payoff Strategy", padding="5")
+        strategy_frame.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        strategy_combo = ttk.Combobox(strategy_frame, textvariable=self.strategy_var,
+                                      values=["Single Call & Put"] + list(PRESETS),
+                                      state="readonly", width=20)
+        strategy_combo.grid(row=0, column=0, sticky=tk.W)
+        strategy_combo.bind("<<ComboboxSelected>>", lambda event: self.update_payoff_chart())
+        
     def create_charts_panel(self, parent):
         charts_frame = ttk.LabelFrame(parent, text="Charts & Analysis", padding="10")
         charts_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
         
-        # Create matplotlib figure
-        self.fig, (self.ax1, self.ax2) = plt.subplots(1, 2, figsize=(12, 4))
+        # Create matplotlib figure (Figure rather than pyplot, which we never need to import)
+        self.fig = Figure(figsize=(12, 4))
+        self.ax1, self.ax2 = self.fig.subplots(1, 2)
         self.canvas = FigureCanvasTkAgg(self.fig, charts_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
@@ -298,37 +329,41 @@ class OptionsPricerGUI:
     def update_sensitivity_chart(self):
         """Update sensitivity analysis chart"""
         self.ax1.clear()
+        if self.heatmap_colorbar is not None:
+            self.heatmap_colorbar.remove()
+            self.heatmap_colorbar = None
         
         param_name = self.sensitivity_var.get()
         
+        if param_name in ("spot_volatility", "strike_expiry"):
+            self.draw_sensitivity_heatmap(*(("S", "sigma") if param_name == "spot_volatility" else ("K", "T")))
+            return
+        
+        # (position in the pricer's arguments, range) of the varied parameter
         if param_name == "stock_price":
-            x_range = np.linspace(50, 150, 100)
+            axis, bounds = 0, (50, 150)
             x_label = "Stock Price ($)"
-            param_values = [(S, self.K.get(), self.T.get(), self.r.get(), self.sigma.get()) for S in x_range]
         elif param_name == "strike_price":
-            x_range = np.linspace(50, 150, 100)
+            axis, bounds = 1, (50, 150)
             x_label = "Strike Price ($)"
-            param_values = [(self.S.get(), K, self.T.get(), self.r.get(), self.sigma.get()) for K in x_range]
         elif param_name == "time":
-            x_range = np.linspace(0.1, 5, 100)
+            axis, bounds = 2, (0.1, 5)
             x_label = "Time to Expiry (years)"
-            param_values = [(self.S.get(), self.K.get(), T, self.r.get(), self.sigma.get()) for T in x_range]
         else:  # volatility
-            x_range = np.linspace(0.05, 0.8, 100)
+            axis, bounds = 4, (0.05, 0.8)
             x_label = "Volatility"
-            param_values = [(self.S.get(), self.K.get(), self.T.get(), self.r.get(), sigma) for sigma in x_range]
         
-        call_prices = []
-        put_prices = []
+        base = [self.S.get(), self.K.get(), self.T.get(), self.r.get(), self.sigma.get()]
         
-        for params in param_values:
-            try:
-                result = blackScholes(*params)
-                call_prices.append(result['call_price'])
-                put_prices.append(result['put_price'])
-            except:
-                call_prices.append(0)
-                put_prices.append(0)
+        def curve(x):
+            inputs = list(base)
+            inputs[axis] = x
+            return price(*inputs, outputs=('call_price', 'put_price'))
+        
+        # Points are concentrated where the prices bend
+        x_range, result = adaptive_curve(curve, *bounds)
+        call_prices = result['call_price']
+        put_prices = result['put_price']
         
         self.ax1.plot(x_range, call_prices, label='Call Price', color='blue', linewidth=2)
         self.ax1.plot(x_range, put_prices, label='Put Price', color='red', linewidth=2)
@@ -340,27 +375,40 @@ class OptionsPricerGUI:
         
         self.canvas.draw()
     
+    def draw_sensitivity_heatmap(self, x_param, y_param):
+        """Draw a two-parameter heatmap of the selected output (200 x 200 grid in one call)"""
+        output = self.heatmap_output.get()
+        x, y, Z = sensitivity_grid(self.S.get(), self.K.get(), self.T.get(), self.r.get(),
+                                   self.sigma.get(), x_param, y_param, output)
+        current = dict(S=self.S.get(), K=self.K.get(), T=self.T.get(), sigma=self.sigma.get())
+        
+        contour = self.ax1.contourf(x, y, Z, levels=30, cmap='viridis')
+        self.heatmap_colorbar = self.fig.colorbar(contour, ax=self.ax1)
+        self.ax1.plot(current[x_param], current[y_param], 'rx', markersize=10)
+        self.ax1.set_xlabel(PARAMETERS[x_param][1])
+        self.ax1.set_ylabel(PARAMETERS[y_param][1])
+        self.ax1.set_title(f'{output.replace("_", " ").title()} Sensitivity')
+        
+        self.canvas.draw()
+    
     def update_payoff_chart(self):
         """Update payoff diagram chart"""
         self.ax2.clear()
         
-        S_range = np.linspace(50, 150, 100)
-        K = self.K.get()
-        
-        # Payoff calculations
-        call_payoff = np.maximum(S_range - K, 0)
-        put_payoff = np.maximum(K - S_range, 0)
+        if self.strategy_var.get() in PRESETS:
+            self.draw_strategy_payoff()
+            return
         
-        # Current option prices
-        call_price = blackScholes(self.S.get(), K, self.T.get(), self.r.get(), self.sigma.get())['call_price']
-        put_price = blackScholes(self.S.get(), K, self.T.get(), self.r.get(), self.sigma.get())['put_price']
+        S, K, T, r, sigma = self.S.get(), self.K.get(), self.T.get(), self.r.get(), self.sigma.get()
         
-        # Profit/Loss (subtract option premium)
-        call_profit = call_payoff - call_price
-        put_profit = put_payoff - put_price
-        
-        self.ax2.plot(S_range, call_profit, label='Call Profit/Loss', color='blue', linewidth=2)
-        self.ax2.plot(S_range, put_profit, label='Put Profit/Loss', color='red', linewidth=2)
+        # Payoffs and premiums both come from the cached surfaces, so moving the
+        # T slider reads a different time slice instead of repricing
+        for option_type, color in (('call', 'blue'), ('put', 'red')):
+            option = single(option_type, K, T)
+            surface = cached_surface(option, r, sigma, S_range=spot_range(option))
+            profit = surface.at(0.0)['value'] - surface.value_at(S, T)
+            self.ax2.plot(surface.S, profit, label=f'{option_type.title()} Profit/Loss',
+                          color=color, linewidth=2)
         self.ax2.axhline(y=0, color='black', linestyle='--', alpha=0.5)
         self.ax2.axvline(x=K, color='green', linestyle='--', alpha=0.5, label=f'Strike Price (${K})')
         self.ax2.set_xlabel('Stock Price at Expiry ($)')
@@ -371,6 +419,31 @@ class OptionsPricerGUI:
         
         self.canvas.draw()
 
+    def draw_strategy_payoff(self):
+        """Draw profit/loss of the selected multi-leg strategy, entered at today's prices"""
+        S, T, r, sigma = self.S.get(), self.T.get(), self.r.get(), self.sigma.get()
+        strategy = PRESETS[self.strategy_var.get()](self.K.get(), T).with_premiums(S, r, sigma)
+        
+        # Curves come from a surface cached per (strategy, K, r, sigma), so moving
+        # the T slider only interpolates between stored time slices
+        surface = cached_surface(strategy, r, sigma, S_range=spot_range(strategy))
+        cost = strategy.cost
+        
+        self.ax2.plot(surface.S, surface.at(0.0)['value'] - cost, label='Profit/Loss at Expiry',
+                      color='blue', linewidth=2)
+        self.ax2.plot(surface.S, surface.at(T)['value'] - cost, label='Profit/Loss Today',
+                      color='orange', linewidth=2, linestyle='--')
+        self.ax2.axhline(y=0, color='black', linestyle='--', alpha=0.5)
+        for breakeven in strategy.breakevens(r, sigma):
+            self.ax2.axvline(x=breakeven, color='green', linestyle=':', alpha=0.7)
+        self.ax2.set_xlabel('Stock Price at Expiry ($)')
+        self.ax2.set_ylabel('Profit/Loss ($)')
+        self.ax2.set_title(f'{strategy.name} (net cost ${cost:.2f})')
+        self.ax2.legend()
+        self.ax2.grid(True, alpha=0.3)
+        
+        self.canvas.draw()
+
 def main():
     root = tk.Tk()
     app = OptionsPricerGUI(root)
@@ -0,0 +1,212 @@
+"""
+Persistent implied-volatility cache
+SQLite-backed cache of implied volatilities keyed by a quantized
+fingerprint of (S, K, T, r, price, type) and the solver settings, shared
+safely between processes and across restarts. Whole chains are looked up
+and inserted in bulk, the cache is bounded with least-recently-used
+eviction, and hit rates are tracked per cache instance.
+"""
+
+import sqlite3
+import time
+
+import numpy as np
+
+from formulas import calculate_implied_volatility_batch
+
+# Quantization step per input; quotes equal after rounding share an entry
+QUANTIZATION = {
+    'S': 1e-6,
+    'K': 1e-6,
+    'T': 1e-8,
+    'r': 1e-8,
+    'price': 1e-8
+}
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_CHUNK = 900
+
+def _splitmix64(z):
+    """SplitMix64 finalizer over a uint64 array (wrapping arithmetic)"""
+    with np.errstate(over='ignore'):
+        z = z + np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def fingerprint(S, K, T, r, price, option_type='call'):
+    """
+    Canonical 64-bit fingerprints of quotes
+
+    Each input is rounded to its QUANTIZATION step and the resulting
+    integers are hashed together, so the key is independent of float
+    formatting and identical in every process.
+
+    Returns:
+    ndarray: int64 fingerprint per quote
+    """
+    values = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (S, K, T, r, price)))
+    is_call = np.broadcast_to(np.asarray(option_type) == 'call', values[0].shape)
+
+    h = _splitmix64(is_call.astype(np.uint64))
+    for name, value in zip(('S', 'K', 'T', 'r', 'price'), values):
+        quantized = np.rint(value / QUANTIZATION[name]).astype(np.int64).view(np.uint64)
+        h = _splitmix64(h ^ quantized)
+    return h.view(np.int64)
+
+def _solver_keys(keys, tolerance, max_iterations):
+    """Fold the solver settings into quote fingerprints (a loose solve never serves a tight one)"""
+    h = np.asarray(keys, dtype=np.int64).view(np.uint64)
+    h = _splitmix64(h ^ np.array(tolerance, dtype=float).view(np.uint64))
+    h = _splitmix64(h ^ np.uint64(max_iterations))
+    return h.view(np.int64)
+
+class IVCache:
+    """
+    Size-bounded persistent cache of implied volatilities
+
+    Every process opens its own IVCache on the same file; SQLite's
+    write-ahead log lets readers and a writer work concurrently. Triggers
+    keep the row count in a one-row table, and every insert checks it and
+    evicts in the same transaction, so the bound holds for the shared file
+    however many processes write to it.
+
+    Parameters:
+    path: SQLite database file
+    max_entries: Entries kept before least-recently-used ones are evicted
+    timeout: Seconds to wait for another process's write lock
+    """
+
+    def __init__(self, path, max_entries=1_000_000, timeout=30.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path, timeout=timeout)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS iv_cache "
+                "(key INTEGER PRIMARY KEY, iv REAL NOT NULL, last_used INTEGER NOT NULL)")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS iv_cache_last_used ON iv_cache (last_used)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS iv_cache_size (entries INTEGER NOT NULL)")
+            self.connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS iv_cache_insert AFTER INSERT ON iv_cache "
+                "BEGIN UPDATE iv_cache_size SET entries = entries + 1; END")
+            self.connection.execute(
+                "CREATE TRIGGER IF NOT EXISTS iv_cache_delete AFTER DELETE ON iv_cache "
+                "BEGIN UPDATE iv_cache_size SET entries = entries - 1; END")
+            # Files written before the size table existed are counted once
+            self.connection.execute(
+                "INSERT INTO iv_cache_size SELECT COUNT(*) FROM iv_cache "
+                "WHERE NOT EXISTS (SELECT 1 FROM iv_cache_size)")
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT entries FROM iv_cache_size").fetchone()[0]
+
+    def get_many(self, keys):
+        """
+        Bulk lookup of fingerprints
+
+        Returns:
+        tuple: (values, found) arrays aligned with keys; values are NaN
+               where found is False
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        cached = {}
+        key_list = keys.tolist()
+        for start in range(0, len(key_list), _LOOKUP_CHUNK):
+            chunk = key_list[start:start + _LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            cached.update(self.connection.execute(
+                f"SELECT key, iv FROM iv_cache WHERE key IN ({placeholders})", chunk))
+
+        found = np.fromiter((key in cached for key in key_list), dtype=bool, count=len(key_list))
+        values = np.fromiter((cached.get(key, np.nan) for key in key_list), dtype=float,
+                             count=len(key_list))
+
+        if cached:
+            now = time.time_ns()
+            with self.connection:
+                self.connection.executemany("UPDATE iv_cache SET last_used = ? WHERE key = ?",
+                                            ((now, key) for key in cached))
+        self.hits += int(found.sum())
+        self.misses += len(key_list) - int(found.sum())
+        return values, found
+
+    def put_many(self, keys, values):
+        """Bulk insert (or refresh) of fingerprint -> value pairs, then evict if over size"""
+        now = time.time_ns()
+        keys = np.asarray(keys, dtype=np.int64).tolist()
+        values = np.asarray(values, dtype=float).tolist()
+        # NaN (solver failure) is never cached
+        rows = [(key, value, now) for key, value in zip(keys, values) if value == value]
+        if not rows:
+            return
+        with self.connection:
+            # An upsert rather than INSERT OR REPLACE: replacing deletes without firing the
+            # delete trigger, which would leave the row count too high
+            self.connection.executemany(
+                "INSERT INTO iv_cache (key, iv, last_used) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET iv = excluded.iv, last_used = excluded.last_used",
+                rows)
+            # The insert holds the write lock, so no other process can change the count before
+            # the eviction commits
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self.connection.execute(
+                    "DELETE FROM iv_cache WHERE key IN "
+                    "(SELECT key FROM iv_cache ORDER BY last_used LIMIT ?)", (excess,))
+
+    def implied_volatility(self, S, K, T, r, option_price, option_type='call', tolerance=1e-5,
+                           max_iterations=100):
+        """
+        Implied volatilities for a chain, solving only the quotes not in the cache
+
+        Takes the same arguments as calculate_implied_volatility_batch for
+        plain Black-Scholes quotes; misses are solved in one batch call and
+        written back in bulk. Entries are keyed by tolerance and
+        max_iterations too, so each solver setting has its own values.
+
+        Returns:
+        ndarray: Implied volatilities
+        """
+        S, K, T, r, price = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, option_price)))
+        option_type = np.broadcast_to(np.asarray(option_type), S.shape)
+        keys = _solver_keys(fingerprint(S, K, T, r, price, option_type), tolerance,
+                            max_iterations)
+        values, found = self.get_many(keys.ravel())
+        values = values.reshape(S.shape)
+        missing = ~found.reshape(S.shape)
+
+        if missing.any():
+            solved = calculate_implied_volatility_batch(S[missing], K[missing], T[missing],
+                                                        r[missing], price[missing],
+                                                        option_type[missing], tolerance,
+                                                        max_iterations)
+            values[missing] = solved
+            self.put_many(keys[missing], solved)
+        return values
+
+    def stats(self):
+        """Hit and miss counts of this instance, with the hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self)
+        }
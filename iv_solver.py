@@ -0,0 +1,104 @@
+"""
+Warm-started implied volatility solver
+Stateful wrapper around calculate_implied_volatility_batch that remembers
+the last implied vol of every contract and uses it as the next Newton
+starting point, so tick-to-tick updates converge in one or two Newton steps.
+Contracts without history are seeded from neighbouring strikes of the same
+expiry, or from the Corrado-Miller closed-form approximation.
+"""
+
+import numpy as np
+
+from formulas import approximate_implied_volatility, calculate_implied_volatility_batch
+
+class IVSolver:
+    """
+    Implied volatility solver with per-contract memory
+
+    Parameters:
+    tolerance: Price tolerance passed to the Newton solver
+    max_iterations: Maximum Newton iterations per solve
+    """
+
+    def __init__(self, tolerance=1e-6, max_iterations=50):
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.last_iv = {}
+        self.last_iterations = None
+
+    def __len__(self):
+        return len(self.last_iv)
+
+    def reset(self, contract_ids=None):
+        """Forget the history of some contracts, or of all of them"""
+        if contract_ids is None:
+            self.last_iv.clear()
+        else:
+            for contract_id in contract_ids:
+                self.last_iv.pop(contract_id, None)
+
+    def initial_guess(self, contract_ids, S, K, T, r, option_price, option_type='call'):
+        """
+        Starting volatilities for a set of quotes
+
+        Priority per quote: the contract's previous IV, then interpolation
+        in log-moneyness between quotes of the same expiry in this call
+        that have history, then the Corrado-Miller approximation.
+
+        Returns:
+        tuple: (guess, source) arrays; source is 'history', 'neighbour'
+               or 'approximation' per quote
+        """
+        S, K, T, r, price = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (S, K, T, r, option_price)))
+        history = np.array([self.last_iv.get(contract_id, np.nan) for contract_id in contract_ids],
+                           dtype=float).reshape(S.shape)
+        guess = history.copy()
+        source = np.where(np.isnan(history), 'approximation', 'history').astype('<U13')
+
+        missing = np.isnan(guess)
+        if missing.any():
+            log_moneyness = np.log(K / S)
+            for expiry in np.unique(T[missing]):
+                same_expiry = T == expiry
+                known = same_expiry & ~np.isnan(history)
+                if not known.any():
+                    continue
+                order = np.argsort(log_moneyness[known])
+                targets = same_expiry & missing
+                guess[targets] = np.interp(log_moneyness[targets], log_moneyness[known][order],
+                                           history[known][order])
+                source[targets] = 'neighbour'
+
+            missing = np.isnan(guess)
+            if missing.any():
+                option_type = np.broadcast_to(np.asarray(option_type), S.shape)
+                guess[missing] = approximate_implied_volatility(
+                    S[missing], K[missing], T[missing], r[missing], price[missing],
+                    option_type[missing])
+        return guess, source
+
+    def solve(self, contract_ids, S, K, T, r, option_price, option_type='call'):
+        """
+        Implied volatilities for a tick or chain, remembering the results
+
+        Parameters:
+        contract_ids: Hashable identifier per quote (e.g. an OCC symbol)
+        S, K, T, r: Pricing inputs per quote
+        option_price: Market price per quote
+        option_type: 'call' or 'put' per quote
+
+        Returns:
+        ndarray: Implied volatilities (NaN where the solver failed); the
+                 Newton steps each quote took are kept in last_iterations
+        """
+        contract_ids = list(contract_ids)
+        guess, _ = self.initial_guess(contract_ids, S, K, T, r, option_price, option_type)
+        implied, self.last_iterations = calculate_implied_volatility_batch(
+            S, K, T, r, option_price, option_type, self.tolerance, self.max_iterations,
+            initial_guess=guess, return_iterations=True)
+
+        for contract_id, iv in zip(contract_ids, np.ravel(implied).tolist()):
+            if iv > 0:
+                self.last_iv[contract_id] = iv
+        return implied
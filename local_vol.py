@@ -0,0 +1,413 @@
+"""
+Dupire local volatility
+Builds a local-volatility surface from option quotes: implied vols from the
+batch solver, one raw SVI fit per expiry as the smoothed implied surface,
+and Dupire's formula in total-variance form evaluated on a (time x
+log-moneyness) grid. The surface is interpolated bilinearly over whole
+arrays of (spot, time) and drives a Crank-Nicolson pricer for vanilla and
+barrier options consistent with the smile. Surfaces are kept between
+requests, and an update refits only the expiries whose quotes changed and
+rebuilds only the grid intervals next to them.
+"""
+
+import time
+
+import numpy as np
+from scipy.linalg import solve_banded
+
+from calibration import calibrate_svi, svi_total_variance
+from exotics import BARRIER_TYPES
+from formulas import blackScholes_batch, calculate_implied_volatility_batch
+from iv_cache import fingerprint
+
+# Local variance is clipped to this range where the fitted surface has
+# (near) calendar or butterfly arbitrage and Dupire's ratio breaks down
+MIN_LOCAL_VARIANCE = 1e-4
+MAX_LOCAL_VARIANCE = 25.0
+
+# Quotes whose vega is below this fraction of the slice's largest are left
+# out of the fit: their prices are too small to pin down a volatility
+MIN_RELATIVE_VEGA = 1e-3
+
+def _svi_derivatives(k, params):
+    """Total variance and its first two log-moneyness derivatives for one SVI slice"""
+    a, b, rho, m, sigma = params
+    shifted = k - m
+    root = np.sqrt(shifted ** 2 + sigma ** 2)
+    return (svi_total_variance(k, *params), b * (rho + shifted / root),
+            b * sigma ** 2 / root ** 3)
+
+def dupire_local_variance(k, w, w_k, w_kk, w_T):
+    """
+    Dupire local variance from total implied variance w(k, T)
+
+    sigma_loc^2 = w_T / (1 - k w_k / w + (-1/4 - 1/w + k^2 / w^2) w_k^2 / 4 + w_kk / 2)
+
+    Parameters:
+    k: Log forward moneyness ln(K / F_T)
+    w, w_k, w_kk, w_T: Total variance and its derivatives at k
+
+    Returns:
+    ndarray: Local variance, clipped to [MIN_LOCAL_VARIANCE, MAX_LOCAL_VARIANCE]
+    """
+    denominator = (1 - k * w_k / w + 0.25 * (-0.25 - 1 / w + k ** 2 / w ** 2) * w_k ** 2
+                   + 0.5 * w_kk)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = np.where(denominator > 0, w_T / denominator, MAX_LOCAL_VARIANCE)
+    return np.clip(variance, MIN_LOCAL_VARIANCE, MAX_LOCAL_VARIANCE)
+
+class LocalVolSurface:
+    """
+    Dupire local volatility on a (time x log forward moneyness) grid
+
+    Total implied variance is interpolated linearly in time between the
+    fitted expiries (and from zero at T = 0), so each grid interval between
+    two expiries depends on those two SVI slices only. Beyond the last
+    expiry the local volatility is held flat in time.
+
+    Parameters:
+    S: Spot price
+    r: Risk-free interest rate
+    q: Continuous dividend yield
+    k_range: (low, high) log forward moneyness covered by the grid
+    n_k: Moneyness grid size
+    steps_per_slice: Grid times per interval between consecutive expiries
+    """
+
+    def __init__(self, S, r=0.0, q=0.0, k_range=(-1.5, 1.5), n_k=301, steps_per_slice=8):
+        self.S, self.r, self.q = float(S), float(r), float(q)
+        self.k = np.linspace(*k_range, n_k)
+        self.steps_per_slice = steps_per_slice
+        self.slices = {}
+        self._intervals = {}
+        self._grid = None
+
+    def forward(self, T):
+        return self.S * np.exp((self.r - self.q) * np.asarray(T, dtype=float))
+
+    def update(self, chain):
+        """
+        Bring the surface in line with a new set of quotes
+
+        Expiries whose quotes are unchanged keep their SVI fit; changed or
+        new expiries are refit (warm-started from the previous fit) and
+        expiries missing from the chain are dropped. Only grid intervals
+        bordering an affected expiry are recomputed.
+
+        Parameters:
+        chain: Mapping with arrays 'K', 'T', 'price' and 'option_type'; an
+               optional 'S' moves the spot (which changes every quote)
+
+        Returns:
+        dict: Expiries refit and removed, intervals rebuilt and build_time
+        """
+        start_time = time.perf_counter()
+        if 'S' in chain:
+            self.S = float(np.ravel(chain['S'])[0])
+        K, T, price = np.broadcast_arrays(
+            *(np.asarray(chain[name], dtype=float) for name in ('K', 'T', 'price')))
+        option_type = np.broadcast_to(np.asarray(chain['option_type']), K.shape)
+        keys = fingerprint(self.S, K, T, self.r, price, option_type)
+
+        expiries = np.unique(T[T > 0])
+        removed = [expiry for expiry in self.slices if expiry not in expiries.tolist()]
+        for expiry in removed:
+            del self.slices[expiry]
+        refit = []
+        for expiry in expiries.tolist():
+            mask = T == expiry
+            slice_keys = np.sort(keys[mask])
+            previous = self.slices.get(expiry)
+            if previous is not None and np.array_equal(previous['keys'], slice_keys):
+                continue
+            implied = calculate_implied_volatility_batch(self.S, K[mask], expiry, self.r,
+                                                         price[mask], option_type[mask], q=self.q)
+            valid = np.isfinite(implied) & (implied > 0)
+            vega = np.zeros_like(implied)
+            vega[valid] = blackScholes_batch(self.S, K[mask][valid], expiry, self.r, implied[valid],
+                                             outputs='vega', q=self.q)['vega']
+            valid &= vega >= MIN_RELATIVE_VEGA * vega.max()
+            if not valid.any():
+                raise ValueError(f"No usable quotes at expiry {expiry}")
+            log_moneyness = np.log(K[mask][valid] / self.forward(expiry))
+            # Far wings still carry less volatility information: weight quotes by vega
+            fit = calibrate_svi(log_moneyness, implied[valid] ** 2 * expiry,
+                                weights=np.sqrt(vega[valid] / vega.max()),
+                                initial=previous['params'] if previous else None)
+            self.slices[expiry] = {'params': fit['params'], 'rmse': fit['rmse'],
+                                   'keys': slice_keys}
+            refit.append(expiry)
+
+        # An interval (T_a, T_b] depends on the slices at its two ends only
+        pillars = [0.0] + sorted(self.slices)
+        wanted = set(zip(pillars[:-1], pillars[1:]))
+        affected = set(refit)
+        self._intervals = {interval: rows for interval, rows in self._intervals.items()
+                           if interval in wanted and not affected & set(interval)}
+        missing = wanted - set(self._intervals)
+        for interval in missing:
+            self._intervals[interval] = self._interval_rows(*interval)
+        self._grid = None
+        return {'refit': refit, 'removed': removed, 'rebuilt': len(missing),
+                'build_time': time.perf_counter() - start_time}
+
+    def _interval_rows(self, T_a, T_b):
+        """Grid times over [T_a, T_b] and their local variance rows"""
+        # Both ends are kept: local vol jumps at an expiry, and interpolating
+        # across one from the neighbouring interval's rows would smear it
+        theta = np.linspace(0, 1, self.steps_per_slice + 1)[:, None]
+        k = self.k[None, :]
+        w_b, w_bk, w_bkk = _svi_derivatives(k, self.slices[T_b]['params'])
+        if T_a > 0:
+            w_a, w_ak, w_akk = _svi_derivatives(k, self.slices[T_a]['params'])
+        else:
+            # Total variance vanishes at T = 0; take the first row just after it
+            w_a = w_ak = w_akk = np.zeros_like(k)
+            theta[0] = 1e-6
+        w, w_k, w_kk = ((1 - theta) * lower + theta * upper
+                        for lower, upper in ((w_a, w_b), (w_ak, w_bk), (w_akk, w_bkk)))
+        w_T = np.broadcast_to((w_b - w_a) / (T_b - T_a), w.shape)
+        return T_a + theta[:, 0] * (T_b - T_a), dupire_local_variance(k, w, w_k, w_kk, w_T)
+
+    @property
+    def grid(self):
+        """(times, local variance rows), assembled from the interval cache"""
+        if self._grid is None:
+            if not self._intervals:
+                raise ValueError("The surface has no expiries; call update() with quotes first")
+            intervals = [self._intervals[key] for key in sorted(self._intervals)]
+            self._grid = (np.concatenate([times for times, _ in intervals]),
+                          np.vstack([rows for _, rows in intervals]))
+        return self._grid
+
+    def local_variance(self, S, t):
+        """
+        Local variance at spot(s) S and time(s) t, by bilinear interpolation
+
+        Moneyness outside the grid is clamped to its edges, times before the
+        first grid row to that row and times after the last expiry to the
+        last row.
+        """
+        times, variance = self.grid
+        S, t = np.broadcast_arrays(np.asarray(S, dtype=float), np.asarray(t, dtype=float))
+        k = np.log(S / self.forward(t))
+
+        position = np.clip((k - self.k[0]) / (self.k[1] - self.k[0]), 0, len(self.k) - 1)
+        column = np.minimum(position.astype(int), len(self.k) - 2)
+        x_weight = position - column
+        # Expiries appear twice (end of one interval, start of the next); the
+        # right-hand search always lands inside a single interval
+        row = np.clip(np.searchsorted(times, t, side='right') - 1, 0, len(times) - 2)
+        t_weight = np.clip((t - times[row]) / (times[row + 1] - times[row]), 0, 1)
+
+        left = (1 - t_weight) * variance[row, column] + t_weight * variance[row + 1, column]
+        right = ((1 - t_weight) * variance[row, column + 1]
+                 + t_weight * variance[row + 1, column + 1])
+        return (1 - x_weight) * left + x_weight * right
+
+    def local_volatility(self, S, t):
+        """Local volatility at spot(s) S and time(s) t"""
+        return np.sqrt(self.local_variance(S, t))
+
+    def implied_volatility(self, K, T):
+        """Smoothed implied volatility from the SVI slices, linear in total variance over T"""
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=float), np.asarray(T, dtype=float))
+        shape = K.shape
+        K, T = K.ravel(), T.ravel()
+        k = np.log(K / self.forward(T))
+        pillars = np.array([0.0] + sorted(self.slices))
+        w_pillars = np.vstack([np.zeros(k.size)] + [
+            svi_total_variance(k, *self.slices[expiry]['params']) for expiry in pillars[1:]])
+        upper = np.clip(np.searchsorted(pillars, T), 1, len(pillars) - 1)
+        weight = (T - pillars[upper - 1]) / (pillars[upper] - pillars[upper - 1])
+        columns = np.arange(k.size)
+        w = (1 - weight) * w_pillars[upper - 1, columns] + weight * w_pillars[upper, columns]
+        # Flat implied volatility beyond the last expiry
+        w = np.where(T > pillars[-1], w_pillars[-1] * T / pillars[-1], w)
+        return np.sqrt(np.maximum(w, 0.0) / T).reshape(shape)
+
+def local_vol_price(surface, K, T, option_type='call', barrier=None, barrier_type='down-and-out',
+                    n_space=400, n_time=200):
+    """
+    Price options on a local-volatility surface with Crank-Nicolson
+
+    The PDE is solved in log spot, backwards from expiry, with the local
+    variance evaluated at each step's midpoint. All strikes share the grid
+    and are solved together as columns of one banded system per step. The
+    first steps are fully implicit (Rannacher) to damp the payoff kink.
+    Barriers are monitored continuously: the grid ends at the barrier with
+    a zero boundary, and knock-ins are priced as vanilla minus knock-out.
+
+    Parameters:
+    surface: LocalVolSurface to price on
+    K: Strike or array of strikes
+    T: Time to expiration (one expiry per call)
+    option_type: 'call' or 'put'
+    barrier: Optional barrier level
+    barrier_type: One of BARRIER_TYPES, when a barrier is given
+    n_space: Log-spot grid intervals
+    n_time: Time steps
+
+    Returns:
+    ndarray: Price per strike
+    """
+    if option_type not in ('call', 'put'):
+        raise ValueError(f"Unknown option type: {option_type}. Choose from ('call', 'put')")
+    if barrier is not None and barrier_type not in BARRIER_TYPES:
+        raise ValueError(f"Unknown barrier type: {barrier_type}. Choose from {BARRIER_TYPES}")
+    K = np.asarray(K, dtype=float)
+    strikes = np.atleast_1d(K)
+    if barrier is not None and barrier_type.endswith('in'):
+        vanilla = local_vol_price(surface, strikes, T, option_type, n_space=n_space, n_time=n_time)
+        out = local_vol_price(surface, strikes, T, option_type, barrier,
+                              barrier_type.replace('in', 'out'), n_space, n_time)
+        return (vanilla - out).reshape(K.shape)
+
+    S0, r, q = surface.S, surface.r, surface.q
+    down = barrier is not None and barrier_type.startswith('down')
+    up = barrier is not None and barrier_type.startswith('up')
+    if (down and S0 <= barrier) or (up and S0 >= barrier):
+        return np.zeros(K.shape)
+
+    # Five standard deviations either side at the wings' own implied vol
+    # (skews make them far wider than at the money), cut off at the barrier
+    width = 5 * float(surface.implied_volatility(S0, T)) * np.sqrt(T)
+    for _ in range(3):
+        wings = surface.implied_volatility(S0 * np.exp([-width, width]), T)
+        width = 5 * float(wings.max()) * np.sqrt(T)
+    width += abs(r - q) * T
+    x_low = np.log(barrier) if down else np.log(S0) - width
+    x_high = np.log(barrier) if up else np.log(S0) + width
+    # Uniform in log spot with today's spot on a node, so no interpolation
+    # error enters at the end
+    x0 = np.log(S0)
+    if down or up:
+        edge = x_low if down else x_high
+        nodes = max(1, round(n_space * abs(x0 - edge) / (x_high - x_low)))
+        dx = abs(x0 - edge) / nodes
+        x = edge + dx * (np.arange(n_space + 1) if down else np.arange(-n_space, 1))
+    else:
+        x = np.linspace(x_low, x_high, 2 * (n_space // 2) + 1)
+        dx = x[1] - x[0]
+    spots = np.exp(x)
+    sign = 1 if option_type == 'call' else -1
+    values = np.maximum(sign * (spots[:, None] - strikes[None, :]), 0.0)
+    if down:
+        values[0] = 0.0
+    if up:
+        values[-1] = 0.0
+
+    dt = T / n_time
+    interior = spots[1:-1]
+    for step in range(n_time):
+        tau = (step + 1) * dt
+        variance = surface.local_variance(interior, T - tau + 0.5 * dt)
+        drift = r - q - 0.5 * variance
+        lower = 0.5 * variance / dx ** 2 - drift / (2 * dx)
+        upper = 0.5 * variance / dx ** 2 + drift / (2 * dx)
+        diagonal = -variance / dx ** 2 - r
+        theta = 1.0 if step < 4 else 0.5
+        substeps = 2 if step < 4 else 1
+        for _ in range(substeps):
+            h = dt / substeps
+            explicit = values[1:-1] + (1 - theta) * h * (
+                lower[:, None] * values[:-2] + diagonal[:, None] * values[1:-1]
+                + upper[:, None] * values[2:])
+            # Dirichlet boundaries: zero at a barrier, discounted intrinsic value otherwise
+            boundary_low = (np.zeros(len(strikes)) if down or sign == 1 else
+                            strikes * np.exp(-r * tau) - spots[0] * np.exp(-q * tau))
+            boundary_high = (np.zeros(len(strikes)) if up or sign == -1 else
+                             spots[-1] * np.exp(-q * tau) - strikes * np.exp(-r * tau))
+            explicit[0] += theta * h * lower[0] * np.maximum(boundary_low, 0.0)
+            explicit[-1] += theta * h * upper[-1] * np.maximum(boundary_high, 0.0)
+            banded = np.zeros((3, len(x) - 2))
+            banded[0, 1:] = -theta * h * upper[:-1]
+            banded[1] = 1 - theta * h * diagonal
+            banded[2, :-1] = -theta * h * lower[1:]
+            values[1:-1] = solve_banded((1, 1), banded, explicit)
+            values[0], values[-1] = np.maximum(boundary_low, 0.0), np.maximum(boundary_high, 0.0)
+
+    prices = np.array([np.interp(x0, x, values[:, i]) for i in range(len(strikes))])
+    return prices.reshape(K.shape)
+
+_SURFACES = {}
+
+def cached_surface(underlying, chain, r=0.0, q=0.0, **grid):
+    """
+    The underlying's LocalVolSurface, kept between calls and updated in place
+
+    Only expiries whose quotes changed since the last call are refit. A
+    different rate, dividend yield or grid starts a new surface. The quote
+    fingerprints include the spot, so any move in chain['S'] refits every
+    expiry (each warm-started from its previous fit): the saving is for
+    requotes at an unchanged spot, e.g. between spot ticks.
+
+    Parameters:
+    underlying: Key identifying the underlying
+    chain: Quotes as in LocalVolSurface.update, including 'S'
+    r, q: Rate and dividend yield
+    grid: LocalVolSurface grid arguments
+
+    Returns:
+    LocalVolSurface
+    """
+    key = (underlying, float(r), float(q), tuple(sorted(grid.items())))
+    surface = _SURFACES.get(key)
+    if surface is None:
+        for stale in [existing for existing in _SURFACES if existing[0] == underlying]:
+            del _SURFACES[stale]
+        surface = _SURFACES[key] = LocalVolSurface(np.ravel(chain['S'])[0], r, q, **grid)
+    surface.update(chain)
+    return surface
+
+def svi_chain(S, r, q, expiries, strikes, params):
+    """
+    Call and put quotes priced off SVI slices (one parameter tuple per expiry)
+
+    Returns:
+    dict: Chain of out-of-the-money quotes usable with LocalVolSurface.update
+    """
+    T = np.repeat(np.asarray(expiries, dtype=float), len(strikes))
+    K = np.tile(np.asarray(strikes, dtype=float), len(expiries))
+    k = np.log(K / (S * np.exp((r - q) * T)))
+    w = np.concatenate([svi_total_variance(k[T == expiry], *slice_params)
+                        for expiry, slice_params in zip(expiries, params)])
+    prices = blackScholes_batch(S, K, T, r, np.sqrt(w / T), outputs=('call_price', 'put_price'),
+                                q=q)
+    is_call = K >= S * np.exp((r - q) * T)
+    return {'S': S, 'K': K, 'T': T,
+            'price': np.where(is_call, prices['call_price'], prices['put_price']),
+            'option_type': np.where(is_call, 'call', 'put')}
+
+if __name__ == "__main__":
+    # An equity-style skew flattening with expiry
+    expiries = [0.1, 0.25, 0.5, 1.0, 2.0]
+    params = [(0.0015 * T, 0.06 * np.sqrt(T), -0.6, 0.02, 0.15) for T in expiries]
+    chain = svi_chain(100.0, 0.03, 0.01, expiries, np.linspace(60, 150, 37), params)
+
+    print("Dupire Local Volatility")
+    print("=" * 50)
+    surface = LocalVolSurface(100.0, 0.03, 0.01)
+    report = surface.update(chain)
+    print(f"Full build: {len(report['refit'])} slices refit, {report['rebuilt']} intervals, "
+          f"{report['build_time'] * 1000:.1f} ms")
+    bumped = dict(chain, price=np.where(chain['T'] == 0.5, chain['price'] * 1.01, chain['price']))
+    report = surface.update(bumped)
+    print(f"One expiry requoted: {len(report['refit'])} slice refit, "
+          f"{report['rebuilt']} intervals, {report['build_time'] * 1000:.1f} ms")
+    report = surface.update(bumped)
+    print(f"Unchanged quotes: {len(report['refit'])} slices refit, "
+          f"{report['build_time'] * 1000:.1f} ms")
+
+    strikes = np.array([80.0, 90.0, 100.0, 110.0, 120.0])
+    print("\nOne-year calls: PDE on local vol vs Black-Scholes at the implied vol")
+    start = time.perf_counter()
+    pde = local_vol_price(surface, strikes, 1.0)
+    pde_ms = (time.perf_counter() - start) * 1000
+    implied = surface.implied_volatility(strikes, 1.0)
+    market = blackScholes_batch(100.0, strikes, 1.0, 0.03, implied, outputs='call_price', q=0.01)
+    for K, price, reference, vol in zip(strikes, pde, market['call_price'], implied):
+        print(f"K={K:5.0f}  IV {vol:6.2%}  PDE {price:8.4f}  BS {reference:8.4f}")
+    print(f"({pde_ms:.1f} ms for all strikes)")
+    out = local_vol_price(surface, strikes, 1.0, 'call', barrier=80.0, barrier_type='down-and-out')
+    print("Down-and-out at 80:", "  ".join(f"{p:.4f}" for p in out))
@@ -0,0 +1,145 @@
+"""
+Real-time P&L attribution
+Splits each interval's P&L of an options book into delta, gamma, vega and
+theta explain plus the unexplained remainder, per position, per underlying
+and for the whole book. The previous snapshot's inputs and Greeks for
+every position live in one (fields x positions) array, and each new
+snapshot is priced and explained in a single vectorized pass that also
+becomes the reference for the next interval.
+"""
+
+import numpy as np
+
+import engines
+from formulas import expire
+
+COMPONENTS = ('delta', 'gamma', 'vega', 'theta', 'unexplained')
+
+# Rows of the per-position state, all taken at the last snapshot
+STATE_FIELDS = ('S', 'sigma', 'T', 'value', 'delta', 'gamma', 'vega', 'theta')
+
+_OUTPUTS = ('call_price', 'put_price', 'delta_call', 'delta_put', 'gamma', 'vega', 'theta_call',
+            'theta_put')
+
+class PnLAttributor:
+    """
+    Greeks explain of an OptionBook between consecutive market snapshots
+
+    Values and Greeks are per contract; quantities are applied when the
+    explain is reported. Expired positions take formulas.expiry_values:
+    their intrinsic value, with its slope as delta and no other Greeks.
+    Each row of the state is readable as an attribute named after its
+    STATE_FIELDS entry (attributor.delta, ...).
+
+    Parameters:
+    book: OptionBook to attribute
+    spots: Spot per underlying at the first snapshot
+    sigma: Implied volatility per position (default: the book's)
+    engine: Pricing backend name, as in engines.price (default: by size)
+    """
+
+    def __init__(self, book, spots, sigma=None, engine=None):
+        self.book = book
+        self.engine = engine
+        # A single model for the whole book skips the per-row model lookup on every snapshot
+        model = np.asarray(book.model)
+        self._model = model.flat[0] if model.size and np.all(model == model.flat[0]) else model
+        self._snapshot(spots, book.sigma if sigma is None else sigma, book.T)
+
+    def __getattr__(self, name):
+        # Named views of the state rows (self.delta, self.T, ...)
+        if name in STATE_FIELDS:
+            return self.state[STATE_FIELDS.index(name)]
+        raise AttributeError(name)
+
+    def _snapshot(self, spots, sigma, T):
+        """Price the book at a snapshot and make it the new state"""
+        book = self.book
+        S = np.asarray(spots, dtype=float)[book.underlying]
+        result = engines.price(S, book.K, T, book.r, sigma, outputs=_OUTPUTS, q=book.q,
+                               model=self._model, engine=self.engine)
+        # Expired positions take the intrinsic value and its slope, so spot moves stay explained
+        result = expire(result, S, book.K, T)
+        call = book.is_call
+        state = np.empty((len(STATE_FIELDS), len(book)))
+        row = dict(zip(STATE_FIELDS, state))
+        row['S'][:], row['sigma'][:], row['T'][:] = S, sigma, T
+        row['gamma'][:], row['vega'][:] = result['gamma'], result['vega']
+        for name, call_name, put_name in (('value', 'call_price', 'put_price'),
+                                          ('delta', 'delta_call', 'delta_put'),
+                                          ('theta', 'theta_call', 'theta_put')):
+            np.copyto(row[name], result[put_name])
+            np.copyto(row[name], result[call_name], where=call)
+        self.state = state
+        return state
+
+    def update(self, spots, sigma=None, dt=0.0):
+        """
+        Explain the P&L since the last snapshot and move the state to this one
+
+        delta dS + gamma dS^2 / 2 + vega dsigma + theta dt, with the Greeks of
+        the previous snapshot; whatever the actual revaluation adds beyond
+        that (higher orders, cross terms, rate moves) is unexplained.
+
+        Parameters:
+        spots: Spot per underlying
+        sigma: Implied volatility per position (default: unchanged)
+        dt: Time elapsed since the last snapshot (in years)
+
+        Returns:
+        dict: 'positions' (component -> P&L per position, plus 'total'),
+        'by_underlying' (component -> P&L per underlying index) and 'book'
+        (component -> float)
+        """
+        previous = self.state
+        S_old, sigma_old, T_old, value_old, delta, gamma, vega, theta = previous
+        new = self._snapshot(spots, sigma_old if sigma is None else sigma,
+                             np.maximum(T_old - dt, 0.0))
+        dS = new[0] - S_old
+        quantity = self.book.quantity
+        positions = {
+            'delta': quantity * delta * dS,
+            'gamma': quantity * 0.5 * gamma * dS ** 2,
+            'vega': quantity * vega * (new[1] - sigma_old),
+            'theta': quantity * theta * dt,
+            'total': quantity * (new[3] - value_old)
+        }
+        positions['unexplained'] = (positions['total'] - positions['delta'] - positions['gamma']
+                                    - positions['vega'] - positions['theta'])
+
+        n_underlyings = int(self.book.underlying.max()) + 1 if len(self.book) else 0
+        by_underlying = {name: np.bincount(self.book.underlying, weights=pnl,
+                                           minlength=n_underlyings)
+                         for name, pnl in positions.items()}
+        return {
+            'positions': positions,
+            'by_underlying': by_underlying,
+            'book': {name: float(pnl.sum()) for name, pnl in by_underlying.items()}
+        }
+
+if __name__ == "__main__":
+    import time
+
+    from value_at_risk import OptionBook
+
+    rng = np.random.default_rng(0)
+    n = 100_000
+    book = OptionBook(underlying=rng.integers(0, 20, n), K=rng.uniform(80, 120, n),
+                      T=rng.uniform(0.02, 2.0, n), sigma=rng.uniform(0.1, 0.5, n),
+                      option_type=rng.choice(['call', 'put'], n),
+                      quantity=rng.integers(-10, 11, n))
+    spots = np.full(20, 100.0)
+    attributor = PnLAttributor(book, spots)
+
+    print("P&L Attribution (100,000 positions, 20 underlyings)")
+    print("=" * 50)
+    for minutes in (1, 5, 60):
+        dt = minutes / (252 * 6.5 * 60)
+        spots = spots * np.exp(0.2 * np.sqrt(dt) * rng.standard_normal(20))
+        sigma = attributor.sigma + 0.002 * rng.standard_normal(20)[book.underlying]
+        start = time.perf_counter()
+        explain = attributor.update(spots, sigma, dt)
+        elapsed = (time.perf_counter() - start) * 1000
+        parts = ', '.join(f"{name} {explain['book'][name]:+.2f}" for name in COMPONENTS)
+        print(f"{minutes:3d} min ({elapsed:5.1f} ms): total {explain['book']['total']:+9.2f} = "
+              f"{parts}")
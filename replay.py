@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Historical quote replay harness
+Replays a recorded quote stream in time order through the formulas.py
+engines (implied volatility inversion, then Greeks at the implied vol) and
+reports sustained ticks per second, per-stage latency percentiles and
+solver failures. A speed multiplier paces the replay at real time, a
+multiple of it, or as fast as possible.
+"""
+
+import argparse
+import csv
+import math
+import random
+import sys
+import time
+
+from formulas import blackScholes, calculate_implied_volatility
+
+# Columns of a recorded quote file
+QUOTE_FIELDS = ['timestamp', 'underlying', 'S', 'K', 'T', 'r', 'price', 'type']
+
+STAGES = ('parse', 'iv', 'greeks')
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+def generate_synthetic_quotes(path, n_ticks=10000, n_contracts=50, tick_interval=0.01,
+                              seed=0):
+    """
+    Write a synthetic quote stream for tests and benchmarks
+
+    Spot follows a random walk and each tick quotes one of n_contracts
+    contracts at its Black-Scholes price under a slowly drifting vol.
+
+    Parameters:
+    path: Output CSV path
+    n_ticks: Number of quotes
+    n_contracts: Number of distinct contracts quoted
+    tick_interval: Mean seconds between ticks
+    seed: Random seed
+    """
+    rng = random.Random(seed)
+    contracts = [(rng.choice([0.8, 0.9, 0.95, 1.0, 1.05, 1.1, 1.2]),
+                  rng.choice([0.08, 0.25, 0.5, 1.0]), rng.choice(['call', 'put']))
+                 for _ in range(n_contracts)]
+    spot, vol, timestamp = 100.0, 0.25, 0.0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(QUOTE_FIELDS)
+        for _ in range(n_ticks):
+            timestamp += rng.expovariate(1 / tick_interval)
+            spot *= math.exp(rng.gauss(0, 0.0005))
+            vol = min(max(vol + rng.gauss(0, 0.001), 0.1), 0.6)
+            moneyness, T, option_type = rng.choice(contracts)
+            K = round(100 * moneyness, 2)
+            result = blackScholes(spot, K, T, 0.04, vol)
+            price = result['call_price'] if option_type == 'call' else result['put_price']
+            writer.writerow([f"{timestamp:.6f}", 'SYN', f"{spot:.4f}", K, T, 0.04,
+                             f"{price:.4f}", option_type])
+
+def read_quotes(path):
+    """
+    Stream raw quote rows from a recorded file, checking time order
+
+    Yields:
+    dict: One CSV row per tick, with fields as strings
+    """
+    last = -math.inf
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            timestamp = float(row['timestamp'])
+            if timestamp < last:
+                raise ValueError(f"Quote stream is not in time order at timestamp {timestamp}")
+            last = timestamp
+            yield row
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(p / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+def replay(path, speed=None, price_tolerance=1e-3, max_ticks=None):
+    """
+    Replay a quote file through IV inversion and Greeks
+
+    Parameters:
+    path: Recorded quote CSV (see QUOTE_FIELDS)
+    speed: Replay speed as a multiple of real time (1, 10, ...), or None
+           to run as fast as possible
+    price_tolerance: A tick counts as a solver failure when repricing at
+                     the implied vol misses the quote by more than this
+    max_ticks: Stop after this many ticks
+
+    Returns:
+    dict: Tick count, elapsed time, ticks/s, latency percentiles per stage
+          (in microseconds), solver failures and maximum lag behind schedule
+    """
+    latencies = {stage: [] for stage in STAGES}
+    failures = 0
+    ticks = 0
+    max_lag = 0.0
+    first_timestamp = None
+    clock = time.perf_counter_ns
+    start = time.perf_counter()
+
+    for row in read_quotes(path):
+        if max_ticks is not None and ticks >= max_ticks:
+            break
+        timestamp = float(row['timestamp'])
+        if first_timestamp is None:
+            first_timestamp = timestamp
+
+        # Pace the replay against the recorded timestamps
+        if speed:
+            due = (timestamp - first_timestamp) / speed
+            now = time.perf_counter() - start
+            if due > now:
+                time.sleep(due - now)
+            else:
+                max_lag = max(max_lag, now - due)
+
+        t0 = clock()
+        S, K, T, r = float(row['S']), float(row['K']), float(row['T']), float(row['r'])
+        price, option_type = float(row['price']), row['type']
+        t1 = clock()
+        iv = calculate_implied_volatility(S, K, T, r, price, option_type)
+        t2 = clock()
+        result = blackScholes(S, K, T, r, iv)
+        t3 = clock()
+
+        latencies['parse'].append((t1 - t0) / 1000)
+        latencies['iv'].append((t2 - t1) / 1000)
+        latencies['greeks'].append((t3 - t2) / 1000)
+
+        model_price = result['call_price'] if option_type == 'call' else result['put_price']
+        if not iv > 0 or abs(model_price - price) > price_tolerance:
+            failures += 1
+        ticks += 1
+
+    elapsed = time.perf_counter() - start
+    stage_stats = {}
+    for stage, values in latencies.items():
+        values.sort()
+        stage_stats[stage] = {f"p{p:g}": percentile(values, p) for p in PERCENTILES}
+        stage_stats[stage]['max'] = values[-1] if values else 0.0
+
+    return {
+        'ticks': ticks,
+        'elapsed_s': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+        'latency_us': stage_stats,
+        'solver_failures': failures,
+        'max_lag_s': max_lag
+    }
+
+def print_report(report, speed=None):
+    print("Quote Replay Report")
+    print("=" * 50)
+    print(f"Speed: {'as fast as possible' if not speed else f'{speed:g}x real time'}")
+    print(f"Ticks: {report['ticks']:,} in {report['elapsed_s']:.2f} s")
+    print(f"Throughput: {report['ticks_per_second']:,.0f} ticks/s")
+    print(f"Solver failures: {report['solver_failures']}")
+    if speed:
+        print(f"Max lag behind schedule: {report['max_lag_s'] * 1000:.1f} ms")
+    print("\nLatency per stage (µs):")
+    header = "".join(f"{name:>10}" for name in report['latency_us']['iv'])
+    print(f"{'stage':<8}{header}")
+    for stage, stats in report['latency_us'].items():
+        print(f"{stage:<8}" + "".join(f"{value:10.1f}" for value in stats.values()))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded quotes through the pricing stack")
+    parser.add_argument('path', help="Quote CSV file (created with --synthetic if missing)")
+    parser.add_argument('--speed', type=float, default=None,
+                        help="Multiple of real time (default: as fast as possible)")
+    parser.add_argument('--synthetic', type=int, default=None, metavar='N',
+                        help="First write N synthetic ticks to path")
+    parser.add_argument('--max-ticks', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        generate_synthetic_quotes(args.path, args.synthetic)
+    report = replay(args.path, speed=args.speed, max_ticks=args.max_ticks)
+    print_report(report, args.speed)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,19 +5,13 @@ Checks dependencies and launches the GUI application
 """
 
 import sys
-import subprocess
-import importlib
+import importlib.util
 
 def check_dependencies():
-    """Check if all required packages are installed"""
+    """Check if all required packages are installed (without importing them)"""
     required_packages = ['numpy', 'scipy', 'matplotlib']
-    missing_packages = []
-    
-    for package in required_packages:
-        try:
-            importlib.import_module(package)
-        except ImportError:
-            missing_packages.append(package)
+    missing_packages = [package for package in required_packages
+                        if importlib.util.find_spec(package) is None]
     
     if missing_packages:
         print("Missing required packages:", missing_packages)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the headless pricing path
+Runs a pricing snippet in fresh interpreters under `python -X importtime`,
+reports where import time goes and checks it against a start-up budget
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+# Scalar pricing as done by the CLI and worker processes
+HEADLESS_SNIPPET = "from formulas import blackScholes; blackScholes(100, 100, 1, 0.05, 0.2)"
+
+# Budget for the snippet on top of bare interpreter start-up
+BUDGET_MS = 50.0
+
+# Packages the headless path must not pull in
+HEAVY_PACKAGES = ('numpy', 'scipy', 'matplotlib', 'plotly', 'streamlit', 'pyarrow')
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output
+
+    Returns:
+    list: (module, self_us, cumulative_us, depth) per imported module
+    """
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return records
+
+def _run(code, importtime=False):
+    """Run code in a fresh interpreter, returning (wall_ms, stderr)"""
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    start = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return (time.perf_counter() - start) * 1000, completed.stderr
+
+def measure(snippet=HEADLESS_SNIPPET, runs=5):
+    """
+    Measure start-up cost of a snippet
+
+    Parameters:
+    snippet: Python code to run in a fresh interpreter
+    runs: Number of timed runs (the median is reported)
+
+    Returns:
+    dict: Wall times, overhead over a bare interpreter and the import profile
+    """
+    baseline_ms = statistics.median(_run('pass')[0] for _ in range(runs))
+    snippet_ms = statistics.median(_run(snippet)[0] for _ in range(runs))
+    _, stderr = _run(snippet, importtime=True)
+    baseline_modules = {record[0] for record in parse_importtime(_run('pass', importtime=True)[1])}
+
+    # Only modules the snippet added on top of interpreter start-up
+    records = [record for record in parse_importtime(stderr) if record[0] not in baseline_modules]
+    heavy = sorted({name.split('.')[0] for name, _, _, _ in records
+                    if name.split('.')[0] in HEAVY_PACKAGES})
+    return {
+        'baseline_ms': baseline_ms,
+        'snippet_ms': snippet_ms,
+        'overhead_ms': snippet_ms - baseline_ms,
+        'import_ms': sum(record[2] for record in records if record[3] == 0) / 1000,
+        'records': records,
+        'heavy_packages': heavy
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--snippet', default=HEADLESS_SNIPPET, help="Code to benchmark")
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS,
+                        help="Allowed start-up overhead over a bare interpreter")
+    parser.add_argument('--runs', type=int, default=5, help="Timed runs per measurement")
+    parser.add_argument('--top', type=int, default=10, help="Slowest imports to list")
+    parser.add_argument('--allow-heavy', action='store_true',
+                        help="Do not fail when numpy/scipy/plotting packages are imported")
+    args = parser.parse_args(argv)
+
+    result = measure(args.snippet, args.runs)
+
+    print("Startup Benchmark")
+    print("=" * 50)
+    print(f"Snippet: {args.snippet}")
+    print(f"Bare interpreter:   {result['baseline_ms']:8.1f} ms")
+    print(f"With snippet:       {result['snippet_ms']:8.1f} ms")
+    print(f"Overhead:           {result['overhead_ms']:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"Import time:        {result['import_ms']:8.1f} ms")
+
+    print("\nSlowest imports (cumulative):")
+    slowest = sorted(result['records'], key=lambda record: record[2], reverse=True)[:args.top]
+    for name, self_us, cumulative_us, depth in slowest:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {'  ' * depth}{name}")
+
+    ok = result['overhead_ms'] <= args.budget_ms
+    if result['heavy_packages']:
+        print(f"\n{'!' if args.allow_heavy else '✗'} Heavy packages imported: "
+              f"{', '.join(result['heavy_packages'])}")
+        ok = ok and args.allow_heavy
+    print("\n✓ Within budget" if ok else "\n✗ Over budget")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Multi-leg option strategies
+A Strategy holds its legs as parallel arrays (type, strike, expiry,
+quantity, premium). Payoff, value and Greeks over a whole spot grid are a
+single (legs x grid) broadcast through blackScholes_batch, and breakevens
+come from a bisection run on every bracketing interval at once. Presets
+build the common spreads, straddles, condors and butterflies.
+"""
+
+import numpy as np
+
+from formulas import blackScholes_batch, expire, expiry_values
+
+LEG_TYPES = ('call', 'put', 'stock')
+
+class Strategy:
+    """
+    A position made of option and stock legs
+
+    Parameters:
+    option_type: 'call', 'put' or 'stock' per leg
+    K: Strike per leg (ignored for stock)
+    T: Expiry per leg, in years from now (ignored for stock)
+    quantity: Signed units per leg (negative for short legs)
+    premium: Entry price per unit per leg, or None to set it later with
+             with_premiums
+    name: Label used in charts
+    """
+
+    def __init__(self, option_type, K, T, quantity=1, premium=None, name='Strategy'):
+        self.option_type = np.atleast_1d(np.asarray(option_type))
+        n = len(self.option_type)
+        self.K, self.T, self.quantity = (np.broadcast_to(np.asarray(x, dtype=float), (n,)).copy()
+                                         for x in (K, T, quantity))
+        self.premium = None if premium is None else np.broadcast_to(
+            np.asarray(premium, dtype=float), (n,)).copy()
+        self.name = name
+        unknown = set(self.option_type.tolist()) - set(LEG_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown leg types: {sorted(unknown)}. Choose from {LEG_TYPES}")
+        self.is_call = self.option_type == 'call'
+        self.is_put = self.option_type == 'put'
+        self.is_stock = self.option_type == 'stock'
+        # Stock legs go through the pricer with a placeholder strike and are then masked out
+        self._pricing_K = np.where(self.is_stock, 1.0, self.K)[:, None]
+
+    def __len__(self):
+        return len(self.option_type)
+
+    def __repr__(self):
+        return f"Strategy({self.name!r}, {len(self)} legs)"
+
+    @property
+    def expiry(self):
+        """Earliest option expiry, at which the payoff diagram is drawn"""
+        options = ~self.is_stock
+        return float(self.T[options].min()) if options.any() else 0.0
+
+    def with_premiums(self, S, r, sigma, q=0.0):
+        """Copy of the strategy with every leg's premium set to its Black-Scholes value at S"""
+        premium = self._leg_values(np.atleast_1d(float(S)), r, sigma, 0.0, q)[:, 0]
+        return Strategy(self.option_type, self.K, self.T, self.quantity, premium, self.name)
+
+    @property
+    def cost(self):
+        """Net premium paid to enter the position (negative for a credit)"""
+        if self.premium is None:
+            raise ValueError("Premiums are not set; call with_premiums first")
+        return float(self.quantity @ self.premium)
+
+    def _intrinsic(self, S):
+        values = expiry_values(S[None, :], self.K[:, None], ('call_price', 'put_price'))
+        return np.where(self.is_stock[:, None], S[None, :],
+                        np.where(self.is_call[:, None], values['call_price'], values['put_price']))
+
+    def _leg_sigma(self, sigma):
+        sigma = np.asarray(sigma, dtype=float)
+        return sigma[:, None] if sigma.ndim == 1 else sigma
+
+    def _leg_values(self, S, r, sigma, t, q):
+        """Unit value of each leg at each spot, shape (legs, grid)"""
+        remaining = (self.T - t)[:, None]
+        prices = blackScholes_batch(S[None, :], self._pricing_K, remaining, r,
+                                    self._leg_sigma(sigma), outputs=('call_price', 'put_price'),
+                                    q=q)
+        # Expired legs are worth their intrinsic value; stock is worth spot
+        prices = expire(prices, S[None, :], self._pricing_K, remaining)
+        values = np.where(self.is_call[:, None], prices['call_price'], prices['put_price'])
+        return np.where(self.is_stock[:, None], S[None, :], values)
+
+    def payoff(self, S):
+        """
+        Value of the position at expiry (every leg at its intrinsic value)
+
+        Parameters:
+        S: Spot price grid
+
+        Returns:
+        ndarray: Payoff at each spot
+        """
+        S = np.atleast_1d(np.asarray(S, dtype=float))
+        return self.quantity @ self._intrinsic(S)
+
+    def value(self, S, r, sigma, t=0.0, q=0.0):
+        """
+        Value of the position after t years, over a spot grid
+
+        Parameters:
+        S: Spot price grid
+        r: Risk-free interest rate
+        sigma: Volatility, scalar or one per leg
+        t: Time elapsed from now (in years); legs expired by then count at
+           intrinsic value
+        q: Continuous dividend yield
+
+        Returns:
+        ndarray: Position value at each spot
+        """
+        S = np.atleast_1d(np.asarray(S, dtype=float))
+        return self.quantity @ self._leg_values(S, r, sigma, t, q)
+
+    def profit(self, S, r, sigma, t=None, q=0.0):
+        """Value minus entry cost after t years (default: at the earliest expiry)"""
+        t = self.expiry if t is None else t
+        return self.value(S, r, sigma, t, q) - self.cost
+
+    def greeks(self, S, r, sigma, t=0.0, q=0.0):
+        """
+        Position delta, gamma, theta and vega over a spot grid
+
+        Legs expired by time t contribute the slope of their payoff to delta
+        and nothing to the other Greeks (see formulas.expiry_values).
+
+        Returns:
+        dict: Each Greek summed over the legs, as an array over the grid
+        """
+        S = np.atleast_1d(np.asarray(S, dtype=float))
+        names = ('delta_call', 'delta_put', 'gamma', 'theta_call', 'theta_put', 'vega')
+        remaining = (self.T - t)[:, None]
+        legs = blackScholes_batch(S[None, :], self._pricing_K, remaining, r,
+                                  self._leg_sigma(sigma), outputs=names, q=q)
+        # Expired legs keep the slope of their payoff as delta and no other Greeks
+        legs = expire(legs, S[None, :], self._pricing_K, remaining)
+        call = self.is_call[:, None]
+        options = ~self.is_stock[:, None]
+        per_leg = {
+            'delta': np.where(self.is_stock[:, None], 1.0,
+                              np.where(call, legs['delta_call'], legs['delta_put'])),
+            'gamma': np.where(options, legs['gamma'], 0.0),
+            'theta': np.where(options, np.where(call, legs['theta_call'], legs['theta_put']), 0.0),
+            'vega': np.where(options, legs['vega'], 0.0)
+        }
+        return {name: self.quantity @ values for name, values in per_leg.items()}
+
+    def breakevens(self, r, sigma, t=None, q=0.0, S_range=None, grid_points=2001,
+                   tolerance=1e-8):
+        """
+        Spot prices where the profit crosses zero
+
+        The profit is evaluated on a grid, every interval where it changes
+        sign is bracketed, and all brackets are bisected together.
+
+        Parameters:
+        r, sigma, q: Pricing inputs (used for legs alive at time t)
+        t: Time elapsed (default: the earliest expiry)
+        S_range: (low, high) search range (default: 0.01x to 3x the strikes)
+        grid_points: Size of the bracketing grid
+        tolerance: Width at which bisection stops
+
+        Returns:
+        ndarray: Sorted breakeven spot prices
+        """
+        if S_range is None:
+            strikes = self.K[~self.is_stock]
+            S_range = (0.01 * strikes.min(), 3 * strikes.max()) if strikes.size else (0.01, 1000)
+        grid = np.linspace(*S_range, grid_points)
+        profit = self.profit(grid, r, sigma, t, q)
+
+        exact = grid[profit == 0]
+        crossing = np.flatnonzero(np.sign(profit[:-1]) * np.sign(profit[1:]) < 0)
+        low, high = grid[crossing], grid[crossing + 1]
+        low_sign = np.sign(profit[crossing])
+        while low.size and np.max(high - low) > tolerance:
+            middle = 0.5 * (low + high)
+            same = np.sign(self.profit(middle, r, sigma, t, q)) == low_sign
+            low = np.where(same, middle, low)
+            high = np.where(same, high, middle)
+        # Grid points where the profit is exactly zero are breakevens too
+        roots = np.concatenate((exact, 0.5 * (low + high)))
+        return np.unique(np.round(roots, 8))
+
+def single(option_type, K, T, quantity=1):
+    """One call or put"""
+    return Strategy([option_type], [K], [T], [quantity], name=f"Long {option_type.title()}"
+                    if quantity > 0 else f"Short {option_type.title()}")
+
+def straddle(K, T, quantity=1):
+    """Call and put at the same strike"""
+    return Strategy(['call', 'put'], [K, K], T, quantity, name='Straddle')
+
+def strangle(K_put, K_call, T, quantity=1):
+    """Out-of-the-money put and call"""
+    return Strategy(['put', 'call'], [K_put, K_call], T, quantity, name='Strangle')
+
+def vertical_spread(K_long, K_short, T, option_type='call'):
+    """Long one strike, short another of the same type (bull or bear spread)"""
+    return Strategy([option_type, option_type], [K_long, K_short], T, [1, -1],
+                    name=f"Vertical {option_type.title()} Spread")
+
+def butterfly(K_low, K_mid, K_high, T, option_type='call'):
+    """Long the wings, short two at the body"""
+    return Strategy([option_type] * 3, [K_low, K_mid, K_high], T, [1, -2, 1], name='Butterfly')
+
+def iron_condor(K_put_long, K_put_short, K_call_short, K_call_long, T):
+    """Short put spread plus short call spread"""
+    return Strategy(['put', 'put', 'call', 'call'],
+                    [K_put_long, K_put_short, K_call_short, K_call_long], T, [1, -1, -1, 1],
+                    name='Iron Condor')
+
+def covered_call(K, T):
+    """Long stock, short call"""
+    return Strategy(['stock', 'call'], [0.0, K], T, [1, -1], name='Covered Call')
+
+# Presets around a central strike K for the apps
+PRESETS = {
+    'Long Call': lambda K, T: single('call', K, T),
+    'Long Put': lambda K, T: single('put', K, T),
+    'Straddle': lambda K, T: straddle(K, T),
+    'Strangle': lambda K, T: strangle(0.9 * K, 1.1 * K, T),
+    'Bull Call Spread': lambda K, T: vertical_spread(K, 1.1 * K, T, 'call'),
+    'Bear Put Spread': lambda K, T: vertical_spread(K, 0.9 * K, T, 'put'),
+    'Butterfly': lambda K, T: butterfly(0.9 * K, K, 1.1 * K, T),
+    'Iron Condor': lambda K, T: iron_condor(0.8 * K, 0.9 * K, 1.1 * K, 1.2 * K, T),
+    'Covered Call': lambda K, T: covered_call(K, T)
+}
+
+if __name__ == "__main__":
+    S, K, T, r, sigma = 100, 100, 0.5, 0.05, 0.2
+    print("Multi-Leg Strategies")
+    print("=" * 60)
+    for name, build in PRESETS.items():
+        strategy = build(K, T).with_premiums(S, r, sigma)
+        breakevens = ', '.join(f"{b:.2f}" for b in strategy.breakevens(r, sigma))
+        delta = strategy.greeks(S, r, sigma)['delta'][0]
+        print(f"{name:<18} cost {strategy.cost:8.3f}  delta {delta:7.3f}  breakevens: {breakevens}")
@@ -13,6 +13,10 @@ except ImportError:
 # Try to import our formulas module
 try:
     from formulas import blackScholes, calculate_implied_volatility
+    from adaptive_sampling import adaptive_curve
+    from engines import price
+    from strategy import PRESETS, single
+    from value_surface import spot_range
     FORMULAS_AVAILABLE = True
 except ImportError as e:
     FORMULAS_AVAILABLE = False
@@ -158,7 +162,9 @@ def main():
     
     # Payoff Diagram
     st.subheader("Payoff Diagram")
-    fig_payoff = create_payoff_chart(S, K, T, r, sigma)
+    strategy_name = st.selectbox("Strategy", ["Single Call & Put"] + list(PRESETS))
+    strategy = PRESETS[strategy_name](K, T) if strategy_name in PRESETS else None
+    fig_payoff = create_payoff_chart(S, K, T, r, sigma, strategy)
     st.plotly_chart(fig_payoff, use_container_width=True)
     
     # Greeks Visualization
@@ -179,34 +185,29 @@ def create_sensitivity_chart(S, K, T, r, sigma, param_name):
     if not PLOTLY_AVAILABLE:
         return None
         
+    # (position in the pricer's arguments, range) of the varied parameter
     if param_name == "Stock Price":
-        x_range = np.linspace(50, 150, 100)
+        axis, bounds = 0, (50, 150)
         x_label = "Stock Price ($)"
-        param_values = [(s, K, T, r, sigma) for s in x_range]
     elif param_name == "Strike Price":
-        x_range = np.linspace(50, 150, 100)
+        axis, bounds = 1, (50, 150)
         x_label = "Strike Price ($)"
-        param_values = [(S, k, T, r, sigma) for k in x_range]
     elif param_name == "Time to Expiry":
-        x_range = np.linspace(0.1, 5, 100)
+        axis, bounds = 2, (0.1, 5)
         x_label = "Time to Expiry (years)"
-        param_values = [(S, K, t, r, sigma) for t in x_range]
     else:  # Volatility
-        x_range = np.linspace(0.05, 0.8, 100)
+        axis, bounds = 4, (0.05, 0.8)
         x_label = "Volatility"
-        param_values = [(S, K, T, r, s) for s in x_range]
     
-    call_prices = []
-    put_prices = []
+    def curve(x):
+        inputs = [S, K, T, r, sigma]
+        inputs[axis] = x
+        return price(*inputs, outputs=('call_price', 'put_price'))
     
-    for params in param_values:
-        try:
-            result = blackScholes(*params)
-            call_prices.append(result['call_price'])
-            put_prices.append(result['put_price'])
-        except:
-            call_prices.append(0)
-            put_prices.append(0)
+    # Points are concentrated where the prices bend
+    x_range, result = adaptive_curve(curve, *bounds)
+    call_prices = result['call_price']
+    put_prices = result['put_price']
     
     fig = go.Figure()
     
@@ -235,40 +236,29 @@ def create_sensitivity_chart(S, K, T, r, sigma, param_name):
     
     return fig
 
-def create_payoff_chart(S, K, T, r, sigma):
-    """Create payoff diagram"""
+def create_payoff_chart(S, K, T, r, sigma, strategy=None):
+    """Create payoff diagram for a single call and put, or for a multi-leg strategy"""
     if not PLOTLY_AVAILABLE:
         return None
+    if strategy is not None:
+        return create_strategy_chart(S, r, sigma, strategy)
         
-    S_range = np.linspace(50, 150, 100)
-    
-    # Payoff calculations
-    call_payoff = np.maximum(S_range - K, 0)
-    put_payoff = np.maximum(K - S_range, 0)
-    
-    # Current option prices
-    try:
-        result = blackScholes(S, K, T, r, sigma)
-        call_price = result['call_price']
-        put_price = result['put_price']
-    except:
-        call_price = put_price = 0
-    
-    # Profit/Loss (subtract option premium)
-    call_profit = call_payoff - call_price
-    put_profit = put_payoff - put_price
+    # Each option is a one-leg strategy entered at today's price
+    call = single('call', K, T).with_premiums(S, r, sigma)
+    put = single('put', K, T).with_premiums(S, r, sigma)
+    S_range = np.linspace(*spot_range(call), 100)
     
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=S_range, y=call_profit,
+        x=S_range, y=call.profit(S_range, r, sigma),
         mode='lines',
         name='Call Profit/Loss',
         line=dict(color='blue', width=3)
     ))
     
     fig.add_trace(go.Scatter(
-        x=S_range, y=put_profit,
+        x=S_range, y=put.profit(S_range, r, sigma),
         mode='lines',
         name='Put Profit/Loss',
         line=dict(color='red', width=3)
@@ -292,30 +282,60 @@ def create_payoff_chart(S, K, T, r, sigma):
     
     return fig
 
+def create_strategy_chart(S, r, sigma, strategy):
+    """Create profit/loss diagram of a multi-leg strategy entered at today's prices"""
+    strategy = strategy.with_premiums(S, r, sigma)
+    S_range = np.linspace(*spot_range(strategy), 200)
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=S_range, y=strategy.profit(S_range, r, sigma),
+        mode='lines',
+        name='Profit/Loss at Expiry',
+        line=dict(color='blue', width=3)
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=S_range, y=strategy.profit(S_range, r, sigma, t=0.0),
+        mode='lines',
+        name='Profit/Loss Today',
+        line=dict(color='orange', width=2, dash='dash')
+    ))
+    
+    # Add zero line
+    fig.add_hline(y=0, line_dash="dash", line_color="black", opacity=0.5)
+    
+    # Add breakeven lines
+    for breakeven in strategy.breakevens(r, sigma):
+        fig.add_vline(x=breakeven, line_dash="dot", line_color="green", opacity=0.5,
+                      annotation_text=f"Breakeven (${breakeven:.2f})")
+    
+    fig.update_layout(
+        title=f'{strategy.name} Payoff Diagram (net cost ${strategy.cost:.2f})',
+        xaxis_title='Stock Price at Expiry ($)',
+        yaxis_title='Profit/Loss ($)',
+        hovermode='x unified',
+        showlegend=True,
+        height=400
+    )
+    
+    return fig
+
 def create_greeks_chart(S, K, T, r, sigma):
     """Create Greeks visualization chart"""
     if not PLOTLY_AVAILABLE:
         return None
         
-    S_range = np.linspace(50, 150, 100)
-    
-    deltas_call = []
-    deltas_put = []
-    gammas = []
-    vegas = []
-    
-    for s in S_range:
-        try:
-            result = blackScholes(s, K, T, r, sigma)
-            deltas_call.append(result['delta_call'])
-            deltas_put.append(result['delta_put'])
-            gammas.append(result['gamma'])
-            vegas.append(result['vega'])
-        except:
-            deltas_call.append(0)
-            deltas_put.append(0)
-            gammas.append(0)
-            vegas.append(0)
+    def curve(s):
+        return price(s, K, T, r, sigma, outputs=('delta_call', 'delta_put', 'gamma', 'vega'))
+    
+    # Points are concentrated near the strike, where gamma peaks
+    S_range, result = adaptive_curve(curve, 50, 150)
+    deltas_call = result['delta_call']
+    deltas_put = result['delta_put']
+    gammas = result['gamma']
+    vegas = result['vega']
     
     fig = make_subplots(
         rows=2, cols=2,
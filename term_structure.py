@@ -0,0 +1,149 @@
+"""
+Rate and volatility term structures
+A RateCurve (zero rates by maturity) and a VolTermStructure (ATM vols by
+expiry) evaluate discount factors, zero rates, total and forward variances
+for whole arrays of expiries. Values are memoized per unique expiry, since
+a chain repeats a handful of expiries across many strikes, and both objects
+can be passed straight to blackScholes_batch as r and sigma.
+"""
+
+import numpy as np
+
+class _Memo:
+    """Per-expiry memo of a vectorized function of T"""
+
+    def __init__(self, function):
+        self.function = function
+        self.values = {}
+
+    def __call__(self, T):
+        T = np.asarray(T, dtype=float)
+        unique, inverse = np.unique(T, return_inverse=True)
+        unique = unique.tolist()
+        missing = [t for t in unique if t not in self.values]
+        if missing:
+            self.values.update(zip(missing, self.function(np.array(missing)).tolist()))
+        return np.array([self.values[t] for t in unique])[inverse].reshape(T.shape)
+
+def _pillars(times, values, name):
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if times.ndim != 1 or times.shape != values.shape or times.size == 0:
+        raise ValueError(f"{name} needs matching one-dimensional times and values")
+    if np.any(times <= 0) or np.any(np.diff(times) <= 0):
+        raise ValueError(f"{name} times must be positive and increasing")
+    return times, values
+
+class RateCurve:
+    """
+    Continuously compounded zero curve
+
+    Log discount factors are interpolated linearly in time (piecewise flat
+    forward rates); the curve is flat before the first and after the last
+    pillar.
+
+    Parameters:
+    times: Pillar maturities (in years), increasing
+    rates: Zero rate at each pillar
+    """
+
+    def __init__(self, times, rates):
+        self.times, self.rates = _pillars(times, rates, "RateCurve")
+        self._log_discount = _Memo(self._interpolate)
+
+    def _interpolate(self, T):
+        # -r(T) T through (0, 0) and the pillars, then flat zero rate beyond the last one
+        log_discount = np.interp(T, np.concatenate(([0.0], self.times)),
+                                 np.concatenate(([0.0], -self.rates * self.times)))
+        return np.where(T > self.times[-1], -self.rates[-1] * T, log_discount)
+
+    def discount(self, T):
+        """Discount factor to each expiry"""
+        return np.exp(self._log_discount(T))
+
+    def zero_rate(self, T):
+        """Zero rate to each expiry (the short rate at T = 0)"""
+        T = np.asarray(T, dtype=float)
+        safe_T = np.where(T > 0, T, 1.0)
+        return np.where(T > 0, -self._log_discount(T) / safe_T, self.rates[0])
+
+    def forward_rate(self, T1, T2):
+        """Continuously compounded forward rate between T1 and T2"""
+        T1, T2 = np.asarray(T1, dtype=float), np.asarray(T2, dtype=float)
+        return (self._log_discount(T1) - self._log_discount(T2)) / (T2 - T1)
+
+    def at_expiry(self, T):
+        """Flat rate to use for contracts expiring at T (the zero rate)"""
+        return self.zero_rate(T)
+
+    def clear_cache(self):
+        self._log_discount.values.clear()
+
+class VolTermStructure:
+    """
+    At-the-money volatility term structure
+
+    Total variance sigma^2 T is interpolated linearly in time (piecewise
+    flat forward variance); the volatility is flat before the first and
+    after the last pillar.
+
+    Parameters:
+    times: Pillar expiries (in years), increasing
+    vols: ATM volatility at each pillar
+
+    Raises ValueError when total variance decreases between pillars, which
+    would imply a negative forward variance (calendar arbitrage).
+    """
+
+    def __init__(self, times, vols):
+        self.times, self.vols = _pillars(times, vols, "VolTermStructure")
+        if np.any(np.diff(self.vols ** 2 * self.times) < 0):
+            raise ValueError("Total variance must not decrease with expiry")
+        self.total_variance = _Memo(self._interpolate)
+
+    def _interpolate(self, T):
+        variance = np.interp(T, np.concatenate(([0.0], self.times)),
+                             np.concatenate(([0.0], self.vols ** 2 * self.times)))
+        return np.where(T > self.times[-1], self.vols[-1] ** 2 * T, variance)
+
+    def volatility(self, T):
+        """Implied ATM volatility to each expiry"""
+        T = np.asarray(T, dtype=float)
+        safe_T = np.where(T > 0, T, 1.0)
+        return np.where(T > 0, np.sqrt(self.total_variance(T) / safe_T), self.vols[0])
+
+    def forward_variance(self, T1, T2):
+        """Annualized variance between T1 and T2"""
+        T1, T2 = np.asarray(T1, dtype=float), np.asarray(T2, dtype=float)
+        return (self.total_variance(T2) - self.total_variance(T1)) / (T2 - T1)
+
+    def at_expiry(self, T):
+        """Flat volatility to use for contracts expiring at T"""
+        return self.volatility(T)
+
+    def clear_cache(self):
+        self.total_variance.values.clear()
+
+if __name__ == "__main__":
+    import time
+
+    from formulas import blackScholes_batch
+
+    rates = RateCurve([0.25, 0.5, 1, 2, 5], [0.052, 0.050, 0.047, 0.043, 0.040])
+    vols = VolTermStructure([0.1, 0.25, 0.5, 1, 2], [0.30, 0.26, 0.24, 0.225, 0.22])
+    expiries = np.array([1 / 52, 1 / 12, 0.25, 0.5, 1, 2])
+
+    print("Term Structures")
+    print("=" * 50)
+    for T, r, df, sigma in zip(expiries, rates.zero_rate(expiries), rates.discount(expiries),
+                               vols.volatility(expiries)):
+        print(f"T = {T:6.3f}: zero {r:.4%}, discount {df:.5f}, ATM vol {sigma:.2%}")
+
+    # A chain: every strike at every expiry
+    K = np.repeat(np.linspace(50, 150, 20_000), len(expiries))
+    T = np.tile(expiries, 20_000)
+    blackScholes_batch(100, K[:10], T[:10], rates, vols)
+    start = time.perf_counter()
+    blackScholes_batch(100, K, T, rates, vols)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(K):,} contracts priced off the curves in {elapsed_ms:.1f} ms")
@@ -0,0 +1,95 @@
+"""
+Accuracy of every pricing backend and IV solver against a 50-digit reference
+"""
+
+import numpy as np
+import pytest
+
+mpmath = pytest.importorskip("mpmath")
+
+from accuracy import (APPROXIMATION_IV_TOLERANCE, APPROXIMATION_REGIMES, IV_TOLERANCE,
+                      MODEL_PRICERS, REGIMES, _reference_values, backends, error_report,
+                      generate_inputs, iv_round_trip, model_report, reference_prices)
+from formulas import blackScholes
+
+def test_reference_matches_known_value():
+    reference = reference_prices(100, 100, 1, 0.05, 0.2)
+    assert reference['call_price'] == pytest.approx(10.450583572185565, abs=1e-13)
+    # The reference does not go through the float pricer at all
+    with mpmath.workdps(30):
+        assert float(mpmath.ncdf(0)) == 0.5
+
+def test_reference_greeks_match_differentiation():
+    # Every closed-form Greek of the reference against mpmath.diff of its own price
+    point = dict(s=105, k=100, t=0.7, rate=0.04, vol=0.25, y=0.015)
+    axes = ('s', 't', 'vol', 'rate')
+    derivatives = {
+        'delta_call': ('call_price', (1, 0, 0, 0), 1),
+        'gamma': ('call_price', (2, 0, 0, 0), 1),
+        'speed': ('call_price', (3, 0, 0, 0), 1),
+        'vega': ('call_price', (0, 0, 1, 0), 1),
+        'volga': ('call_price', (0, 0, 2, 0), 1),
+        'ultima': ('call_price', (0, 0, 3, 0), 1),
+        'vanna': ('call_price', (1, 0, 1, 0), 1),
+        'zomma': ('call_price', (2, 0, 1, 0), 1),
+        'rho_call': ('call_price', (0, 0, 0, 1), 1),
+        'rho_put': ('put_price', (0, 0, 0, 1), 1),
+        # Theta, charm and color are per year elapsed: minus the derivative in T
+        'theta_call': ('call_price', (0, 1, 0, 0), -1),
+        'theta_put': ('put_price', (0, 1, 0, 0), -1),
+        'charm_call': ('call_price', (1, 1, 0, 0), -1),
+        'charm_put': ('put_price', (1, 1, 0, 0), -1),
+        'color': ('call_price', (2, 1, 0, 0), -1)
+    }
+    with mpmath.workdps(40):
+        reference = _reference_values(**{name: mpmath.mpf(value) for name, value in point.items()})
+        for greek, (price, orders, sign) in derivatives.items():
+            function = lambda *x: _reference_values(**{**point, **dict(zip(axes, x))})[price]
+            numeric = sign * mpmath.diff(function, [point[axis] for axis in axes], orders)
+            assert float(numeric) == pytest.approx(float(reference[greek]), rel=1e-12), greek
+
+def test_regimes_cover_the_extremes():
+    for regime in REGIMES:
+        inputs = generate_inputs(regime, 50)
+        assert set(inputs) == {'S', 'K', 'T', 'r', 'sigma', 'q'}
+        assert np.all(inputs['T'] > 0) and np.all(inputs['sigma'] > 0)
+    assert generate_inputs('short_expiry', 50)['T'].max() <= 1e-3
+    assert generate_inputs('huge_vol', 50)['sigma'].min() >= 2.0
+    with pytest.raises(ValueError):
+        generate_inputs('sideways')
+
+@pytest.mark.parametrize('backend', list(backends()))
+@pytest.mark.parametrize('regime', list(REGIMES))
+def test_backend_within_tolerance(backend, regime):
+    report = error_report(backend, regime, n=100)
+    failing = {name: errors for name, errors in report.items() if not errors['worst_ratio'] <= 1}
+    assert not failing
+
+@pytest.mark.parametrize('regime', list(REGIMES))
+def test_implied_volatility_round_trip(regime):
+    report = iv_round_trip(regime, n=100)
+    assert report['quotes'] > 0
+    assert report['newton_batch'] <= IV_TOLERANCE
+    assert report['newton_scalar'] <= IV_TOLERANCE
+    if regime in APPROXIMATION_REGIMES:
+        assert report['approximation'] <= APPROXIMATION_IV_TOLERANCE
+
+@pytest.mark.parametrize('pricer', list(MODEL_PRICERS))
+def test_model_pricer_within_tolerance(pricer):
+    report = model_report(pricer)
+    assert all(errors['worst_ratio'] <= 1 for errors in report.values())
+
+def test_report_flags_an_inaccurate_backend(monkeypatch):
+    # A backend with a 1e-6 relative price error must fail its tolerance
+    def sloppy(S, K, T, r, sigma, q):
+        values = {name: np.array([blackScholes(*row, q=y)[name]
+                                  for *row, y in zip(S, K, T, r, sigma, q)])
+                  for name in ('call_price', 'put_price', 'delta_call', 'delta_put', 'gamma',
+                               'theta_call', 'theta_put', 'vega')}
+        values['call_price'] = values['call_price'] * (1 + 1e-6)
+        return values
+
+    monkeypatch.setattr('accuracy.backends', lambda: {'sloppy': sloppy})
+    report = error_report('sloppy', 'normal', n=20)
+    assert report['call_price']['worst_ratio'] > 1
+    assert report['put_price']['worst_ratio'] <= 1
@@ -0,0 +1,37 @@
+"""
+Tests for adaptive curve sampling
+"""
+
+import numpy as np
+
+from adaptive_sampling import adaptive_curve
+from formulas import blackScholes_batch
+
+def greeks(S):
+    return blackScholes_batch(S, 100, 0.02, 0.05, 0.2, outputs=('call_price', 'gamma'))
+
+def test_beats_uniform_grid_with_fewer_points():
+    calls = []
+
+    def counted(S):
+        calls.append(len(S))
+        return greeks(S)
+
+    x, curves = adaptive_curve(counted, 50, 150, max_points=60)
+    assert len(x) <= 60 and sum(calls) == len(x)
+    assert np.all(np.diff(x) > 0)
+
+    dense = np.linspace(50, 150, 20001)
+    truth = greeks(dense)['gamma']
+    uniform = np.linspace(50, 150, 100)
+    adaptive_error = np.max(np.abs(np.interp(dense, x, curves['gamma']) - truth))
+    uniform_error = np.max(np.abs(np.interp(dense, uniform, greeks(uniform)['gamma']) - truth))
+    assert adaptive_error < uniform_error / 3
+
+    # Points cluster around the strike
+    assert np.sum(np.abs(x - 100) < 10) > len(x) / 2
+
+def test_straight_lines_stay_coarse():
+    x, curves = adaptive_curve(lambda x: {'line': 2 * x + 1}, 0, 1, initial_points=9)
+    assert len(x) == 9
+    assert np.allclose(curves['line'], 2 * x + 1)
@@ -0,0 +1,68 @@
+"""
+Tests for the American option approximations
+"""
+
+import numpy as np
+import pytest
+
+from american import (METHODS, american_implied_volatility, american_price, american_tree,
+                      barone_adesi_whaley)
+from formulas import blackScholes, blackScholes_batch
+
+S = np.array([80.0, 90.0, 100.0, 110.0, 120.0])[:, None, None]
+T = np.array([0.1, 0.5, 1.0])[None, :, None]
+sigma = np.array([0.15, 0.3, 0.5])[None, None, :]
+
+def test_reference_tree():
+    # Hull's American put example, and no early exercise for a call without dividends
+    assert american_tree(50, 50, 5 / 12, 0.1, 0.4, 'put') == pytest.approx(4.284, abs=2e-3)
+    assert american_tree(100, 100, 1, 0.05, 0.2, 'call') == pytest.approx(
+        blackScholes(100, 100, 1, 0.05, 0.2)['call_price'], abs=1e-3)
+
+@pytest.mark.parametrize('option_type, r, q', [('put', 0.08, 0.0), ('put', 0.05, 0.03),
+                                               ('call', 0.05, 0.08)])
+def test_approximations_against_high_step_tree(option_type, r, q):
+    tree = american_tree(S, 100, T, r, sigma, option_type, q, n_steps=1000)
+    # Published accuracy: BAW within a few percent up to a year, BS93 within about 2%
+    for method, limit in (('baw', 0.05), ('bjerksund_stensland', 0.03)):
+        approximation = american_price(S, 100, T, r, sigma, option_type, q, method)
+        assert approximation.shape == tree.shape
+        assert np.max(np.abs(approximation - tree) / np.maximum(tree, 1.0)) < limit
+
+def test_bounds_and_no_early_exercise_cases():
+    european = blackScholes_batch(S, 100, T, 0.05, sigma, q=0.02)
+    for method in METHODS:
+        put = american_price(S, 100, T, 0.05, sigma, 'put', 0.02, method)
+        assert np.all(put >= european['put_price'] - 1e-12)
+        assert np.all(put >= np.maximum(100 - S, 0))
+        # Calls on non-dividend stocks are European
+        call = american_price(S, 100, T, 0.05, sigma, 'call', 0.0, method)
+        assert np.allclose(call, blackScholes_batch(S, 100, T, 0.05, sigma)['call_price'])
+        # Expired contracts are worth their intrinsic value
+        assert american_price(90, 100, 0.0, 0.05, 0.2, 'put', method=method) == 10
+    with pytest.raises(ValueError):
+        american_price(100, 100, 1, 0.05, 0.2, method='tree')
+
+def test_batch_solve_matches_one_at_a_time():
+    kinds = np.array(['call', 'put'] * 10)
+    spots = np.linspace(85, 115, 20)
+    batch = barone_adesi_whaley(spots, 100, 0.75, 0.06, 0.3, kinds, 0.04)
+    single = [barone_adesi_whaley(s, 100, 0.75, 0.06, 0.3, k, 0.04) for s, k in zip(spots, kinds)]
+    assert np.allclose(batch, single, rtol=0, atol=1e-10)
+
+@pytest.mark.parametrize('method', METHODS)
+def test_implied_volatility_round_trip(method):
+    rng = np.random.default_rng(1)
+    n = 500
+    spots = rng.uniform(80, 120, n)
+    expiries = rng.uniform(0.05, 2.0, n)
+    vols = rng.uniform(0.1, 0.6, n)
+    kinds = rng.choice(['call', 'put'], n)
+    prices = american_price(spots, 100, expiries, 0.05, vols, kinds, 0.03, method)
+    implied = american_implied_volatility(spots, 100, expiries, 0.05, prices, kinds, 0.03, method)
+    # Quotes at intrinsic value (immediate exercise) do not identify a volatility
+    identified = ~np.isnan(implied)
+    intrinsic = np.where(kinds == 'call', np.maximum(spots - 100, 0), np.maximum(100 - spots, 0))
+    assert np.all(prices[~identified] - intrinsic[~identified] < 1e-3)
+    assert identified.mean() > 0.9
+    assert np.max(np.abs(implied[identified] - vols[identified])) < 1e-4
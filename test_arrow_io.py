@@ -0,0 +1,49 @@
+"""
+Tests for Arrow / Parquet chain I/O
+"""
+
+import numpy as np
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.parquet as pq
+
+from arrow_io import column_to_numpy, implied_volatility_table, price_table, process_parquet
+from formulas import blackScholes_batch
+
+def make_table():
+    S = np.array([100.0, 100.0, 95.0, 110.0])
+    K = np.array([100.0, 105.0, 100.0, 100.0])
+    T = np.array([1.0, 0.5, 0.25, 2.0])
+    return pa.table({'S': S, 'K': K, 'T': T, 'r': np.full(4, 0.05),
+                     'type': ['call', 'put', 'call', 'put']})
+
+def test_zero_copy_numeric_columns():
+    table = make_table()
+    view = column_to_numpy(table, 'S')
+    assert view.ctypes.data == table.column('S').chunk(0).buffers()[1].address
+
+def test_price_and_iv_round_trip_for_tables_and_batches():
+    table = make_table()
+    priced = price_table(table, sigma=0.3, outputs=('call_price', 'put_price', 'vega'))
+    expected = blackScholes_batch(table['S'], table['K'], table['T'], 0.05, 0.3)
+    assert np.allclose(priced['call_price'], expected['call_price'])
+    assert priced.schema.names[-3:] == ['call_price', 'put_price', 'vega']
+
+    is_call = np.asarray(table['type']) == 'call'
+    quotes = priced.append_column('price', pa.array(np.where(is_call, priced['call_price'],
+                                                              priced['put_price'])))
+    for data in (quotes, quotes.to_batches()[0]):
+        result = implied_volatility_table(data, tolerance=1e-10)
+        assert type(result) is type(data)
+        assert np.allclose(result.column('implied_vol'), 0.3, atol=1e-6)
+
+def test_parquet_streams_row_groups(tmp_path):
+    table = pa.concat_tables([make_table()] * 5)
+    source, destination = tmp_path / 'in.parquet', tmp_path / 'out.parquet'
+    pq.write_table(table, source, row_group_size=4)
+
+    assert process_parquet(source, destination, price_table, sigma=0.2) == 20
+    output = pq.ParquetFile(destination)
+    assert output.num_row_groups == 5
+    assert np.allclose(output.read()['call_price'], price_table(table, sigma=0.2)['call_price'])
@@ -4,7 +4,10 @@ Test script for Black-Scholes calculations
 Verifies the accuracy of option pricing calculations
 """
 
-from formulas import blackScholes, calculate_implied_volatility
+import math
+
+from formulas import (ALL_OUTPUTS, blackScholes, blackScholes_batch, calculate_implied_volatility,
+                      expire, expiry_values)
 
 def test_basic_calculations():
     """Test basic Black-Scholes calculations with known values"""
@@ -113,11 +116,103 @@ def test_put_call_parity():
     else:
         print("✗ Put-call parity violation detected")
 
+def test_higher_order_greeks():
+    """Check analytic higher-order Greeks against central finite differences"""
+    print("\n\nTesting Higher-Order Greeks")
+    print("=" * 50)
+    
+    base = dict(S=105, K=100, T=0.7, r=0.04, sigma=0.25)
+    h = 1e-4
+    
+    def bumped(key, param):
+        up = blackScholes(**{**base, param: base[param] + h}, outputs='all')[key]
+        down = blackScholes(**{**base, param: base[param] - h}, outputs='all')[key]
+        return (up - down) / (2 * h)
+    
+    result = blackScholes(**base, outputs='all')
+    checks = {
+        'rho_call': bumped('call_price', 'r'),
+        'rho_put': bumped('put_price', 'r'),
+        'vanna': bumped('delta_call', 'sigma'),
+        'volga': bumped('vega', 'sigma'),
+        'charm_call': -bumped('delta_call', 'T'),
+        'charm_put': -bumped('delta_put', 'T'),
+        'speed': bumped('gamma', 'S'),
+        'color': -bumped('gamma', 'T'),
+        'zomma': bumped('gamma', 'sigma'),
+        'ultima': bumped('volga', 'sigma'),
+    }
+    for name, numeric in checks.items():
+        print(f"{name}: analytic {result[name]:.6f}, finite difference {numeric:.6f}")
+        assert abs(result[name] - numeric) < 1e-5 * max(1, abs(numeric))
+    
+    batch = blackScholes_batch([105, 105], 100, [0.7, 0], 0.04, 0.25, outputs='all')
+    for name in ALL_OUTPUTS:
+        assert abs(batch[name][0] - result[name]) < 1e-12
+        assert batch[name][1] == 0
+    
+    assert set(blackScholes(**base, outputs=['vanna'])) == {'vanna'}
+
+def test_generalized_models():
+    """Check the dividend, Black-76 and Garman-Kohlhagen variants in one mixed batch"""
+    print("\n\nTesting Generalized Black-Scholes-Merton Models")
+    print("=" * 50)
+    
+    rows = [(100, 100, 0.02, 'black_scholes'), (100, 100, 0.0, 'black76'),
+            (1.10, 1.05, 0.03, 'garman_kohlhagen')]
+    S, K, q, model = (list(column) for column in zip(*rows))
+    T, r, sigma = 0.5, 0.05, 0.2
+    batch = blackScholes_batch(S, K, T, r, sigma, outputs='all', q=q, model=model)
+    
+    for i, (s, k, yield_, name) in enumerate(rows):
+        scalar = blackScholes(s, k, T, r, sigma, outputs='all', q=yield_, model=name)
+        for key in ALL_OUTPUTS:
+            assert abs(scalar[key] - batch[key][i]) < 1e-12
+        
+        # Put-call parity with carry: C - P = S e^((b-r)T) - K e^(-rT)
+        carry = 0.0 if name == 'black76' else r - yield_
+        parity = s * math.exp((carry - r) * T) - k * math.exp(-r * T)
+        print(f"{name}: call {scalar['call_price']:.4f}, put {scalar['put_price']:.4f}")
+        assert abs(scalar['call_price'] - scalar['put_price'] - parity) < 1e-12
+        
+        # Rho by bumping r with q held fixed
+        h = 1e-5
+        up = blackScholes(s, k, T, r + h, sigma, q=yield_, model=name)['call_price']
+        down = blackScholes(s, k, T, r - h, sigma, q=yield_, model=name)['call_price']
+        assert abs(scalar['rho_call'] - (up - down) / (2 * h)) < 1e-6
+
+def test_expiry_values():
+    """Expired rows take the intrinsic value, its slope as delta and no other Greeks"""
+    print("\n\nTesting Expiry Values")
+    print("=" * 50)
+    
+    S, K = [110, 90, 100], 100
+    at_expiry = expiry_values(S, K, 'all')
+    assert list(at_expiry['call_price']) == [10, 0, 0]
+    assert list(at_expiry['put_price']) == [0, 10, 0]
+    assert list(at_expiry['delta_call']) == [1, 0, 0]
+    assert list(at_expiry['delta_put']) == [0, -1, 0]
+    for name in ALL_OUTPUTS[4:]:
+        assert not at_expiry[name].any(), name
+    
+    # Only the expired row of a batch result is replaced
+    T = [0.0, 0.5, 0.5]
+    batch = blackScholes_batch(S, K, T, 0.05, 0.2)
+    settled = expire(batch, S, K, T)
+    print(f"Expired call: {settled['call_price'][0]:.4f}, delta {settled['delta_call'][0]:.1f}")
+    assert settled['call_price'][0] == 10 and settled['delta_call'][0] == 1
+    assert settled['gamma'][0] == 0
+    for name in batch:
+        assert list(settled[name][1:]) == list(batch[name][1:])
+
 if __name__ == "__main__":
     test_basic_calculations()
     test_implied_volatility()
     test_edge_cases()
     test_put_call_parity()
+    test_higher_order_greeks()
+    test_generalized_models()
+    test_expiry_values()
     
     print("\n\nAll tests completed!")
     print("If all calculations look reasonable, the implementation is working correctly.") 
\ No newline at end of file
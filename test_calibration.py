@@ -0,0 +1,58 @@
+"""
+Tests for the SVI and Heston calibration engine
+"""
+
+import numpy as np
+
+import heston
+from calibration import calibrate_chains, calibrate_svi, svi_total_variance
+from heston import heston_price
+
+HESTON = (0.03, 2.0, 0.04, 0.5, -0.6)
+
+def make_chain(params=HESTON, expiries=(0.25, 1.0)):
+    strikes = np.linspace(80, 120, 9)
+    price = np.concatenate([heston_price(100, strikes, expiry, 0.03, *params)['call_price']
+                            for expiry in expiries])
+    K = np.tile(strikes, len(expiries))
+    T = np.repeat(expiries, len(strikes))
+    # Quote the low strikes as puts to exercise put-call parity
+    option_type = np.where(K < 100, 'put', 'call')
+    price = np.where(option_type == 'put', price - 100 + K * np.exp(-0.03 * T), price)
+    return {'S': 100.0, 'K': K, 'T': T, 'r': 0.03, 'price': price, 'option_type': option_type}
+
+def test_svi_recovers_parameters_and_warm_starts():
+    k = np.linspace(-0.4, 0.4, 15)
+    true = (0.02, 0.1, -0.4, 0.05, 0.2)
+    cold = calibrate_svi(k, svi_total_variance(k, *true))
+    assert cold['rmse'] < 1e-8
+    assert np.allclose(cold['params'], true, atol=1e-4)
+
+    warm = calibrate_svi(k, svi_total_variance(k, *true) * 1.01, initial=cold['params'])
+    assert warm['starts'] == 1
+    assert warm['iterations'] < cold['iterations']
+
+def test_heston_recovers_parameters():
+    report = calibrate_chains({'XYZ': make_chain()}, models=('heston',), n_starts=2)['XYZ']
+    assert report['n_quotes'] == 18
+    assert report['heston']['rmse'] < 1e-6
+    assert np.allclose(report['heston']['params'], HESTON, atol=1e-3)
+
+def test_parallel_matches_sequential():
+    chains = {'AAA': make_chain(), 'BBB': make_chain((0.05, 1.5, 0.05, 0.3, -0.3))}
+    sequential = calibrate_chains(chains, models=('svi',))
+    parallel = calibrate_chains(chains, models=('svi',), workers=2)
+    for underlying in chains:
+        for expiry, fit in sequential[underlying]['svi'].items():
+            assert np.allclose(fit['params'], parallel[underlying]['svi'][expiry]['params'])
+        assert parallel[underlying]['fit_time'] > 0
+
+def test_pooled_starts_match_sequential_and_skip_the_cos_cache():
+    chains = {'XYZ': make_chain()}
+    heston.clear_cache()
+    sequential = calibrate_chains(chains, n_starts=2)['XYZ']
+    assert heston._cos_terms.cache_info().currsize == 0
+    pooled = calibrate_chains(chains, n_starts=2, workers=2)['XYZ']
+    assert np.allclose(pooled['heston']['params'], sequential['heston']['params'])
+    for expiry, fit in sequential['svi'].items():
+        assert np.allclose(fit['params'], pooled['svi'][expiry]['params'])
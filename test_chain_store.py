@@ -0,0 +1,47 @@
+"""
+Tests for the memory-mapped chain store
+"""
+
+import numpy as np
+
+from chain_store import ChainStore, convert_csv, write_chain
+from formulas import blackScholes_batch
+
+def make_quotes():
+    underlying = ['SPY', 'AAPL', 'SPY', 'AAPL', 'SPY', 'SPY']
+    expiry = ['2025-03-21', '2025-03-21', '2025-01-17', '2025-03-21', '2025-03-21', '2025-01-17']
+    S = [500.0, 190.0, 500.0, 190.0, 500.0, 500.0]
+    K = [510.0, 200.0, 490.0, 180.0, 480.0, 500.0]
+    T = [0.25, 0.25, 0.1, 0.25, 0.25, 0.1]
+    option_type = ['call', 'put', 'put', 'call', 'put', 'call']
+    prices = blackScholes_batch(S, K, T, 0.04, 0.2)
+    mid = np.where(np.array(option_type) == 'call', prices['call_price'], prices['put_price'])
+    return underlying, expiry, S, K, T, option_type, mid
+
+def test_groups_are_contiguous_and_slices_are_views(tmp_path):
+    underlying, expiry, S, K, T, option_type, mid = make_quotes()
+    write_chain(tmp_path, underlying, expiry, S, K, T, 0.04, mid - 0.05, mid + 0.05, option_type)
+    store = ChainStore(tmp_path)
+
+    assert store.keys() == [('AAPL', '2025-03-21'), ('SPY', '2025-01-17'), ('SPY', '2025-03-21')]
+    chain = store.slice('SPY', '2025-03-21')
+    assert sorted(chain.K) == [480.0, 510.0]
+    assert isinstance(chain.S, np.memmap) and np.shares_memory(chain.S, store.columns['S'])
+    assert len(store.slice('SPY')) == 4
+
+def test_slice_iv_round_trip(tmp_path):
+    underlying, expiry, S, K, T, option_type, mid = make_quotes()
+    store = write_chain(tmp_path, underlying, expiry, S, K, T, 0.04, mid, mid, option_type)
+    for key in store.keys():
+        iv = store.slice(*key).implied_volatility(tolerance=1e-10)
+        assert np.allclose(iv, 0.2, atol=1e-6)
+
+def test_convert_csv(tmp_path):
+    csv_path = tmp_path / 'chain.csv'
+    csv_path.write_text("underlying,expiry,S,K,T,r,bid,ask,type\n"
+                        "XYZ,2025-06-20,100,95,0.5,0.03,8.1,8.3,call\n"
+                        "XYZ,2025-06-20,100,105,0.5,0.03,7.0,7.2,put\n")
+    store = convert_csv(csv_path, tmp_path / 'store')
+    chain = store.slice('XYZ', '2025-06-20')
+    assert list(chain.option_type) == ['call', 'put']
+    assert np.allclose(chain.mid, [8.2, 7.1])
@@ -0,0 +1,59 @@
+"""
+Tests for the pricing engine registry
+"""
+
+import numpy as np
+import pytest
+
+import engines
+from engines import available_engines, price, select_engine
+from formulas import ALL_OUTPUTS, DEFAULT_OUTPUTS, blackScholes, blackScholes_batch
+
+S = np.linspace(60, 140, 41)
+T = np.linspace(0.0, 2.0, 41)
+MODEL = np.where(np.arange(41) % 3 == 0, 'black76', 'black_scholes')
+
+def test_scalar_inputs_match_blackScholes():
+    assert price(100, 100, 1, 0.05, 0.2) == blackScholes(100, 100, 1, 0.05, 0.2)
+
+def test_backends_agree_with_batch():
+    reference = blackScholes_batch(S, 100, T, 0.05, 0.25, 'all', 0.02, MODEL)
+    for engine in ('scalar', 'vectorized'):
+        result = price(S, 100, T, 0.05, 0.25, 'all', 0.02, MODEL, engine=engine)
+        for name in ALL_OUTPUTS:
+            assert np.allclose(result[name], reference[name], atol=1e-12)
+
+    # The Numba kernel is plain Python until compiled, so check its maths here
+    kernel = engines._run_kernel(engines._default_outputs_kernel, S, 100, T, 0.05, 0.25,
+                                 DEFAULT_OUTPUTS, 0.02, MODEL)
+    for name in DEFAULT_OUTPUTS:
+        assert np.allclose(kernel[name], reference[name], atol=1e-12)
+
+def test_parallel_backend(monkeypatch):
+    monkeypatch.setattr(engines, 'WORKERS', 2)
+    result = price(S, 100, T, 0.05, 0.25, engine='parallel')
+    reference = blackScholes_batch(S, 100, T, 0.05, 0.25)
+    for name in DEFAULT_OUTPUTS:
+        assert np.array_equal(result[name], reference[name])
+    # Later calls reuse the same worker processes
+    pool = engines._POOL
+    price(S, 100, T, 0.05, 0.25, engine='parallel')
+    assert engines._POOL is pool
+    engines.shutdown_pool()
+    assert engines._POOL is None
+
+def test_dispatch_by_size_and_thresholds(monkeypatch):
+    assert select_engine(1) == 'scalar'
+    assert select_engine(1000) == 'vectorized'
+    monkeypatch.setitem(engines.THRESHOLDS, 'vectorized', 2000)
+    assert select_engine(1000) == 'scalar'
+
+    # Engines that cannot produce the outputs, or are not installed, are skipped
+    numba = engines.ENGINES['numba']
+    monkeypatch.setitem(engines.ENGINES, 'numba', (numba[0], True, numba[2]))
+    assert select_engine(10 ** 5) == 'numba'
+    assert select_engine(10 ** 5, outputs=('vanna',)) == 'vectorized'
+    assert 'numba' in available_engines()
+
+    with pytest.raises(ValueError):
+        price(S, 100, 1, 0.05, 0.2, engine='gpu')
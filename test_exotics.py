@@ -0,0 +1,46 @@
+"""
+Tests for the path-dependent exotics Monte Carlo engines
+"""
+
+import math
+
+from exotics import asian_option, barrier_option, geometric_asian_price, lookback_option
+from formulas import blackScholes, norm_cdf
+
+S, K, T, r, sigma = 100.0, 100.0, 1.0, 0.05, 0.2
+
+def test_geometric_asian_matches_closed_form():
+    for option_type in ('call', 'put'):
+        mc = asian_option(S, K, T, r, sigma, option_type, 'geometric', n_steps=50, n_paths=40000)
+        exact = geometric_asian_price(S, K, T, r, sigma, 50, option_type)
+        assert abs(mc['price'] - exact) < 4 * mc['std_error']
+
+def test_control_variate_reduces_error():
+    result = asian_option(S, K, T, r, sigma, n_steps=50, n_paths=20000, sobol=True)
+    assert result['std_error'] < result['std_error_plain'] / 10
+    assert abs(result['price'] - result['price_plain']) < 4 * result['std_error_plain']
+
+def test_barrier_in_out_parity_and_bridge_correction():
+    barrier = 90.0
+    out = barrier_option(S, K, T, r, sigma, barrier, 'down-and-out', n_steps=50, n_paths=40000)
+    knock_in = barrier_option(S, K, T, r, sigma, barrier, 'down-and-in', n_steps=50, n_paths=40000)
+    vanilla = blackScholes(S, K, T, r, sigma)['call_price']
+    assert abs(out['price'] + knock_in['price'] - vanilla) < 4 * out['std_error']
+
+    # Continuously monitored down-and-in call (B <= K)
+    lam = (r + 0.5 * sigma ** 2) / sigma ** 2
+    y = math.log(barrier ** 2 / (S * K)) / (sigma * math.sqrt(T)) + lam * sigma * math.sqrt(T)
+    exact_in = (S * (barrier / S) ** (2 * lam) * norm_cdf(y) - K * math.exp(-r * T)
+                * (barrier / S) ** (2 * lam - 2) * norm_cdf(y - sigma * math.sqrt(T)))
+    assert abs(knock_in['price'] - exact_in) < 4 * knock_in['std_error']
+
+    discrete = barrier_option(S, K, T, r, sigma, barrier, 'down-and-in', n_steps=50,
+                              n_paths=40000, bridge_correction=False)
+    assert discrete['price'] < exact_in - 4 * discrete['std_error']
+
+def test_lookback_bounds():
+    floating = lookback_option(S, T, r, sigma, n_steps=50, n_paths=20000)
+    fixed = lookback_option(S, T, r, sigma, K=K, n_steps=50, n_paths=20000)
+    vanilla = blackScholes(S, K, T, r, sigma)['call_price']
+    assert floating['price'] > vanilla
+    assert fixed['price'] > vanilla
@@ -0,0 +1,77 @@
+"""
+Tests for Taylor fast revaluation with exact fallback
+"""
+
+import numpy as np
+
+from fast_revaluation import FastRevaluer
+from value_at_risk import OptionBook
+
+def make_book(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return OptionBook(underlying=rng.integers(0, 3, n), K=rng.uniform(80, 120, n),
+                      T=rng.uniform(0.01, 2.0, n), sigma=rng.uniform(0.1, 0.5, n),
+                      option_type=rng.choice(['call', 'put'], n), quantity=rng.integers(-10, 11, n))
+
+spots = np.array([100.0, 100.0, 100.0])
+
+def test_small_moves_take_the_fast_path():
+    book = make_book()
+    revaluer = FastRevaluer(book, spots)
+    new_spots = spots * np.array([1.001, 0.999, 1.0005])
+    result = revaluer.revalue(new_spots, vol_shifts=[0.001, -0.001, 0.0], dt=1 / 6048)
+    exact = revaluer.exact_values(new_spots, [0.001, -0.001, 0.0], 1 / 6048)
+    assert result['fast_fraction'] > 0.95
+    assert np.max(np.abs(book.quantity * (result['values'] - exact))) < 0.02
+    assert result['max_error_bound'] <= revaluer.tolerance
+
+def test_large_moves_fall_back_to_exact_repricing():
+    book = make_book()
+    revaluer = FastRevaluer(book, spots)
+    new_spots = spots * np.array([1.08, 0.93, 1.0])
+    result = revaluer.revalue(new_spots, vol_shifts=[0.02, 0.03, -0.01], dt=1 / 252)
+    exact = revaluer.exact_values(new_spots, [0.02, 0.03, -0.01], 1 / 252)
+    assert 0 < result['fast_fraction'] < 0.9
+    # Repriced positions are exact, the rest stay near the tolerance
+    repriced = result['exact']
+    assert np.allclose(result['values'][repriced], exact[repriced], rtol=0, atol=1e-12)
+    assert np.max(np.abs(book.quantity * (result['values'] - exact))) < 0.05
+
+def test_zero_tolerance_reprices_everything():
+    book = make_book(200)
+    revaluer = FastRevaluer(book, spots, tolerance=0.0)
+    new_spots = spots * 1.01
+    result = revaluer.revalue(new_spots, vol_shifts=[0.01] * 3, dt=1 / 252)
+    # Only flat (zero quantity) positions have a zero error estimate
+    assert result['exact'].tolist() == np.flatnonzero(book.quantity).tolist()
+    expected = book.quantity @ revaluer.exact_values(new_spots, [0.01] * 3, 1 / 252)
+    assert abs(result['value'] - expected) < 1e-9
+
+def test_full_revaluation_moves_the_expansion_point():
+    book = make_book(500)
+    revaluer = FastRevaluer(book, spots)
+    assert abs(revaluer.full_revaluation(spots * 1.05) - book.value(spots * 1.05)) < 1e-9
+    result = revaluer.revalue(spots * 1.05)
+    assert result['fast_fraction'] == 1.0
+    assert abs(result['value'] - book.value(spots * 1.05)) < 1e-9
+
+def test_expiring_positions_are_repriced():
+    book = OptionBook([0, 0], [90, 100], [0.001, 1.0], [0.2, 0.2], ['call', 'put'], [1, 1])
+    revaluer = FastRevaluer(book, [100.0], tolerance=1e9)
+    result = revaluer.revalue([100.0], dt=0.002)
+    assert result['exact'].tolist() == [0]
+    # The in-the-money call expired during dt and is worth its intrinsic value
+    assert result['values'][0] == 10.0
+
+def test_error_bound_covers_vol_cross_terms():
+    # Vol and time moves with no spot move: the dsigma dt term dominates the estimate
+    book = make_book(200)
+    revaluer = FastRevaluer(book, spots)
+    dsigma, dt = np.full(len(book), 0.01), 0.01
+    bound = revaluer.error_bound(np.zeros(len(book)), dsigma, dt)
+    exact = revaluer.exact_values(spots, [0.01] * 3, dt)
+    g = revaluer.greeks
+    taylor = g['value'] + g['vega'] * dsigma + g['theta'] * dt + 0.5 * g['volga'] * dsigma ** 2
+    live = book.T > 0.05
+    error = np.abs(book.quantity * (taylor - exact))[live]
+    assert np.all(error <= 2 * bound[live] + 1e-6)
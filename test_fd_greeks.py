@@ -0,0 +1,54 @@
+"""
+Tests for the batched finite-difference Greeks engine
+"""
+
+import numpy as np
+
+from fd_greeks import FD_GREEKS, fd_greeks, monte_carlo_european, validate_against_analytic
+from formulas import blackScholes_batch
+
+def test_closed_form_pricer_matches_analytic_greeks():
+    errors = validate_against_analytic()
+    assert set(errors) == set(FD_GREEKS)
+    for greek, error in errors.items():
+        assert error < 2e-3, greek
+
+def test_forward_scheme_is_less_accurate_than_central():
+    central = validate_against_analytic(greeks=('delta_call',), bumps={'S': 0.01})
+    forward = validate_against_analytic(greeks=('delta_call',), bumps={'S': 0.01}, scheme='forward')
+    assert central['delta_call'] < forward['delta_call']
+
+def test_all_bumps_priced_in_one_call():
+    calls = []
+
+    def counting_pricer(S, K, T, r, sigma):
+        calls.append(np.shape(S))
+        return monte_carlo_european(S, K, T, r, sigma, n_paths=1000)
+
+    fd_greeks(counting_pricer, 100.0, [95.0, 105.0], 0.5, 0.05, 0.2)
+    assert len(calls) == 1 and calls[0][1] == 2
+
+def test_common_random_numbers_stabilise_monte_carlo_delta():
+    K = np.array([90.0, 100.0, 110.0])
+    crn = validate_against_analytic(monte_carlo_european, K=K, greeks=('delta_call', 'gamma'),
+                                    bumps={'S': 0.01}, n_paths=50_000)
+    assert crn['delta_call'] < 5e-3
+    assert crn['gamma'] < 2e-3
+
+    # The same bumps with independent paths per scenario are far noisier
+    up = monte_carlo_european(101.0, K, 0.5, 0.05, 0.2, n_paths=50_000, seed=1)['call_price']
+    down = monte_carlo_european(99.0, K, 0.5, 0.05, 0.2, n_paths=50_000, seed=2)['call_price']
+    base = monte_carlo_european(100.0, K, 0.5, 0.05, 0.2, n_paths=50_000, seed=3)['call_price']
+    independent_gamma = up - 2 * base + down
+    analytic_gamma = blackScholes_batch(100.0, K, 0.5, 0.05, 0.2)['gamma']
+    assert np.max(np.abs(independent_gamma - analytic_gamma)) > 10 * crn['gamma']
+
+def test_expired_contracts_get_expiry_values():
+    with np.errstate(all='raise'):
+        result = fd_greeks(blackScholes_batch, 100.0, [95.0, 105.0], [0.0, 0.5], 0.05, 0.2)
+    live = fd_greeks(blackScholes_batch, 100.0, 105.0, 0.5, 0.05, 0.2)
+    # The expired call is in the money: delta is the intrinsic slope, the rest vanish
+    expected = {'delta_call': 1.0}
+    for greek in FD_GREEKS:
+        assert result[greek][0] == expected.get(greek, 0.0), greek
+        assert result[greek][1] == live[greek], greek
@@ -0,0 +1,43 @@
+"""
+Tests for the Heston characteristic-function pricers
+"""
+
+import numpy as np
+
+from formulas import blackScholes_batch
+from heston import _cos_terms, clear_cache, heston_fft, heston_price
+
+# Fang & Oosterlee (2008) reference case
+REFERENCE = dict(v0=0.0175, kappa=1.5768, theta=0.0398, xi=0.5751, rho=-0.5711)
+REFERENCE_PRICE = 5.785155450
+
+def test_reference_price():
+    cos = heston_price(100, 100, 1.0, 0.0, **REFERENCE, n_terms=512)['call_price']
+    fft = heston_price(100, 100, 1.0, 0.0, **REFERENCE, method='fft')['call_price']
+    assert abs(cos - REFERENCE_PRICE) < 1e-6
+    assert abs(fft - REFERENCE_PRICE) < 1e-5
+
+def test_black_scholes_limit():
+    K = np.linspace(50, 160, 12)
+    heston = heston_price(100, K, 0.7, 0.03, 0.09, 1.0, 0.09, 1e-4, 0.0, q=0.01)
+    bs = blackScholes_batch(100, K, 0.7, 0.03, 0.3, q=0.01)
+    assert np.allclose(heston['call_price'], bs['call_price'], atol=1e-6)
+    assert np.allclose(heston['put_price'], bs['put_price'], atol=1e-6)
+
+def test_fft_grid_matches_cos_and_parity():
+    params = dict(v0=0.04, kappa=2.0, theta=0.04, xi=0.5, rho=-0.7)
+    grid = heston_fft(100, 1.0, 0.05, **params, moneyness_range=(0.6, 1.6))
+    cos = heston_price(100, grid['strikes'], 1.0, 0.05, **params)
+    assert np.allclose(grid['call_price'], cos['call_price'], atol=1e-4)
+    parity = grid['call_price'] - grid['put_price'] - (100 - grid['strikes'] * np.exp(-0.05))
+    assert np.allclose(parity, 0, atol=1e-10)
+
+def test_characteristic_function_cached_across_spots():
+    clear_cache()
+    params = dict(v0=0.04, kappa=2.0, theta=0.04, xi=0.5, rho=-0.7)
+    low = heston_price(90, [90, 100], 0.5, 0.05, **params)
+    high = heston_price(110, [110 * 90 / 90, 110 * 100 / 90], 0.5, 0.05, **params)
+    assert _cos_terms.cache_info().misses == 1
+    assert _cos_terms.cache_info().hits == 1
+    # Prices are homogeneous of degree one in (S, K)
+    assert np.allclose(high['call_price'], low['call_price'] * 110 / 90)
@@ -0,0 +1,64 @@
+"""
+Tests for the persistent implied-volatility cache
+"""
+
+import numpy as np
+
+from formulas import blackScholes_batch
+from iv_cache import IVCache, fingerprint
+
+def make_chain(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    S = np.full(n, 100.0)
+    K = rng.uniform(80, 120, n)
+    T = rng.choice([0.1, 0.25, 0.5], n)
+    option_type = np.where(rng.random(n) < 0.5, 'call', 'put')
+    prices = blackScholes_batch(S, K, T, 0.05, 0.3)
+    price = np.where(option_type == 'call', prices['call_price'], prices['put_price'])
+    return S, K, T, 0.05, price, option_type
+
+def test_fingerprint_is_quantized_and_type_sensitive():
+    a = fingerprint(100.0, 100.0, 1.0, 0.05, 10.45, 'call')
+    assert a == fingerprint(100.0 + 1e-9, 100.0, 1.0, 0.05, 10.45, 'call')
+    assert a != fingerprint(100.01, 100.0, 1.0, 0.05, 10.45, 'call')
+    assert a != fingerprint(100.0, 100.0, 1.0, 0.05, 10.45, 'put')
+
+def test_cache_persists_across_instances(tmp_path):
+    path = tmp_path / 'iv.sqlite'
+    chain = make_chain()
+    with IVCache(path) as cache:
+        first = cache.implied_volatility(*chain)
+        assert cache.stats()['hit_rate'] == 0.0
+
+    with IVCache(path) as cache:
+        second = cache.implied_volatility(*chain)
+        assert cache.stats()['hits'] == len(first)
+        assert cache.stats()['hit_rate'] == 1.0
+    assert np.array_equal(first, second)
+    assert np.allclose(first, 0.3, atol=1e-4)
+
+def test_eviction_bounds_size(tmp_path):
+    with IVCache(tmp_path / 'iv.sqlite', max_entries=50) as cache:
+        cache.implied_volatility(*make_chain(n=120))
+        assert len(cache) == 50
+
+def test_bound_is_shared_by_every_writer(tmp_path):
+    path = tmp_path / 'iv.sqlite'
+    with IVCache(path, max_entries=50) as first, IVCache(path, max_entries=50) as second:
+        first.put_many(np.arange(40), np.full(40, 0.2))
+        second.put_many(np.arange(40, 80), np.full(40, 0.2))
+        # Refreshing existing keys does not change the count
+        first.put_many(np.arange(60, 80), np.full(20, 0.3))
+        count = first.connection.execute("SELECT COUNT(*) FROM iv_cache").fetchone()[0]
+        assert len(first) == len(second) == count == 50
+
+def test_solver_settings_are_part_of_the_key(tmp_path):
+    chain = make_chain(n=20)
+    with IVCache(tmp_path / 'iv.sqlite') as cache:
+        cache.implied_volatility(*chain, tolerance=1e-3)
+        tight = cache.implied_volatility(*chain, tolerance=1e-10)
+        assert cache.stats()['hits'] == 0
+        cache.implied_volatility(*chain, tolerance=1e-10, max_iterations=50)
+        assert cache.stats()['hits'] == 0
+        assert np.array_equal(cache.implied_volatility(*chain, tolerance=1e-10), tight)
+        assert cache.stats()['hits'] == 20
@@ -0,0 +1,53 @@
+"""
+Tests for the warm-started implied volatility solver
+"""
+
+import numpy as np
+
+from formulas import (approximate_implied_volatility, blackScholes_batch,
+                      calculate_implied_volatility, calculate_implied_volatility_batch)
+from iv_solver import IVSolver
+
+def quote(S, K, T, sigma, option_type):
+    prices = blackScholes_batch(S, K, T, 0.05, sigma)
+    return np.where(np.asarray(option_type) == 'call', prices['call_price'], prices['put_price'])
+
+def test_approximation_is_close_near_the_money():
+    K = np.array([95.0, 100.0, 105.0])
+    prices = quote(100.0, K, 0.5, 0.25, ['put', 'call', 'call'])
+    approx = approximate_implied_volatility(100.0, K, 0.5, 0.05, prices, ['put', 'call', 'call'])
+    assert np.allclose(approx, 0.25, atol=0.01)
+
+def test_tick_updates_converge_in_two_newton_steps():
+    K = np.linspace(80, 120, 21)
+    ids = [f"C{k:.0f}" for k in K]
+    sigma = 0.2 + 0.002 * np.abs(K - 100)
+    solver = IVSolver(tolerance=1e-8)
+    first = solver.solve(ids, 100.0, K, 0.25, 0.05, quote(100.0, K, 0.25, sigma, 'call'), 'call')
+    assert np.allclose(first, sigma, atol=1e-6)
+
+    # Next tick: small spot and vol moves
+    sigma_next = sigma + 0.001
+    solver.solve(ids, 100.2, K, 0.25, 0.05, quote(100.2, K, 0.25, sigma_next, 'call'), 'call')
+    assert solver.last_iterations.max() <= 2
+
+def test_new_strikes_seed_from_neighbours():
+    solver = IVSolver()
+    solver.solve(['A', 'B'], 100.0, [95.0, 105.0], 0.5, 0.05,
+                 quote(100.0, [95.0, 105.0], 0.5, [0.30, 0.26], 'call'), 'call')
+    guess, source = solver.initial_guess(['A', 'B', 'C', 'D'], 100.0, [95.0, 105.0, 100.0, 100.0],
+                                         [0.5, 0.5, 0.5, 1.0], 0.05, [10.0, 6.0, 8.0, 10.0], 'call')
+    assert list(source) == ['history', 'history', 'neighbour', 'approximation']
+    assert 0.26 < guess[2] < 0.30
+
+def test_unattainable_prices_have_no_implied_volatility():
+    # Above S, after expiry, below intrinsic value and from a zero starting guess
+    quotes = [(100, 100, 1.0, 150, 'call'), (100, 100, 0.0, 5, 'call'), (100, 90, 1.0, 10, 'call'),
+              (100, 100, 1.0, 96, 'put')]
+    for S, K, T, price, option_type in quotes:
+        assert np.isnan(calculate_implied_volatility(S, K, T, 0.05, price, option_type))
+        assert np.isnan(calculate_implied_volatility_batch(S, K, T, 0.05, price, option_type))
+    assert np.isnan(calculate_implied_volatility(100, 100, 1.0, 0.05, 10, initial_guess=0.0))
+    # Too few iterations to converge is a failure, not the last iterate
+    assert np.isnan(calculate_implied_volatility(100, 100, 1.0, 0.05, 10, max_iterations=1))
+    assert calculate_implied_volatility(100, 100, 1.0, 0.05, 0) == 0
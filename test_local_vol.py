@@ -0,0 +1,124 @@
+"""
+Tests for the Dupire local volatility surface and its PDE pricer
+"""
+
+import numpy as np
+import pytest
+
+from formulas import blackScholes_batch, norm_cdf
+from local_vol import LocalVolSurface, cached_surface, local_vol_price, svi_chain
+
+S, R, Q = 100.0, 0.03, 0.01
+EXPIRIES = [0.25, 0.5, 1.0]
+SKEW = [(0.0015 * T, 0.06 * np.sqrt(T), -0.6, 0.02, 0.15) for T in EXPIRIES]
+FLAT = [(0.04 * T, 1e-6, 0.0, 0.0, 0.1) for T in EXPIRIES]
+STRIKES = np.array([85.0, 95.0, 100.0, 105.0, 115.0])
+
+def build(params):
+    surface = LocalVolSurface(S, R, Q)
+    surface.update(svi_chain(S, R, Q, EXPIRIES, np.linspace(60, 150, 37), params))
+    return surface
+
+@pytest.fixture(scope='module')
+def skew():
+    return build(SKEW)
+
+@pytest.fixture(scope='module')
+def flat():
+    return build(FLAT)
+
+def smile_prices(surface, K, T, option_type='call'):
+    sigma = surface.implied_volatility(K, T)
+    return blackScholes_batch(S, K, T, R, sigma, outputs=f'{option_type}_price',
+                              q=Q)[f'{option_type}_price']
+
+def test_flat_smile_gives_flat_local_vol(flat):
+    np.testing.assert_allclose(flat.local_volatility(STRIKES, 0.6), 0.2, atol=2e-3)
+    for option_type in ('call', 'put'):
+        bs = blackScholes_batch(S, STRIKES, 0.75, R, 0.2, outputs=f'{option_type}_price', q=Q)
+        np.testing.assert_allclose(local_vol_price(flat, STRIKES, 0.75, option_type),
+                                   bs[f'{option_type}_price'], atol=2e-3)
+
+def test_local_vol_matches_dupire_on_prices(skew):
+    # Dupire's formula in strike and expiry, by finite differences of smile prices
+    K, T, dK, dT = STRIKES, 0.7, 0.25, 1e-4
+    C = lambda K, T: smile_prices(skew, K, T)
+    C_T = (C(K, T + dT) - C(K, T - dT)) / (2 * dT)
+    C_K = (C(K + dK, T) - C(K - dK, T)) / (2 * dK)
+    C_KK = (C(K + dK, T) - 2 * C(K, T) + C(K - dK, T)) / dK ** 2
+    local = np.sqrt((C_T + (R - Q) * K * C_K + Q * C(K, T)) / (0.5 * K ** 2 * C_KK))
+    np.testing.assert_allclose(skew.local_volatility(K, T), local, rtol=5e-3)
+
+@pytest.mark.parametrize('T', [0.25, 0.4, 1.0])
+def test_pde_reprices_the_smile(skew, T):
+    for option_type in ('call', 'put'):
+        np.testing.assert_allclose(local_vol_price(skew, STRIKES, T, option_type),
+                                   smile_prices(skew, STRIKES, T, option_type), atol=5e-3)
+
+def reflected(K, T, B, sigma, sign):
+    """
+    Reiner-Rubinstein knock-in with the strike beyond the barrier: a down-and-in
+    call for sign=1 (K > B), an up-and-in put for sign=-1 (K < B)
+    """
+    sig_sqrt_T = sigma * np.sqrt(T)
+    lam = (R - Q + 0.5 * sigma ** 2) / sigma ** 2
+    y = np.log(B ** 2 / (S * K)) / sig_sqrt_T + lam * sig_sqrt_T
+    return sign * (S * np.exp(-Q * T) * (B / S) ** (2 * lam) * norm_cdf(sign * y)
+                   - K * np.exp(-R * T) * (B / S) ** (2 * lam - 2)
+                   * norm_cdf(sign * (y - sig_sqrt_T)))
+
+def test_barriers_against_closed_form(flat):
+    # Continuously monitored barriers on a flat 20% surface, checked leg by leg
+    T, sigma = 0.75, 0.2
+    vanilla = blackScholes_batch(S, [105.0, 95.0], T, R, sigma, q=Q)
+    down_in = reflected(105.0, T, 85.0, sigma, 1)
+    down = {kind: local_vol_price(flat, 105.0, T, barrier=85.0, barrier_type=f'down-and-{kind}')
+            for kind in ('in', 'out')}
+    assert down['in'] == pytest.approx(down_in, abs=2e-3)
+    assert down['out'] == pytest.approx(vanilla['call_price'][0] - down_in, abs=2e-3)
+    up_in = reflected(95.0, T, 120.0, sigma, -1)
+    up = {kind: local_vol_price(flat, 95.0, T, 'put', barrier=120.0, barrier_type=f'up-and-{kind}')
+          for kind in ('in', 'out')}
+    assert up['in'] == pytest.approx(up_in, abs=2e-3)
+    assert up['out'] == pytest.approx(vanilla['put_price'][1] - up_in, abs=2e-3)
+    # Already through the barrier
+    assert local_vol_price(flat, 105.0, T, barrier=101.0, barrier_type='down-and-out') == 0
+
+def test_update_rebuilds_only_affected_slices():
+    surface = build(SKEW)
+    chain = svi_chain(S, R, Q, EXPIRIES, np.linspace(60, 150, 37), SKEW)
+    assert surface.update(chain)['refit'] == []
+    untouched = surface._intervals[(0.5, 1.0)]
+
+    # Requote the front expiry: only it is refit, and only its two intervals rebuilt
+    bumped = dict(chain, price=np.where(chain['T'] == 0.25, chain['price'] * 1.02, chain['price']))
+    report = surface.update(bumped)
+    assert report['refit'] == [0.25] and report['rebuilt'] == 2
+    assert surface._intervals[(0.5, 1.0)] is untouched
+    fresh = LocalVolSurface(S, R, Q)
+    fresh.update(bumped)
+    K, T = np.meshgrid(STRIKES, np.linspace(0.05, 1.0, 20))
+    np.testing.assert_allclose(surface.local_volatility(K, T), fresh.local_volatility(K, T),
+                               rtol=1e-3)
+
+    # Dropping an expiry joins its neighbours into one interval
+    keep = bumped['T'] != 0.5
+    report = surface.update({name: value[keep] if np.ndim(value) else value
+                             for name, value in bumped.items()})
+    assert report['removed'] == [0.5] and report['refit'] == [] and report['rebuilt'] == 1
+    assert sorted(surface._intervals) == [(0.0, 0.25), (0.25, 1.0)]
+
+def test_cached_surface_between_calls():
+    chain = svi_chain(S, R, Q, EXPIRIES, np.linspace(60, 150, 37), SKEW)
+    first = cached_surface('TEST', chain, R, Q)
+    again = cached_surface('TEST', chain, R, Q)
+    assert again is first
+    assert cached_surface('TEST', chain, R, 0.0) is not first
+
+def test_errors(skew):
+    with pytest.raises(ValueError):
+        LocalVolSurface(S).local_volatility(100.0, 1.0)
+    with pytest.raises(ValueError):
+        local_vol_price(skew, 100.0, 1.0, barrier=80.0, barrier_type='sideways')
+    with pytest.raises(ValueError):
+        local_vol_price(skew, 100.0, 1.0, option_type='straddle')
@@ -0,0 +1,82 @@
+"""
+Tests for the Merton jump-diffusion pricer
+"""
+
+import numpy as np
+import pytest
+
+from formulas import blackScholes_batch
+from merton import jump_terms, merton_price, merton_price_scalar
+
+S = np.array([80.0, 95.0, 100.0, 105.0, 120.0])[:, None]
+T = np.array([0.05, 0.5, 2.0])[None, :]
+JUMPS = dict(lam=1.5, mu_j=-0.08, delta_j=0.15)
+
+def test_no_jumps_is_black_scholes():
+    merton = merton_price(S, 100, T, 0.05, 0.25, lam=0.0, mu_j=-0.1, delta_j=0.2, q=0.02)
+    bs = blackScholes_batch(S, 100, T, 0.05, 0.25, q=0.02)
+    for name, values in bs.items():
+        np.testing.assert_allclose(merton[name], values, rtol=1e-12, atol=1e-12)
+    assert np.all(merton['n_terms'] == 1)
+
+def test_matches_scalar_series_and_parity():
+    merton = merton_price(S, 100, T, 0.05, 0.25, **JUMPS, q=0.01)
+    for i, j in np.ndindex(merton['call_price'].shape):
+        scalar = merton_price_scalar(S[i, 0], 100, T[0, j], 0.05, 0.25, **JUMPS, q=0.01)
+        assert merton['call_price'][i, j] == pytest.approx(scalar['call_price'], abs=1e-9)
+        assert merton['put_price'][i, j] == pytest.approx(scalar['put_price'], abs=1e-9)
+    # Jumps fatten both tails: every price is above Black-Scholes at the diffusion vol alone
+    bs = blackScholes_batch(S, 100, T, 0.05, 0.25, q=0.01)
+    assert np.all(merton['put_price'] > bs['put_price'])
+
+def test_monte_carlo():
+    rng = np.random.default_rng(7)
+    n, r, sigma, T_mc = 400_000, 0.05, 0.2, 0.75
+    k = np.expm1(JUMPS['mu_j'] + 0.5 * JUMPS['delta_j'] ** 2)
+    jumps = rng.poisson(JUMPS['lam'] * T_mc, n)
+    log_S = (np.log(100) + (r - JUMPS['lam'] * k - 0.5 * sigma ** 2) * T_mc
+             + sigma * np.sqrt(T_mc) * rng.standard_normal(n)
+             + jumps * JUMPS['mu_j'] + np.sqrt(jumps) * JUMPS['delta_j'] * rng.standard_normal(n))
+    payoff = np.exp(-r * T_mc) * np.maximum(100 - np.exp(log_S), 0)
+    price = merton_price(100, 100, T_mc, r, sigma, **JUMPS, outputs=('put_price',))['put_price']
+    assert abs(price - payoff.mean()) < 4 * payoff.std() / np.sqrt(n)
+
+@pytest.mark.parametrize('name, bump', [('delta_call', 'S'), ('delta_put', 'S'), ('vega', 'sigma'),
+                                        ('theta_call', 'T'), ('theta_put', 'T')])
+def test_greeks_against_finite_differences(name, bump):
+    inputs = dict(S=S, K=100.0, T=T, r=0.05, sigma=0.25, q=0.02, **JUMPS)
+    h = {'S': 1e-3, 'sigma': 1e-5, 'T': 1e-6}[bump]
+    price = 'call_price' if name.endswith('call') or name == 'vega' else 'put_price'
+    up = merton_price(**{**inputs, bump: inputs[bump] + h}, tolerance=1e-14)[price]
+    down = merton_price(**{**inputs, bump: inputs[bump] - h}, tolerance=1e-14)[price]
+    difference = (up - down) / (2 * h)
+    if bump == 'T':
+        difference = -difference
+    np.testing.assert_allclose(merton_price(**inputs)[name], difference, rtol=1e-5, atol=1e-6)
+
+def test_gamma_against_finite_differences():
+    h = 1e-3
+    up, down = (merton_price(S + shift, 100, T, 0.05, 0.25, **JUMPS)['delta_call']
+                for shift in (h, -h))
+    np.testing.assert_allclose(merton_price(S, 100, T, 0.05, 0.25, **JUMPS)['gamma'],
+                               (up - down) / (2 * h), rtol=1e-5, atol=1e-7)
+
+def test_truncation_within_tolerance():
+    # Many jumps per contract: terms grow with the expected count, error stays bounded
+    K = np.array([60.0, 100.0, 140.0])
+    T_long = np.array([0.1, 1.0, 5.0])
+    exact = merton_price(100, K, T_long, 0.03, 0.2, lam=5.0, mu_j=0.0, delta_j=0.1,
+                         tolerance=1e-15)
+    for tolerance in (1e-4, 1e-8):
+        truncated = merton_price(100, K, T_long, 0.03, 0.2, lam=5.0, mu_j=0.0, delta_j=0.1,
+                                 tolerance=tolerance)
+        assert np.all(np.abs(truncated['put_price'] - exact['put_price']) < tolerance)
+        assert np.all(np.diff(truncated['n_terms']) > 0)
+        assert np.all(truncated['n_terms'] < exact['n_terms'])
+    assert np.array_equal(jump_terms(K, T_long, 0.03, 5.0, 1e-15), exact['n_terms'])
+
+def test_expired_and_unsupported_outputs():
+    result = merton_price(100, 90, 0.0, 0.05, 0.2, **JUMPS)
+    assert result['call_price'] == 0
+    with pytest.raises(ValueError):
+        merton_price(100, 100, 1.0, 0.05, 0.2, **JUMPS, outputs=('vanna',))
@@ -0,0 +1,95 @@
+"""
+Tests for the P&L attribution engine
+"""
+
+import numpy as np
+import pytest
+
+from formulas import blackScholes
+from pnl_attribution import COMPONENTS, PnLAttributor
+from value_at_risk import OptionBook
+
+def make_book(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return OptionBook(underlying=rng.integers(0, 3, n), K=rng.uniform(80, 120, n),
+                      T=rng.uniform(0.05, 2.0, n), sigma=rng.uniform(0.15, 0.4, n),
+                      option_type=rng.choice(['call', 'put'], n),
+                      quantity=rng.integers(-5, 6, n), r=0.04, q=0.01)
+
+def test_components_add_up_at_every_level():
+    book = make_book()
+    attributor = PnLAttributor(book, [100.0, 50.0, 200.0])
+    old_values = attributor.value.copy()
+    explain = attributor.update([101.0, 49.0, 203.0], book.sigma + 0.01, 1 / 252)
+    positions = explain['positions']
+    np.testing.assert_allclose(sum(positions[name] for name in COMPONENTS), positions['total'],
+                               atol=1e-10)
+    np.testing.assert_allclose(positions['total'], book.quantity * (attributor.value - old_values))
+    for name, pnl in explain['by_underlying'].items():
+        assert pnl.shape == (3,)
+        assert pnl.sum() == pytest.approx(explain['book'][name])
+        assert explain['book'][name] == pytest.approx(positions[name].sum())
+
+def test_state_matches_scalar_pricer():
+    book = make_book(20)
+    spots = np.array([100.0, 50.0, 200.0])
+    attributor = PnLAttributor(book, spots)
+    for i in range(len(book)):
+        option = 'call' if book.is_call[i] else 'put'
+        expected = blackScholes(spots[book.underlying[i]], book.K[i], book.T[i], 0.04,
+                                book.sigma[i], q=0.01)
+        assert attributor.value[i] == pytest.approx(expected[f'{option}_price'], rel=1e-12)
+        assert attributor.delta[i] == pytest.approx(expected[f'delta_{option}'], rel=1e-12)
+        assert attributor.theta[i] == pytest.approx(expected[f'theta_{option}'], rel=1e-12)
+
+def test_single_factor_moves():
+    book = make_book()
+    spots = np.array([100.0, 50.0, 200.0])
+
+    explain = PnLAttributor(book, spots).update(spots * 1.002)
+    assert not np.any(explain['positions']['vega']) and not np.any(explain['positions']['theta'])
+    book_pnl = explain['book']
+    assert abs(book_pnl['unexplained']) < 1e-3 * abs(book_pnl['total'])
+
+    explain = PnLAttributor(book, spots).update(spots, dt=1 / (252 * 24))
+    assert explain['book']['theta'] == pytest.approx(explain['book']['total'], rel=1e-3)
+
+    explain = PnLAttributor(book, spots).update(spots, book.sigma + 1e-4)
+    assert explain['book']['vega'] == pytest.approx(explain['book']['total'], rel=1e-3)
+
+def test_unexplained_is_higher_order():
+    # Cross and third-order terms: halving every move cuts the remainder about fourfold
+    book = make_book()
+    spots = np.array([100.0, 50.0, 200.0])
+    remainders = []
+    for scale in (1.0, 0.5, 0.25):
+        explain = PnLAttributor(book, spots).update(spots * (1 + 0.01 * scale),
+                                                    book.sigma + 0.01 * scale, scale / 252)
+        remainders.append(np.abs(explain['positions']['unexplained']).sum())
+    assert remainders[0] / remainders[1] > 3 and remainders[1] / remainders[2] > 3
+
+def test_state_rolls_forward_and_expiry():
+    book = OptionBook(underlying=[0, 0], K=[95.0, 105.0], T=[0.01, 0.5], sigma=[0.2, 0.2],
+                      option_type=['call', 'put'], quantity=[1, 2])
+    attributor = PnLAttributor(book, [100.0])
+    attributor.update([101.0], dt=0.02)
+    # The first position expired in the money: worth intrinsic, delta is its slope
+    assert attributor.value[0] == pytest.approx(6.0)
+    assert attributor.T[0] == 0 and attributor.delta[0] == 1 and attributor.gamma[0] == 0
+    assert attributor.T[1] == pytest.approx(0.48)
+    explain = attributor.update([101.0])
+    assert all(value == 0 for value in explain['book'].values())
+    with pytest.raises(AttributeError):
+        attributor.rho
+
+def test_spot_moves_after_expiry_are_explained():
+    book = OptionBook(underlying=[0, 0, 0], K=[95.0, 105.0, 120.0], T=[0.01, 0.01, 0.01],
+                      sigma=[0.2, 0.2, 0.2], option_type=['call', 'put', 'call'],
+                      quantity=[3, -2, 5])
+    attributor = PnLAttributor(book, [100.0])
+    attributor.update([100.0], dt=0.02)
+    np.testing.assert_array_equal(attributor.delta, [1.0, -1.0, 0.0])
+    explain = attributor.update([102.5], dt=1 / 252)
+    np.testing.assert_allclose(explain['positions']['total'], [7.5, 5.0, 0.0])
+    np.testing.assert_allclose(explain['positions']['delta'], explain['positions']['total'])
+    assert explain['book']['unexplained'] == pytest.approx(0.0, abs=1e-12)
@@ -0,0 +1,35 @@
+"""
+Tests for the quote replay harness
+"""
+
+import pytest
+
+from replay import generate_synthetic_quotes, percentile, replay
+
+def test_replay_synthetic_stream(tmp_path):
+    path = tmp_path / 'quotes.csv'
+    generate_synthetic_quotes(path, n_ticks=300, seed=1)
+    report = replay(path)
+    assert report['ticks'] == 300
+    assert report['solver_failures'] == 0
+    assert report['ticks_per_second'] > 0
+    assert set(report['latency_us']) == {'parse', 'iv', 'greeks'}
+
+def test_replay_paced_by_speed(tmp_path):
+    path = tmp_path / 'quotes.csv'
+    generate_synthetic_quotes(path, n_ticks=50, tick_interval=0.01, seed=2)
+    report = replay(path, speed=10)
+    # ~0.5 s of recorded time at 10x takes at least ~0.05 s of wall time
+    assert report['elapsed_s'] >= 0.03
+
+def test_out_of_order_stream_rejected(tmp_path):
+    path = tmp_path / 'quotes.csv'
+    path.write_text("timestamp,underlying,S,K,T,r,price,type\n"
+                    "2.0,X,100,100,1,0.05,10.45,call\n"
+                    "1.0,X,100,100,1,0.05,10.45,call\n")
+    with pytest.raises(ValueError):
+        replay(path)
+
+def test_percentile():
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 99) == 4
@@ -0,0 +1,46 @@
+"""
+Tests for the two-parameter sensitivity grids
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from formulas import blackScholes
+from sensitivity import sensitivity_grid
+
+def test_grid_matches_scalar_pricer():
+    x, y, Z = sensitivity_grid(100, 100, 1, 0.05, 0.2, 'S', 'sigma', 'call_price', n=(7, 5))
+    assert Z.shape == (5, 7)
+    for i, sigma in enumerate(y):
+        for j, S in enumerate(x):
+            expected = blackScholes(S, 100, 1, 0.05, sigma, outputs=('call_price',))['call_price']
+            assert Z[i, j] == pytest.approx(expected, rel=1e-10)
+
+def test_strike_expiry_grid_with_ranges():
+    x, y, Z = sensitivity_grid(100, 100, 1, 0.05, 0.2, 'K', 'T', 'gamma', x_range=(80, 120),
+                               y_range=(0.1, 2), n=11)
+    assert x[0] == 80 and x[-1] == 120 and y[0] == 0.1 and y[-1] == 2
+    expected = blackScholes(100, x[3], y[4], 0.05, 0.2, outputs=('gamma',))['gamma']
+    assert Z[4, 3] == pytest.approx(expected, rel=1e-10)
+
+def test_rate_strike_grid_shape():
+    _, _, Z = sensitivity_grid(100, 100, 1, 0.05, 0.2, 'r', 'K', 'vega', n=(4, 3))
+    assert Z.shape == (3, 4)
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        sensitivity_grid(100, 100, 1, 0.05, 0.2, 'spot', 'sigma')
+    with pytest.raises(ValueError):
+        sensitivity_grid(100, 100, 1, 0.05, 0.2, 'S', 'S')
+    with pytest.raises(ValueError):
+        sensitivity_grid(100, 100, 1, 0.05, 0.2, output='price')
+
+def test_full_grid_is_fast():
+    sensitivity_grid(100, 100, 1, 0.05, 0.2)
+    start = time.perf_counter()
+    _, _, Z = sensitivity_grid(100, 100, 1, 0.05, 0.2, 'S', 'sigma', 'gamma')
+    assert Z.shape == (200, 200) and np.isfinite(Z).all()
+    # 50 ms is the interactive target; allow headroom for slow CI machines
+    assert time.perf_counter() - start < 0.5
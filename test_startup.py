@@ -0,0 +1,19 @@
+"""
+Tests for the start-up benchmark and the lazy-import guarantees it checks
+"""
+
+from startup_benchmark import measure, parse_importtime
+
+def test_parse_importtime():
+    stderr = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _operator
+import time:       300 |        420 |   operator
+import time:      1500 |       1920 | formulas
+"""
+    assert parse_importtime(stderr) == [('_operator', 120, 120, 2), ('operator', 300, 420, 1),
+                                        ('formulas', 1500, 1920, 0)]
+
+def test_headless_pricing_does_not_import_heavy_packages():
+    result = measure(runs=1)
+    assert result['heavy_packages'] == []
+    assert any(name == 'formulas' for name, _, _, _ in result['records'])
@@ -0,0 +1,60 @@
+"""
+Tests for multi-leg strategies
+"""
+
+import numpy as np
+
+from formulas import blackScholes
+from strategy import PRESETS, Strategy, butterfly, covered_call, iron_condor, straddle
+
+S, T, r, sigma = 100.0, 0.5, 0.05, 0.2
+
+def test_value_and_greeks_sum_the_legs():
+    condor = iron_condor(80, 90, 110, 120, T)
+    grid = np.array([85.0, 100.0, 115.0])
+    value = condor.value(grid, r, sigma)
+    greeks = condor.greeks(grid, r, sigma)
+    for i, spot in enumerate(grid):
+        legs = [blackScholes(spot, K, T, r, sigma) for K in (80, 90, 110, 120)]
+        expected = (legs[0]['put_price'] - legs[1]['put_price']
+                    - legs[2]['call_price'] + legs[3]['call_price'])
+        delta = (legs[0]['delta_put'] - legs[1]['delta_put']
+                 - legs[2]['delta_call'] + legs[3]['delta_call'])
+        assert abs(value[i] - expected) < 1e-10
+        assert abs(greeks['delta'][i] - delta) < 1e-10
+
+def test_payoff_and_breakevens():
+    fly = butterfly(90, 100, 110, T).with_premiums(S, r, sigma)
+    grid = np.array([80.0, 95.0, 100.0, 105.0, 120.0])
+    assert np.allclose(fly.payoff(grid), [0, 5, 10, 5, 0])
+    assert np.allclose(fly.profit(grid, r, sigma), fly.payoff(grid) - fly.cost)
+    assert np.allclose(fly.breakevens(r, sigma), [90 + fly.cost, 110 - fly.cost])
+
+    both = straddle(100, T).with_premiums(S, r, sigma)
+    assert np.allclose(both.breakevens(r, sigma), [100 - both.cost, 100 + both.cost])
+
+def test_value_before_expiry_and_stock_legs():
+    covered = covered_call(105, T).with_premiums(S, r, sigma)
+    call = blackScholes(S, 105, T, r, sigma)
+    assert abs(covered.cost - (S - call['call_price'])) < 1e-10
+    assert abs(covered.greeks(S, r, sigma)['delta'][0] - (1 - call['delta_call'])) < 1e-10
+    # Profit today is zero at the entry spot
+    assert abs(covered.profit(S, r, sigma, t=0.0)[0]) < 1e-10
+
+    # A calendar spread values the back month at the front expiry
+    calendar = Strategy(['call', 'call'], [100, 100], [0.25, 0.5], [-1, 1])
+    back = blackScholes(100, 100, 0.25, r, sigma)['call_price']
+    assert abs(calendar.value(100.0, r, sigma, t=calendar.expiry)[0] - back) < 1e-10
+
+def test_expired_legs_keep_the_payoff_slope():
+    # The front call has expired in the money; the back call is still live
+    calendar = Strategy(['call', 'call'], [100, 100], [0.25, 0.5], [-1, 1])
+    greeks = calendar.greeks(np.array([110.0]), r, sigma, t=0.25)
+    back = blackScholes(110, 100, 0.25, r, sigma)
+    assert abs(greeks['delta'][0] - (back['delta_call'] - 1)) < 1e-10
+    assert abs(greeks['gamma'][0] - back['gamma']) < 1e-10
+
+def test_presets_build():
+    for name, build in PRESETS.items():
+        strategy = build(100, T).with_premiums(S, r, sigma)
+        assert len(strategy.breakevens(r, sigma)) >= 1, name
@@ -0,0 +1,64 @@
+"""
+Tests for rate and volatility term structures
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from engines import price
+from formulas import blackScholes, blackScholes_batch, calculate_implied_volatility_batch
+from term_structure import RateCurve, VolTermStructure
+
+rates = RateCurve([0.5, 1, 2], [0.05, 0.045, 0.04])
+vols = VolTermStructure([0.25, 1, 2], [0.3, 0.25, 0.22])
+
+def test_rate_curve_pillars_and_interpolation():
+    assert rates.zero_rate(1.0) == pytest.approx(0.045)
+    assert rates.discount(2.0) == pytest.approx(math.exp(-0.08))
+    # Flat before the first and after the last pillar
+    assert rates.zero_rate([0.0, 0.1, 5.0]) == pytest.approx([0.05, 0.05, 0.04])
+    # Piecewise flat forwards: log discount is linear between pillars
+    assert rates.forward_rate(1.0, 2.0) == pytest.approx(0.035)
+    assert rates.zero_rate(1.5) * 1.5 == pytest.approx(0.045 + 0.5 * 0.035)
+
+def test_vol_term_structure_interpolates_total_variance():
+    assert vols.volatility([0.1, 1.0, 3.0]) == pytest.approx([0.3, 0.25, 0.22])
+    assert vols.total_variance(0.5) == pytest.approx(0.0225 + (0.0625 - 0.0225) / 3)
+    assert vols.forward_variance(1.0, 2.0) == pytest.approx(2 * 0.22 ** 2 - 0.25 ** 2)
+    with pytest.raises(ValueError):
+        VolTermStructure([1, 2], [0.3, 0.2])
+    with pytest.raises(ValueError):
+        RateCurve([1, 0.5], [0.05, 0.04])
+
+def test_values_are_memoized_per_unique_expiry():
+    curve = VolTermStructure([0.25, 1], [0.3, 0.25])
+    T = np.tile([0.25, 0.5, 1.0], 1000)
+    first = curve.volatility(T)
+    assert len(curve.total_variance.values) == 3
+    assert np.array_equal(curve.volatility(T), first)
+    curve.clear_cache()
+    assert not curve.total_variance.values
+
+def test_batch_pricer_accepts_curves():
+    K = np.array([90.0, 100.0, 110.0, 100.0])
+    T = np.array([0.25, 0.5, 1.5, 3.0])
+    batch = blackScholes_batch(100, K, T, rates, vols, outputs='all')
+    for i in range(len(K)):
+        expected = blackScholes(100, K[i], T[i], float(rates.zero_rate(T[i])),
+                                float(vols.volatility(T[i])), outputs='all')
+        for name, value in expected.items():
+            assert batch[name][i] == pytest.approx(value, rel=1e-10, abs=1e-12)
+    assert price(100, K, T, rates, vols)['call_price'] == pytest.approx(batch['call_price'])
+    assert price(100, 100, 1.0, rates, vols)['call_price'] == pytest.approx(
+        blackScholes(100, 100, 1.0, 0.045, 0.25)['call_price'])
+
+def test_implied_volatility_batch_accepts_curves():
+    K = np.array([90.0, 100.0, 110.0, 100.0])
+    T = np.array([0.25, 0.5, 1.5, 3.0])
+    dividends = RateCurve([1, 3], [0.01, 0.02])
+    prices = blackScholes_batch(100, K, T, rates, vols, outputs='put_price', q=dividends)
+    implied = calculate_implied_volatility_batch(100, K, T, rates, prices['put_price'], 'put',
+                                                 tolerance=1e-10, q=dividends)
+    assert implied == pytest.approx(vols.volatility(T), rel=1e-8)
@@ -0,0 +1,58 @@
+"""
+Tests for the Value-at-Risk engine
+"""
+
+import numpy as np
+
+from value_at_risk import (OptionBook, compute_var, full_revaluation_pnl, historical_scenarios,
+                           monte_carlo_scenarios)
+
+def make_book():
+    return OptionBook(underlying=[0, 0, 1], K=[100, 105, 50], T=[0.5, 0.5, 1.0],
+                      sigma=[0.2, 0.25, 0.3], option_type=['call', 'put', 'call'],
+                      quantity=[5, -3, 10])
+
+def test_chunking_and_workers_do_not_change_pnl():
+    book = make_book()
+    spots = [100.0, 50.0]
+    scenarios = monte_carlo_scenarios(spots, [0.2, 0.3], np.eye(2), 5000, seed=1)
+    reference = full_revaluation_pnl(book, spots, scenarios, chunk_size=5000)
+    chunked = full_revaluation_pnl(book, spots, scenarios, chunk_size=333)
+    parallel = full_revaluation_pnl(book, spots, scenarios, chunk_size=1000, workers=2)
+    assert np.allclose(reference, chunked)
+    assert np.allclose(reference, parallel)
+
+def test_historical_var_matches_direct_repricing():
+    book = make_book()
+    spots = np.array([100.0, 50.0])
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0, 0.015, size=(500, 2))
+    scenarios = historical_scenarios(spots, returns)
+    result = compute_var(book, spots, scenarios, confidence=0.95)
+
+    base = book.value(spots)
+    direct = []
+    for scenario in scenarios:
+        shifted = OptionBook(book.underlying, book.K, book.T - 1 / 252, book.sigma,
+                             np.where(book.is_call, 'call', 'put'), book.quantity)
+        direct.append(shifted.value(scenario) - base)
+    assert np.allclose(result['pnl'], direct)
+    assert result['es'] >= result['var'] > 0
+
+def test_positions_expiring_within_the_horizon_are_worth_intrinsic():
+    # A K=90 call with half a day left expires inside a one-day horizon
+    book = OptionBook(underlying=[0], K=[90], T=[0.5 / 252], sigma=[0.2], option_type=['call'],
+                      quantity=[1])
+    pnl = full_revaluation_pnl(book, [100.0], [[100.0], [101.0]])
+    base = book.value([100.0])
+    assert np.allclose(pnl, [10 - base, 11 - base])
+    assert pnl[1] > 0
+
+def test_delta_gamma_vega_close_to_full_revaluation():
+    book = make_book()
+    spots = [100.0, 50.0]
+    scenarios = monte_carlo_scenarios(spots, [0.2, 0.3], [[1, 0.5], [0.5, 1]], 4000, seed=2)
+    vol_shifts = np.random.default_rng(4).normal(0, 0.005, scenarios.shape)
+    result = compute_var(book, spots, scenarios, vol_shifts, method='delta_gamma_vega')
+    assert abs(result['var_error']) < 0.02 * result['full_var']
+    assert result['max_abs_pnl_error'] < 0.5
@@ -0,0 +1,41 @@
+"""
+Tests for cached spot x time value surfaces
+"""
+
+import numpy as np
+
+from strategy import Strategy, iron_condor, single
+from value_surface import cached_surface, spot_range
+
+r, sigma = 0.05, 0.2
+
+def test_slices_match_direct_valuation():
+    condor = iron_condor(80, 90, 110, 120, 1.0)
+    surface = cached_surface(condor, r, sigma)
+    # A stored slice is exact; between slices the error is small
+    stored = surface.tau[60]
+    assert np.allclose(surface.at(stored)['value'],
+                       condor.value(surface.S, r, sigma, t=1.0 - stored), atol=1e-12)
+    assert np.allclose(surface.at(0.63)['value'], condor.value(surface.S, r, sigma, t=0.37),
+                       atol=5e-3)
+    greeks = condor.greeks(surface.S, r, sigma, t=1.0 - stored)
+    for name in ('delta', 'gamma', 'theta', 'vega'):
+        assert np.allclose(surface.at(stored)[name], greeks[name], atol=1e-12)
+    assert np.allclose(surface.at(0.0)['value'], condor.payoff(surface.S))
+
+def test_cache_is_shared_across_expiries():
+    first = cached_surface(single('call', 100, 1.0), r, sigma)
+    # Moving the expiry slider keeps the legs' relative expiries, so the surface is reused
+    assert cached_surface(single('call', 100, 0.3), r, sigma) is first
+    assert cached_surface(single('call', 105, 1.0), r, sigma) is not first
+
+def test_calendar_offsets():
+    calendar = Strategy(['call', 'call'], [100, 100], [0.25, 0.5], [-1, 1])
+    surface = cached_surface(calendar, r, sigma)
+    stored = surface.tau[40]
+    assert np.allclose(surface.at(stored)['value'],
+                       calendar.value(surface.S, r, sigma, t=0.25 - stored), atol=1e-12)
+
+def test_spot_range_covers_strikes():
+    assert spot_range(single('call', 100, 1.0)) == (50, 150)
+    assert spot_range(iron_condor(30, 60, 140, 200, 1.0)) == (24.0, 240.0)
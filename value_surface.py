@@ -0,0 +1,129 @@
+"""
+Precomputed spot x time value surfaces
+Evaluates a strategy's value and Greeks over a spot grid and a grid of
+remaining times in one (legs x times x spots) broadcast, and caches the
+result per (legs, r, sigma). The time axis is the time left until the
+strategy's front expiry, so scrubbing time to expiry in the apps is an
+interpolation between two stored slices instead of a repricing.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from formulas import blackScholes_batch, expire
+from strategy import Strategy
+
+SURFACE_OUTPUTS = ('value', 'delta', 'gamma', 'theta', 'vega')
+
+# Longest remaining time covered by cached surfaces (the apps' T slider maximum)
+TAU_MAX = 5.0
+
+class ValueSurface:
+    """
+    Value and Greeks of a strategy over (remaining time, spot)
+
+    Parameters:
+    strategy: Strategy to evaluate; its legs' expiries are only used
+              relative to the front expiry
+    r: Risk-free interest rate
+    sigma: Volatility
+    q: Continuous dividend yield
+    S_range: (low, high) spot range
+    tau_max: Longest time to the front expiry on the grid
+    n_spots: Spot grid size
+    n_times: Time grid size (spaced quadratically, denser near expiry
+             where the surface bends most)
+    """
+
+    def __init__(self, strategy, r, sigma, q=0.0, S_range=(50, 150), tau_max=TAU_MAX,
+                 n_spots=201, n_times=121):
+        self.S = np.linspace(*S_range, n_spots)
+        self.tau = tau_max * np.linspace(0, 1, n_times) ** 2
+
+        options = ~strategy.is_stock
+        offset = np.where(options, strategy.T - strategy.expiry, 0.0)
+        remaining = (self.tau[None, :] + offset[:, None])[:, :, None]
+        K = np.where(options, strategy.K, 1.0)[:, None, None]
+        S = self.S[None, None, :]
+        # Legs past their own expiry take their expiry values (intrinsic value and its slope)
+        legs = expire(blackScholes_batch(S, K, remaining, r, sigma, q=q), S, K, remaining)
+
+        call = strategy.is_call[:, None, None]
+        stock = strategy.is_stock[:, None, None]
+        per_leg = {
+            'value': np.where(stock, S, np.where(call, legs['call_price'], legs['put_price'])),
+            'delta': np.where(stock, 1.0, np.where(call, legs['delta_call'], legs['delta_put'])),
+            'gamma': np.where(stock, 0.0, legs['gamma']),
+            'theta': np.where(stock, 0.0, np.where(call, legs['theta_call'], legs['theta_put'])),
+            'vega': np.where(stock, 0.0, legs['vega'])
+        }
+        # (times, spots) per output
+        self.surfaces = {name: np.tensordot(strategy.quantity, values, axes=1)
+                         for name, values in per_leg.items()}
+
+    def at(self, tau):
+        """
+        Curves over the spot grid with tau years left to the front expiry
+
+        Linear interpolation between the two nearest stored time slices.
+
+        Returns:
+        dict: One array over self.S per name in SURFACE_OUTPUTS
+        """
+        tau = float(np.clip(tau, self.tau[0], self.tau[-1]))
+        upper = int(np.clip(np.searchsorted(self.tau, tau), 1, len(self.tau) - 1))
+        weight = (tau - self.tau[upper - 1]) / (self.tau[upper] - self.tau[upper - 1])
+        return {name: (1 - weight) * surface[upper - 1] + weight * surface[upper]
+                for name, surface in self.surfaces.items()}
+
+    def value_at(self, S, tau):
+        """Position value at spot(s) S with tau years left, interpolated from the surface"""
+        return np.interp(S, self.S, self.at(tau)['value'])
+
+def spot_range(strategy):
+    """Spot range for charting a strategy: the usual 50-150, widened to cover its strikes"""
+    strikes = strategy.K[~strategy.is_stock]
+    return min(50, 0.8 * strikes.min()), max(150, 1.2 * strikes.max())
+
+@lru_cache(maxsize=32)
+def _cached(legs, r, sigma, q, S_range, tau_max, n_spots, n_times):
+    option_type, K, offset, quantity = (list(column) for column in zip(*legs))
+    strategy = Strategy(option_type, K, offset, quantity)
+    return ValueSurface(strategy, r, sigma, q, S_range, tau_max, n_spots, n_times)
+
+def cached_surface(strategy, r, sigma, q=0.0, S_range=(50, 150), tau_max=TAU_MAX, n_spots=201,
+                   n_times=121):
+    """
+    ValueSurface of a strategy, built once per (legs, r, sigma, q, grid)
+
+    Only the legs' types, strikes, quantities and expiries relative to the
+    front expiry enter the key, so moving the time-to-expiry slider (which
+    shifts every leg together) reuses the cached surface.
+    """
+    legs = tuple(zip(strategy.option_type.tolist(), strategy.K.tolist(),
+                     (strategy.T - strategy.expiry).tolist(), strategy.quantity.tolist()))
+    return _cached(legs, float(r), float(sigma), float(q), tuple(map(float, S_range)),
+                   float(tau_max), n_spots, n_times)
+
+if __name__ == "__main__":
+    import time
+
+    from strategy import iron_condor
+
+    condor = iron_condor(80, 90, 110, 120, 1.0)
+    start = time.perf_counter()
+    surface = cached_surface(condor, 0.05, 0.2)
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for tau in np.linspace(1.0, 0.0, 100):
+        cached_surface(condor, 0.05, 0.2).at(tau)
+    scrub_ms = (time.perf_counter() - start) * 1000 / 100
+
+    print("Value Surface")
+    print("=" * 50)
+    print(f"Surface {surface.surfaces['value'].shape} built in {build_ms:.2f} ms")
+    print(f"Scrub step (cache hit + slice): {scrub_ms * 1000:.1f} µs")
+    exact = condor.value(surface.S, 0.05, 0.2, t=0.37)
+    error = np.max(np.abs(surface.at(0.63)['value'] - exact))
+    print(f"Max interpolation error at tau = 0.63: {error:.2e}")
@@ -1,10 +1,15 @@
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
-from formulas import blackScholes, calculate_implied_volatility
+from formulas import (ALL_OUTPUTS, blackScholes, blackScholes_batch, calculate_implied_volatility,
+                      calculate_implied_volatility_batch)
+from adaptive_sampling import adaptive_curve
+from engines import price
+from heston import heston_price
+from sensitivity import PARAMETERS, sensitivity_grid
+from strategy import PRESETS, single
+from value_surface import cached_surface, spot_range
 
 # Page configuration
 st.set_page_config(
@@ -126,25 +131,65 @@ def main():
     
     # Sensitivity Analysis
     st.subheader("Sensitivity Analysis")
-    sensitivity_param = st.selectbox(
-        "Select Parameter for Sensitivity Analysis",
-        ["Stock Price", "Strike Price", "Time to Expiry", "Volatility"]
-    )
-    
-    # Create sensitivity chart
-    fig_sensitivity = create_sensitivity_chart(S, K, T, r, sigma, sensitivity_param)
+    sensitivity_mode = st.radio("Mode", ["Single Parameter", "Two Parameters (Heatmap)"],
+                                horizontal=True)
+    
+    if sensitivity_mode == "Single Parameter":
+        sensitivity_param = st.selectbox(
+            "Select Parameter for Sensitivity Analysis",
+            ["Stock Price", "Strike Price", "Time to Expiry", "Volatility"]
+        )
+        
+        # Create sensitivity chart
+        fig_sensitivity = create_sensitivity_chart(S, K, T, r, sigma, sensitivity_param)
+    else:
+        hcol1, hcol2, hcol3 = st.columns(3)
+        with hcol1:
+            x_param = st.selectbox("X Axis", list(PARAMETERS),
+                                   format_func=lambda name: PARAMETERS[name][1])
+        with hcol2:
+            y_options = [name for name in PARAMETERS if name != x_param]
+            y_param = st.selectbox("Y Axis", y_options, index=y_options.index('sigma')
+                                   if 'sigma' in y_options else 0,
+                                   format_func=lambda name: PARAMETERS[name][1])
+        with hcol3:
+            output = st.selectbox("Output", ALL_OUTPUTS)
+        
+        # Create heatmap (200 x 200 grid priced in one call)
+        fig_sensitivity = create_heatmap_chart(S, K, T, r, sigma, x_param, y_param, output)
     st.plotly_chart(fig_sensitivity, use_container_width=True)
     
     # Payoff Diagram
     st.subheader("Payoff Diagram")
-    fig_payoff = create_payoff_chart(S, K, T, r, sigma)
+    strategy_name = st.selectbox("Strategy", ["Single Call & Put"] + list(PRESETS))
+    strategy = PRESETS[strategy_name](K, T) if strategy_name in PRESETS else None
+    fig_payoff = create_payoff_chart(S, K, T, r, sigma, strategy)
     st.plotly_chart(fig_payoff, use_container_width=True)
     
+    # Time Decay (read from a cached spot x time surface, so scrubbing never reprices)
+    st.subheader("Time Decay")
+    remaining = st.slider("Time Remaining (years)", 0.0, float(T), float(T), 0.01)
+    fig_decay = create_decay_chart(S, K, T, r, sigma, strategy, remaining)
+    st.plotly_chart(fig_decay, use_container_width=True)
+    
     # Greeks Visualization
     st.subheader("Greeks Visualization")
     fig_greeks = create_greeks_chart(S, K, T, r, sigma)
     st.plotly_chart(fig_greeks, use_container_width=True)
     
+    # Heston vs Black-Scholes
+    st.subheader("Heston vs Black-Scholes")
+    with st.expander("Heston Parameters (initial variance = volatility²)"):
+        hcol1, hcol2 = st.columns(2)
+        with hcol1:
+            kappa = st.slider("Mean Reversion (κ)", 0.1, 10.0, 2.0, 0.1)
+            theta = st.slider("Long-run Variance (θ)", 0.01, 0.5, max(0.01, round(sigma ** 2, 2)), 0.01)
+        with hcol2:
+            xi = st.slider("Vol of Vol (ξ)", 0.01, 2.0, 0.5, 0.01)
+            rho = st.slider("Spot-Vol Correlation (ρ)", -0.99, 0.99, -0.7, 0.01)
+    fig_heston = create_heston_chart(S, T, r, sigma, kappa, theta, xi, rho)
+    st.plotly_chart(fig_heston, use_container_width=True)
+    
     # Footer
     st.markdown("---")
     st.markdown("""
@@ -155,34 +200,29 @@ def main():
 
 def create_sensitivity_chart(S, K, T, r, sigma, param_name):
     """Create sensitivity analysis chart"""
+    # (position in the pricer's arguments, range) of the varied parameter
     if param_name == "Stock Price":
-        x_range = np.linspace(50, 150, 100)
+        axis, bounds = 0, (50, 150)
         x_label = "Stock Price ($)"
-        param_values = [(s, K, T, r, sigma) for s in x_range]
     elif param_name == "Strike Price":
-        x_range = np.linspace(50, 150, 100)
+        axis, bounds = 1, (50, 150)
         x_label = "Strike Price ($)"
-        param_values = [(S, k, T, r, sigma) for k in x_range]
     elif param_name == "Time to Expiry":
-        x_range = np.linspace(0.1, 5, 100)
+        axis, bounds = 2, (0.1, 5)
         x_label = "Time to Expiry (years)"
-        param_values = [(S, K, t, r, sigma) for t in x_range]
     else:  # Volatility
-        x_range = np.linspace(0.05, 0.8, 100)
+        axis, bounds = 4, (0.05, 0.8)
         x_label = "Volatility"
-        param_values = [(S, K, T, r, s) for s in x_range]
     
-    call_prices = []
-    put_prices = []
+    def curve(x):
+        inputs = [S, K, T, r, sigma]
+        inputs[axis] = x
+        return price(*inputs, outputs=('call_price', 'put_price'))
     
-    for params in param_values:
-        try:
-            result = blackScholes(*params)
-            call_prices.append(result['call_price'])
-            put_prices.append(result['put_price'])
-        except:
-            call_prices.append(0)
-            put_prices.append(0)
+    # Points are concentrated where the prices bend
+    x_range, result = adaptive_curve(curve, *bounds)
+    call_prices = result['call_price']
+    put_prices = result['put_price']
     
     fig = go.Figure()
     
@@ -211,8 +251,42 @@ def create_sensitivity_chart(S, K, T, r, sigma, param_name):
     
     return fig
 
-def create_payoff_chart(S, K, T, r, sigma):
-    """Create payoff diagram"""
+def create_heatmap_chart(S, K, T, r, sigma, x_param, y_param, output):
+    """Create two-parameter sensitivity heatmap for a price or Greek"""
+    x, y, Z = sensitivity_grid(S, K, T, r, sigma, x_param, y_param, output)
+    current = dict(S=S, K=K, T=T, r=r, sigma=sigma)
+    title = output.replace('_', ' ').title()
+    
+    fig = go.Figure()
+    fig.add_trace(go.Contour(
+        x=x, y=y, z=Z,
+        colorscale='Viridis',
+        contours_coloring='heatmap',
+        colorbar=dict(title=title)
+    ))
+    
+    # Mark the current parameters
+    fig.add_trace(go.Scatter(
+        x=[current[x_param]], y=[current[y_param]],
+        mode='markers',
+        name='Current',
+        marker=dict(color='red', size=10, symbol='x')
+    ))
+    
+    fig.update_layout(
+        title=f'{title} Sensitivity',
+        xaxis_title=PARAMETERS[x_param][1],
+        yaxis_title=PARAMETERS[y_param][1],
+        height=500
+    )
+    
+    return fig
+
+def create_payoff_chart(S, K, T, r, sigma, strategy=None):
+    """Create payoff diagram for a single call and put, or for a multi-leg strategy"""
+    if strategy is not None:
+        return create_strategy_chart(S, r, sigma, strategy)
+    
     S_range = np.linspace(50, 150, 100)
     
     # Payoff calculations
@@ -265,27 +339,103 @@ def create_payoff_chart(S, K, T, r, sigma):
     
     return fig
 
+def create_decay_chart(S, K, T, r, sigma, strategy, remaining):
+    """Create value and theta across spot with a chosen time remaining, from cached value surfaces"""
+    if strategy is None:
+        strategies = [single('call', K, T), single('put', K, T)]
+    else:
+        strategies = [strategy]
+    
+    fig = make_subplots(rows=1, cols=2, subplot_titles=('Value', 'Theta'))
+    
+    for strategy, color in zip(strategies, ('blue', 'red')):
+        surface = cached_surface(strategy, r, sigma, S_range=spot_range(strategy))
+        curves = surface.at(remaining)
+        fig.add_trace(
+            go.Scatter(x=surface.S, y=curves['value'], mode='lines',
+                      name=f'{strategy.name} ({remaining:.2f} years left)',
+                      line=dict(color=color, width=3)),
+            row=1, col=1
+        )
+        fig.add_trace(
+            go.Scatter(x=surface.S, y=surface.at(0.0)['value'], mode='lines',
+                      name=f'{strategy.name} at Expiry',
+                      line=dict(color=color, width=1, dash='dash')),
+            row=1, col=1
+        )
+        fig.add_trace(
+            go.Scatter(x=surface.S, y=curves['theta'], mode='lines',
+                      name=f'{strategy.name} Theta', showlegend=False,
+                      line=dict(color=color, width=2)),
+            row=1, col=2
+        )
+    
+    # Add current stock price line
+    fig.add_vline(x=S, line_dash="dot", line_color="green", opacity=0.5)
+    
+    fig.update_layout(
+        title='Time Decay',
+        hovermode='x unified',
+        height=400
+    )
+    fig.update_xaxes(title_text="Stock Price ($)", row=1, col=1)
+    fig.update_xaxes(title_text="Stock Price ($)", row=1, col=2)
+    fig.update_yaxes(title_text="Value ($)", row=1, col=1)
+    fig.update_yaxes(title_text="Theta", row=1, col=2)
+    
+    return fig
+
+def create_strategy_chart(S, r, sigma, strategy):
+    """Create profit/loss diagram of a multi-leg strategy entered at today's prices"""
+    strategy = strategy.with_premiums(S, r, sigma)
+    S_range = np.linspace(*spot_range(strategy), 200)
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=S_range, y=strategy.profit(S_range, r, sigma),
+        mode='lines',
+        name='Profit/Loss at Expiry',
+        line=dict(color='blue', width=3)
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=S_range, y=strategy.profit(S_range, r, sigma, t=0.0),
+        mode='lines',
+        name='Profit/Loss Today',
+        line=dict(color='orange', width=2, dash='dash')
+    ))
+    
+    # Add zero line
+    fig.add_hline(y=0, line_dash="dash", line_color="black", opacity=0.5)
+    
+    # Add breakeven lines
+    for breakeven in strategy.breakevens(r, sigma):
+        fig.add_vline(x=breakeven, line_dash="dot", line_color="green", opacity=0.5,
+                      annotation_text=f"Breakeven (${breakeven:.2f})")
+    
+    fig.update_layout(
+        title=f'{strategy.name} Payoff Diagram (net cost ${strategy.cost:.2f})',
+        xaxis_title='Stock Price at Expiry ($)',
+        yaxis_title='Profit/Loss ($)',
+        hovermode='x unified',
+        showlegend=True,
+        height=400
+    )
+    
+    return fig
+
 def create_greeks_chart(S, K, T, r, sigma):
     """Create Greeks visualization chart"""
-    S_range = np.linspace(50, 150, 100)
+    def curve(s):
+        return price(s, K, T, r, sigma, outputs=('delta_call', 'delta_put', 'gamma', 'vega'))
     
-    deltas_call = []
-    deltas_put = []
-    gammas = []
-    vegas = []
-    
-    for s in S_range:
-        try:
-            result = blackScholes(s, K, T, r, sigma)
-            deltas_call.append(result['delta_call'])
-            deltas_put.append(result['delta_put'])
-            gammas.append(result['gamma'])
-            vegas.append(result['vega'])
-        except:
-            deltas_call.append(0)
-            deltas_put.append(0)
-            gammas.append(0)
-            vegas.append(0)
+    # Points are concentrated near the strike, where gamma peaks
+    S_range, result = adaptive_curve(curve, 50, 150)
+    deltas_call = result['delta_call']
+    deltas_put = result['delta_put']
+    gammas = result['gamma']
+    vegas = result['vega']
     
     fig = make_subplots(
         rows=2, cols=2,
@@ -338,5 +488,49 @@ def create_greeks_chart(S, K, T, r, sigma):
     
     return fig
 
+def create_heston_chart(S, T, r, sigma, kappa, theta, xi, rho):
+    """Create Heston vs Black-Scholes price and implied-volatility chart across strikes"""
+    K_range = np.linspace(50, 150, 100)
+    
+    # The whole strike range is priced in one call for each model
+    heston = heston_price(S, K_range, T, r, sigma ** 2, kappa, theta, xi, rho)
+    bs = blackScholes_batch(S, K_range, T, r, sigma, outputs=('call_price',))
+    implied_vols = calculate_implied_volatility_batch(S, K_range, T, r, heston['call_price'])
+    
+    fig = make_subplots(rows=1, cols=2, subplot_titles=('Call Price', 'Implied Volatility'))
+    
+    fig.add_trace(
+        go.Scatter(x=K_range, y=heston['call_price'], mode='lines', name='Heston',
+                  line=dict(color='blue', width=3)),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Scatter(x=K_range, y=bs['call_price'], mode='lines', name='Black-Scholes',
+                  line=dict(color='gray', width=2, dash='dash')),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Scatter(x=K_range, y=implied_vols, mode='lines', name='Heston Smile',
+                  line=dict(color='blue', width=3), showlegend=False),
+        row=1, col=2
+    )
+    fig.add_trace(
+        go.Scatter(x=K_range, y=np.full_like(K_range, sigma), mode='lines', name='Flat Volatility',
+                  line=dict(color='gray', width=2, dash='dash'), showlegend=False),
+        row=1, col=2
+    )
+    
+    fig.update_layout(
+        title='Heston vs Black-Scholes Across Strikes',
+        hovermode='x unified',
+        height=400
+    )
+    fig.update_xaxes(title_text="Strike Price ($)", row=1, col=1)
+    fig.update_xaxes(title_text="Strike Price ($)", row=1, col=2)
+    fig.update_yaxes(title_text="Option Price ($)", row=1, col=1)
+    fig.update_yaxes(title_text="Volatility", row=1, col=2)
+    
+    return fig
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file